@@ -4,8 +4,14 @@
 from __future__ import unicode_literals
 
 # Third party imports
+from django import VERSION as DJANGO_VERSION
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Max
+from django.db.models import Q
+from django.db.models import Sum
 from django.utils.encoding import force_text
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.timezone import now
@@ -16,16 +22,23 @@ from mptt.models import TreeForeignKey
 
 # Local application / specific library imports
 from machina.apps.forum import signals
+from machina.apps.forum.deletion import deletion_engine
+from machina.apps.forum.trackers import trackers_updater
 from machina.conf import settings as machina_settings
 from machina.core.compat import slugify
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
-from machina.core.utils import refresh
 from machina.models import ActiveModel
 from machina.models import DatedModel
+from machina.models import DirtyFieldsModel
 from machina.models.fields import ExtendedImageField
 from machina.models.fields import MarkupTextField
 
+if DJANGO_VERSION >= (1, 8):
+    from django.db.models import Case
+    from django.db.models import Value
+    from django.db.models import When
+
 ForumManager = get_class('forum.managers', 'ForumManager')
 
 
@@ -37,7 +50,7 @@ FORUM_TYPES = Choices(
 
 
 @python_2_unicode_compatible
-class AbstractForum(MPTTModel, ActiveModel, DatedModel):
+class AbstractForum(MPTTModel, ActiveModel, DatedModel, DirtyFieldsModel):
     """
     The main forum model.
     The tree hierarchy of forums and categories is managed by the MPTTModel
@@ -73,12 +86,18 @@ class AbstractForum(MPTTModel, ActiveModel, DatedModel):
     link_redirects_count = models.PositiveIntegerField(verbose_name=_('Track link redirects count'),
                                                        editable=False, blank=True, default=0)
     last_post_on = models.DateTimeField(verbose_name=_('Last post added on'), blank=True, null=True)
+    last_post = models.ForeignKey(
+        'forum_conversation.Post', verbose_name=_('Last post'), related_name='+',
+        blank=True, null=True, editable=False, on_delete=models.SET_NULL)
 
     # Display options
     display_sub_forum_list = models.BooleanField(verbose_name=_('Display in parent-forums legend'),
                                                  help_text=_('Displays this forum on the legend of its parent-forum (sub forums list)'),
                                                  default=True)
 
+    # The changes of the parent of a forum must be detected when saving it
+    tracked_fields = ('parent', )
+
     objects = ForumManager()
 
     class Meta:
@@ -135,9 +154,9 @@ class AbstractForum(MPTTModel, ActiveModel, DatedModel):
     def save(self, *args, **kwargs):
         # It is vital to track the changes of the parent associated with a forum in order to
         # maintain counters up-to-date and to trigger other operations such as permissions updates.
-        old_instance = None
-        if self.pk:
-            old_instance = self.__class__._default_manager.get(pk=self.pk)
+        # The parent that was loaded from the database is kept by the instance.
+        parent_changed = self.has_changed('parent')
+        old_parent_id = self.get_loaded_value('parent') if parent_changed else None
 
         # Update the slug field
         self.slug = slugify(force_text(self.name))
@@ -146,14 +165,15 @@ class AbstractForum(MPTTModel, ActiveModel, DatedModel):
         super(AbstractForum, self).save(*args, **kwargs)
 
         # If any change has been made to the forum parent, trigger the update of the counters
-        if old_instance and old_instance.parent != self.parent:
+        if parent_changed:
             self.update_trackers()
             # The previous parent trackers should also be updated
-            if old_instance.parent:
-                old_parent = refresh(old_instance.parent)
+            old_parent = None
+            if old_parent_id:
+                old_parent = self.__class__._default_manager.get(pk=old_parent_id)
                 old_parent.update_trackers()
             # Trigger the 'forum_moved' signal
-            signals.forum_moved.send(sender=self, previous_parent=old_instance.parent)
+            signals.forum_moved.send(sender=self, previous_parent=old_parent)
 
     def _simple_save(self, *args, **kwargs):
         """
@@ -166,33 +186,121 @@ class AbstractForum(MPTTModel, ActiveModel, DatedModel):
         """
         super(AbstractForum, self).save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        # The topics of the forum and of its descendants are deleted by batches before the forum
+        # itself so that the deletion collector does not load all their posts at once.
+        deletion_engine.delete_forum_topics(self)
+        super(AbstractForum, self).delete(*args, **kwargs)
+
     def update_trackers(self):
-        # Fetch the list of ids of all descendant forums including the current one
-        forum_ids = self.get_descendants(include_self=True).values_list('id', flat=True)
+        """
+        Computes again the posts count, the topics count and the last post date of the current
+        forum and of all its ancestors from the topics they contain. This method is intended to
+        repair the counters or to update them after a structural change (eg. a forum or a topic
+        being moved) ; regular operations such as the creation of posts should rely on the
+        apply_trackers_deltas method instead.
+        If the trackers updates are deferred, the forum is only marked as dirty and its trackers
+        will be computed again once the deferral block is left.
+        """
+        if trackers_updater.add_forum(self):
+            return
+
+        self._update_trackers()
+
+        # Trigger the parent trackers update if necessary
+        if self.parent:
+            self.parent.update_trackers()
 
+    def _update_trackers(self):
+        """
+        Computes again the trackers of the current forum without updating its ancestors.
+        """
         # Determine the list of the associated topics, that is the list of topics
         # associated with the current forum plus the list of all topics associated
         # with the descendant forums.
         topic_klass = get_model('forum_conversation', 'Topic')
-        topics = topic_klass.objects.filter(forum__id__in=forum_ids).order_by('-last_post_on')
-        approved_topics = topics.filter(approved=True)
-
-        self.topics_count = approved_topics.count()
-        # Compute the forum level posts count (only approved posts are recorded)
-        posts_count = sum(topic.posts_count for topic in topics)
-        self.posts_count = posts_count
+        topics = topic_klass._default_manager.filter(
+            forum__tree_id=self.tree_id, forum__lft__gte=self.lft, forum__rght__lte=self.rght)
+
+        # The counters are computed by the database in order to avoid loading each topic. Note that
+        # the posts count takes into account all the topics (only their approved posts are
+        # recorded) while the topics count and the last post date only consider approved topics.
+        if DJANGO_VERSION >= (1, 8):
+            trackers = topics.aggregate(
+                posts_count=Sum('posts_count'),
+                topics_count=Count(Case(When(approved=True, then=1))),
+                last_post_on=Max(Case(
+                    When(approved=True, then='last_post_on'), output_field=models.DateTimeField())))
+        else:  # pragma: no cover
+            trackers = topics.aggregate(posts_count=Sum('posts_count'))
+            trackers.update(topics.filter(approved=True).aggregate(
+                topics_count=Count('id'), last_post_on=Max('last_post_on')))
+
+        self.topics_count = trackers['topics_count']
+        self.posts_count = trackers['posts_count'] or 0
 
         # Force the forum 'last_post_on' date to the one associated with the topic with
         # the latest post.
-        self.last_post_on = approved_topics[0].last_post_on if len(approved_topics) else now()
+        self.last_post_on = trackers['last_post_on'] if self.topics_count else now()
+        last_posts = list(
+            topics.filter(approved=True, last_post__isnull=False).order_by('-last_post_on')
+            .values_list('last_post_id', flat=True)[:1])
+        self.last_post_id = last_posts[0] if last_posts else None
+        # The last post instance that could have been cached is discarded
+        last_post_cache_name = self._meta.get_field('last_post').get_cache_name()
+        if hasattr(self, last_post_cache_name):
+            delattr(self, last_post_cache_name)
 
         # Any save of a forum triggered from the update_tracker process will not result
         # in checking for a change of the forum's parent.
         self._simple_save()
 
-        # Trigger the parent trackers update if necessary
-        if self.parent:
-            self.parent.update_trackers()
+    def apply_trackers_deltas(self, posts_delta=0, topics_delta=0, last_post=None):
+        """
+        Increments the posts count and the topics count of the current forum and of all its
+        ancestors by the given values and updates their last post if the given post is more
+        recent. The counters are updated in the database by using F() expressions so that a
+        constant number of queries is performed whatever the depth of the forum.
+        """
+        ancestors = self.__class__._default_manager.filter(
+            tree_id=self.tree_id, lft__lte=self.lft, rght__gte=self.rght)
+        updated = now()
+        last_post_on = last_post.created if last_post else None
+
+        is_older = Q(last_post_on__isnull=True) | Q(last_post_on__lt=last_post_on)
+        if DJANGO_VERSION >= (1, 8) and last_post_on:
+            # The counters and the last post are updated using a single query ; the last post is
+            # only updated for the forums whose last post is older than the given one.
+            ancestors.update(
+                posts_count=F('posts_count') + posts_delta,
+                topics_count=F('topics_count') + topics_delta,
+                last_post_on=Case(
+                    When(is_older, then=Value(last_post_on)), default=F('last_post_on'),
+                    output_field=models.DateTimeField()),
+                last_post=Case(
+                    When(is_older, then=Value(last_post.pk)), default=F('last_post'),
+                    output_field=models.IntegerField()),
+                updated=updated)
+        else:
+            if posts_delta or topics_delta:
+                ancestors.update(
+                    posts_count=F('posts_count') + posts_delta,
+                    topics_count=F('topics_count') + topics_delta,
+                    updated=updated)
+            if last_post_on:
+                ancestors.filter(is_older) \
+                    .update(last_post_on=last_post_on, last_post=last_post, updated=updated)
+
+        # The forum instances that are already loaded are updated in order to reflect the new
+        # values of the counters.
+        forum = self
+        while forum is not None:
+            forum.posts_count += posts_delta
+            forum.topics_count += topics_delta
+            if last_post_on and (forum.last_post_on is None or forum.last_post_on < last_post_on):
+                forum.last_post_on = last_post_on
+                forum.last_post = last_post
+            forum = getattr(forum, self._meta.get_field('parent').get_cache_name(), None)
 
     def get_absolute_url(self):
         from django.core.urlresolvers import reverse
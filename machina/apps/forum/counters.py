@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from collections import defaultdict
+import atexit
+import logging
+import threading
+import time
+
+# Third party imports
+from django.db.models import F
+
+# Local application / specific library imports
+from machina.conf import settings as machina_settings
+from machina.core.db.models import get_model
+from machina.core.utils import iter_slices
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedCounter(object):
+    """
+    Increments an integer field of a model (such as the views count of the topics). If the
+    MACHINA_VIEW_COUNTERS_BUFFERED setting is set to True, the increments are accumulated in the
+    memory of the current process and are written to the database by the flush() method, which
+    is called once the MACHINA_VIEW_COUNTERS_FLUSH_INTERVAL or the
+    MACHINA_VIEW_COUNTERS_FLUSH_SIZE threshold is reached and when the process exits. The rows
+    that received the same number of increments are updated using a single query.
+    """
+    def __init__(self, app_label, model_name, field_name):
+        self.app_label = app_label
+        self.model_name = model_name
+        self.field_name = field_name
+        self._lock = threading.Lock()
+        self._increments = defaultdict(int)
+        self._last_flush = time.time()
+        self._metrics = {
+            'increments': 0,
+            'flushes': 0,
+            'flushed_rows': 0,
+            'flushed_increments': 0,
+            'failed_flushes': 0,
+        }
+
+    @property
+    def model(self):
+        return get_model(self.app_label, self.model_name)
+
+    @property
+    def buffered(self):
+        return machina_settings.VIEW_COUNTERS_BUFFERED
+
+    def incr(self, pk, delta=1):
+        """
+        Increments the counter of the object identified by the given primary key.
+        """
+        if not self.buffered:
+            self._update({delta: [pk, ]})
+            return
+
+        with self._lock:
+            self._increments[pk] += delta
+            self._metrics['increments'] += delta
+            pending_increments = sum(self._increments.values())
+            should_flush = pending_increments >= machina_settings.VIEW_COUNTERS_FLUSH_SIZE \
+                or time.time() - self._last_flush >= machina_settings.VIEW_COUNTERS_FLUSH_INTERVAL
+        if should_flush:
+            self.flush()
+
+    def get_pending(self, pk):
+        """
+        Returns the number of increments of the counter of the given object that were not yet
+        written to the database.
+        """
+        with self._lock:
+            return self._increments.get(pk, 0)
+
+    def flush(self):
+        """
+        Writes the buffered increments to the database. The increments are kept in memory if the
+        database cannot be updated so that they can be written by the next flush.
+        """
+        with self._lock:
+            increments, self._increments = self._increments, defaultdict(int)
+            self._last_flush = time.time()
+        if not increments:
+            return
+
+        pks_by_delta = defaultdict(list)
+        for pk, delta in increments.items():
+            pks_by_delta[delta].append(pk)
+
+        try:
+            self._update(pks_by_delta)
+        except Exception:
+            logger.exception('Unable to flush the {} counters of the {} model'.format(
+                self.field_name, self.model_name))
+            with self._lock:
+                for pk, delta in increments.items():
+                    self._increments[pk] += delta
+                self._metrics['failed_flushes'] += 1
+            return
+
+        with self._lock:
+            self._metrics['flushes'] += 1
+            self._metrics['flushed_rows'] += len(increments)
+            self._metrics['flushed_increments'] += sum(increments.values())
+
+    def clear(self):
+        """
+        Drops the buffered increments without writing them to the database.
+        """
+        with self._lock:
+            self._increments = defaultdict(int)
+            self._last_flush = time.time()
+
+    @property
+    def metrics(self):
+        """
+        Returns a dictionary containing the number of increments received by the counter, the
+        number of flushes performed, the number of rows and increments written to the database
+        and the number of increments that are still pending.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pending_rows'] = len(self._increments)
+            metrics['pending_increments'] = sum(self._increments.values())
+        return metrics
+
+    def _update(self, pks_by_delta):
+        queryset = self.model._default_manager.all()
+        for delta, pks in pks_by_delta.items():
+            for ids in iter_slices(pks):
+                queryset.filter(pk__in=ids).update(**{self.field_name: F(self.field_name) + delta})
+
+
+topic_views_counter = BufferedCounter('forum_conversation', 'Topic', 'views_count')
+forum_redirects_counter = BufferedCounter('forum', 'Forum', 'link_redirects_count')
+
+counters = [topic_views_counter, forum_redirects_counter, ]
+
+
+def flush_counters():
+    """
+    Writes the buffered increments of all the counters to the database.
+    """
+    for counter in counters:
+        counter.flush()
+
+
+# The pending increments are written to the database when the process exits
+atexit.register(flush_counters)
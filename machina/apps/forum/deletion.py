@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from collections import defaultdict
+import logging
+import threading
+
+# Third party imports
+from django.db import transaction
+
+# Local application / specific library imports
+from machina.apps.forum.trackers import trackers_updater
+from machina.conf import settings as machina_settings
+from machina.core.compat import atomic
+from machina.core.db.models import get_model
+from machina.core.utils import BackgroundWorker
+from machina.core.utils import iter_slices
+
+logger = logging.getLogger(__name__)
+
+
+class DeletionEngine(object):
+    """
+    Deletes posts, topics or the content of forums by batches of at most
+    MACHINA_DELETION_BATCH_SIZE objects so that the number of objects loaded in memory by the
+    deletion collector of Django does not depend on the size of the deleted topics or forums.
+    While a batch is being deleted, the decrements of the posts counts of the forum profiles are
+    collected (see the add_posts_count_delta() method) and applied using one query per distinct
+    decrement. The files of the deleted attachments are removed by a background thread once the
+    batch is deleted and the trackers of the forums containing the deleted topics are computed
+    again only once, at the end of the deletion.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._worker = BackgroundWorker('machina-deletion')
+
+    @property
+    def batch_size(self):
+        return machina_settings.DELETION_BATCH_SIZE
+
+    @property
+    def deleting(self):
+        """
+        Returns True if a batch of objects is currently being deleted in the current thread.
+        """
+        return getattr(self._local, 'posts_counts', None) is not None
+
+    def add_posts_count_delta(self, user_id, delta):
+        """
+        Records a change of the posts count of the forum profile of the given user. Returns
+        False if no batch is being deleted, in which case the change should be applied by the
+        caller.
+        """
+        if not self.deleting:
+            return False
+        self._local.posts_counts[user_id] += delta
+        return True
+
+    def delete_posts(self, post_ids):
+        """
+        Deletes the given posts by batches. The trackers and the sequence numbers of the topics
+        containing these posts are not updated: this method is intended to remove posts (such as
+        posts awaiting approval) whose topics are handled by the caller. Returns the number of
+        deleted posts.
+        """
+        post_model = get_model('forum_conversation', 'Post')
+        deleted_count = 0
+        for ids in iter_slices(sorted(set(post_ids)), self.batch_size):
+            deleted_count += self._delete_posts_batch(
+                list(post_model._default_manager.filter(pk__in=ids).values_list('pk', flat=True)))
+        return deleted_count
+
+    def delete_topics(self, topic_ids):
+        """
+        Deletes the given topics and the posts they contain by batches. The trackers of the
+        forums containing the topics are computed again once all the topics are deleted.
+        Returns the number of deleted topics.
+        """
+        topic_model = get_model('forum_conversation', 'Topic')
+        post_model = get_model('forum_conversation', 'Post')
+        deleted_count = 0
+        with trackers_updater.defer():
+            for ids in iter_slices(sorted(set(topic_ids)), self.batch_size):
+                topics = topic_model._default_manager.filter(pk__in=ids)
+                forum_ids = list(topics.values_list('forum_id', flat=True))
+                if not forum_ids:
+                    continue
+
+                # The posts of the topics are deleted first so that the deletion of a very large
+                # topic does not load all its posts at once.
+                posts = post_model._default_manager.filter(topic_id__in=ids) \
+                    .order_by('pk').values_list('pk', flat=True)
+                while True:
+                    post_ids = list(posts[:self.batch_size])
+                    if not post_ids:
+                        break
+                    self._delete_posts_batch(post_ids)
+
+                with atomic():
+                    self._delete(topics)
+                deleted_count += len(forum_ids)
+                trackers_updater.add_ids(forum_ids=forum_ids)
+        return deleted_count
+
+    def delete_forum_topics(self, forum):
+        """
+        Deletes the topics of the given forum and of all its descendants by batches. The trackers
+        of the forum and of its ancestors are computed again once all the topics are deleted.
+        Returns the number of deleted topics.
+        """
+        topic_model = get_model('forum_conversation', 'Topic')
+        forum_ids = list(forum.get_descendants(include_self=True).values_list('pk', flat=True))
+        # The ancestors are marked as dirty explicitly: the trackers updates can be performed once
+        # the current transaction is committed, that is once the forum itself is deleted.
+        ancestor_ids = list(forum.get_ancestors().values_list('pk', flat=True))
+        deleted_count = 0
+        with trackers_updater.defer():
+            trackers_updater.add_ids(forum_ids=ancestor_ids)
+            for ids in iter_slices(forum_ids):
+                topics = topic_model._default_manager.filter(forum_id__in=ids) \
+                    .order_by('pk').values_list('pk', flat=True)
+                while True:
+                    topic_ids = list(topics[:self.batch_size])
+                    if not topic_ids:
+                        break
+                    deleted_count += self.delete_topics(topic_ids)
+        return deleted_count
+
+    def _delete_posts_batch(self, post_ids):
+        """
+        Deletes the given posts and schedules the removal of the files of their attachments.
+        """
+        if not post_ids:
+            return 0
+        post_model = get_model('forum_conversation', 'Post')
+        attachment_model = get_model('forum_attachments', 'Attachment')
+        with atomic():
+            file_names = [
+                name for name in attachment_model._default_manager
+                .filter(post_id__in=post_ids).values_list('file', flat=True) if name]
+            self._delete(post_model._default_manager.filter(pk__in=post_ids))
+        if file_names:
+            self._remove_files(attachment_model._meta.get_field('file').storage, file_names)
+        return len(post_ids)
+
+    def _delete(self, queryset):
+        """
+        Deletes the objects of the given queryset using the deletion collector of Django and
+        applies the changes of the posts counts of the forum profiles that were collected.
+        """
+        self._local.posts_counts = defaultdict(int)
+        try:
+            queryset.delete()
+            profile_model = get_model('forum_member', 'ForumProfile')
+            profile_model._default_manager.update_posts_counts(self._local.posts_counts)
+        finally:
+            self._local.posts_counts = None
+
+    def _remove_files(self, storage, file_names):
+        def callback():
+            self._worker.enqueue(self._remove, storage, file_names)
+
+        on_commit = getattr(transaction, 'on_commit', None)
+        if on_commit is not None:
+            # The files are removed once the current transaction is committed (or immediately if
+            # no transaction is in progress).
+            on_commit(callback)
+        else:
+            callback()
+
+    def join(self):
+        """
+        Waits for the background thread to remove all the pending files.
+        """
+        self._worker.join()
+
+    def _remove(self, storage, file_names):
+        for name in file_names:
+            try:
+                storage.delete(name)
+            except Exception:  # pragma: no cover
+                logger.exception('Unable to remove the attachment file {}'.format(name))
+
+
+deletion_engine = DeletionEngine()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from optparse import make_option
+
+# Third party imports
+from django.core.management.base import BaseCommand
+from django.db import reset_queries
+from django.db.models import Count
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import Sum
+from django.utils.timezone import now
+
+# Local application / specific library imports
+from machina.core.compat import atomic
+from machina.core.db.models import get_model
+from machina.core.utils import iter_slices
+
+Forum = get_model('forum', 'Forum')
+ForumProfile = get_model('forum_member', 'ForumProfile')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+class Command(BaseCommand):
+    help = 'Computes again the trackers (posts counts, topics counts, first posts, last posts ' \
+           'and last post dates) of all the topics, forums and forum profiles'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--chunk-size', action='store', type='int', dest='chunk_size', default=1000,
+            help='Number of topics or profiles processed at once'),
+    )
+
+    def handle(self, *args, **options):
+        chunk_size = int(options.get('chunk_size') or 1000)
+        self.rebuild_topics(chunk_size)
+        self.rebuild_forums()
+        self.rebuild_profiles(chunk_size)
+
+    def rebuild_topics(self, chunk_size):
+        """
+        Computes again the posts counts, the first posts, the last posts and the last post dates
+        of the topics. The topics are processed by chunks (ordered by primary key) and the
+        trackers of the topics of each chunk are computed using aggregate queries.
+        """
+        total, processed, updated = Topic._default_manager.count(), 0, 0
+        fields = ('posts_count', 'last_post_on', 'first_post_id', 'last_post_id')
+        for chunk in self._iter_chunks(Topic._default_manager.all(), chunk_size, 'pk', *fields):
+            posts = Post._default_manager \
+                .filter(topic_id__gte=chunk[0][0], topic_id__lte=chunk[-1][0]).order_by()
+            approved_trackers = dict(
+                (row['topic_id'], (row['posts_count'], row['last_post_on']))
+                for row in posts.filter(approved=True).values('topic_id')
+                .annotate(posts_count=Count('id'), last_post_on=Max('created')))
+            first_posts_on = dict(
+                posts.values('topic_id').annotate(first_post_on=Min('created'))
+                .values_list('topic_id', 'first_post_on'))
+
+            # The first post and the last post of each topic are determined using their
+            # creation dates.
+            first_post_ids, last_post_ids = {}, {}
+            dates = set(first_posts_on.values()) | \
+                set(last_post_on for _, last_post_on in approved_trackers.values())
+            for dates_slice in iter_slices(sorted(dates)):
+                for topic_id, created, approved, pk in posts.filter(created__in=dates_slice) \
+                        .order_by('pk').values_list('topic_id', 'created', 'approved', 'pk'):
+                    if created == first_posts_on.get(topic_id):
+                        first_post_ids.setdefault(topic_id, pk)
+                    if approved and created == approved_trackers.get(topic_id, (0, None))[1]:
+                        last_post_ids[topic_id] = pk
+
+            with atomic():
+                for pk, posts_count, last_post_on, first_post_id, last_post_id in chunk:
+                    values = approved_trackers.get(pk, (0, None)) + (
+                        first_post_ids.get(pk), last_post_ids.get(pk))
+                    if values != (posts_count, last_post_on, first_post_id, last_post_id):
+                        Topic._default_manager.filter(pk=pk).update(
+                            posts_count=values[0], last_post_on=values[1],
+                            first_post=values[2], last_post=values[3])
+                        updated += 1
+            processed += len(chunk)
+            self.stdout.write('Topics: {}/{}'.format(processed, total))
+        self.stdout.write('{} topics were updated'.format(updated))
+
+    def rebuild_forums(self):
+        """
+        Computes again the posts counts, the topics counts, the last posts and the last post
+        dates of the forums. The trackers of the topics of each forum are aggregated by the
+        database and the forums are then processed from the deepest ones to the top-level ones so
+        that the trackers of each forum are added to the trackers of its parent.
+        """
+        topics = Topic._default_manager.order_by().values('forum_id')
+        posts_counts = dict(
+            (row['forum_id'], row['posts_count'])
+            for row in topics.annotate(posts_count=Sum('posts_count')))
+        approved_trackers = dict(
+            (row['forum_id'], (row['topics_count'], row['last_post_on']))
+            for row in topics.filter(approved=True)
+            .annotate(topics_count=Count('id'), last_post_on=Max('last_post_on')))
+
+        # The last post of each forum is the last post of the approved topic with the most
+        # recent last post date.
+        last_post_ids = {}
+        dates = set(
+            last_post_on for _, last_post_on in approved_trackers.values() if last_post_on)
+        for dates_slice in iter_slices(sorted(dates)):
+            for forum_id, last_post_on, last_post_id in Topic._default_manager \
+                    .filter(approved=True, last_post_on__in=dates_slice, last_post__isnull=False) \
+                    .order_by('pk').values_list('forum_id', 'last_post_on', 'last_post_id'):
+                if last_post_on == approved_trackers[forum_id][1]:
+                    last_post_ids[forum_id] = last_post_id
+
+        forums = list(
+            Forum._default_manager.order_by('-level').values_list(
+                'pk', 'parent_id', 'posts_count', 'topics_count', 'last_post_on', 'last_post_id'))
+        trackers = {}
+        for pk, parent_id, _, _, _, _ in forums:
+            posts_count, topics_count, last_post_on, last_post_id = \
+                trackers.setdefault(pk, [0, 0, None, None])
+            posts_count += posts_counts.get(pk) or 0
+            approved_topics_count, approved_last_post_on = approved_trackers.get(pk, (0, None))
+            topics_count += approved_topics_count
+            if last_post_on is None or \
+                    (approved_last_post_on is not None and approved_last_post_on > last_post_on):
+                last_post_on, last_post_id = approved_last_post_on, last_post_ids.get(pk)
+            trackers[pk] = [posts_count, topics_count, last_post_on, last_post_id]
+            if parent_id is not None:
+                parent_trackers = trackers.setdefault(parent_id, [0, 0, None, None])
+                parent_trackers[0] += posts_count
+                parent_trackers[1] += topics_count
+                if parent_trackers[2] is None or \
+                        (last_post_on is not None and last_post_on > parent_trackers[2]):
+                    parent_trackers[2:] = [last_post_on, last_post_id]
+
+        updated = 0
+        with atomic():
+            for pk, _, posts_count, topics_count, last_post_on, last_post_id in forums:
+                new_trackers = trackers[pk]
+                if not new_trackers[1]:
+                    # Forums without approved topics use the date of their last update as their
+                    # last post date, as done by the Forum.update_trackers() method.
+                    new_trackers[2] = now() if topics_count else last_post_on
+                if tuple(new_trackers) != (posts_count, topics_count, last_post_on, last_post_id):
+                    Forum._default_manager.filter(pk=pk).update(
+                        posts_count=new_trackers[0], topics_count=new_trackers[1],
+                        last_post_on=new_trackers[2], last_post=new_trackers[3])
+                    updated += 1
+        self.stdout.write('{} forums were updated'.format(updated))
+
+    def rebuild_profiles(self, chunk_size):
+        """
+        Computes again the posts counts of the forum profiles. The profiles are processed by
+        chunks (ordered by user).
+        """
+        total, processed, updated = ForumProfile._default_manager.count(), 0, 0
+        for chunk in self._iter_chunks(ForumProfile._default_manager.all(), chunk_size,
+                                       'user_id', 'posts_count'):
+            posts_counts = dict(
+                Post._default_manager
+                .filter(poster_id__gte=chunk[0][0], poster_id__lte=chunk[-1][0], approved=True)
+                .order_by().values('poster_id').annotate(posts_count=Count('id'))
+                .values_list('poster_id', 'posts_count'))
+            with atomic():
+                for user_id, posts_count in chunk:
+                    new_posts_count = posts_counts.get(user_id, 0)
+                    if new_posts_count != posts_count:
+                        ForumProfile._default_manager.filter(user_id=user_id) \
+                            .update(posts_count=new_posts_count)
+                        updated += 1
+            processed += len(chunk)
+            self.stdout.write('Forum profiles: {}/{}'.format(processed, total))
+        self.stdout.write('{} forum profiles were updated'.format(updated))
+
+    def _iter_chunks(self, queryset, chunk_size, key, *fields):
+        """
+        Yields lists of tuples containing the given key and the given fields of the objects of
+        the queryset. The objects are fetched by chunks ordered by the given key (which must be
+        unique) so that the memory usage does not depend on the number of objects.
+        """
+        queryset = queryset.order_by(key).values_list(key, *fields)
+        last_key = None
+        while True:
+            chunk_queryset = queryset if last_key is None \
+                else queryset.filter(**{'{}__gt'.format(key): last_key})
+            chunk = list(chunk_queryset[:chunk_size])
+            if not chunk:
+                break
+            yield chunk
+            last_key = chunk[-1][0]
+            # The queries performed while processing large boards should not be kept in memory
+            # if the DEBUG setting is enabled.
+            reset_queries()
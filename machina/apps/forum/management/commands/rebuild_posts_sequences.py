@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from optparse import make_option
+
+# Third party imports
+from django.core.management.base import BaseCommand
+from django.db import reset_queries
+
+# Local application / specific library imports
+from machina.apps.forum_conversation.utils import update_posts_sequences
+from machina.core.compat import atomic
+from machina.core.db.models import get_model
+
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+class Command(BaseCommand):
+    help = 'Computes again the sequence numbers of the posts of all the topics (the position ' \
+           'of each approved post among the approved posts of its topic)'
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--chunk-size', action='store', type='int', dest='chunk_size', default=1000,
+            help='Number of topics processed at once'),
+    )
+
+    def handle(self, *args, **options):
+        chunk_size = int(options.get('chunk_size') or 1000)
+        topics = Topic._default_manager.order_by('pk').values_list('pk', flat=True)
+        total, processed, updated = topics.count(), 0, 0
+        last_pk = None
+
+        while True:
+            chunk = list((topics if last_pk is None else topics.filter(pk__gt=last_pk))[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1]
+            posts = Post._default_manager.filter(topic_id__gte=chunk[0], topic_id__lte=last_pk)
+
+            with atomic():
+                updated += update_posts_sequences(posts)
+                updated += posts.filter(approved=False, sequence__isnull=False) \
+                    .update(sequence=None)
+
+            processed += len(chunk)
+            self.stdout.write('Topics: {}/{}'.format(processed, total))
+            # The queries performed while processing large boards should not be kept in memory
+            # if the DEBUG setting is enabled.
+            reset_queries()
+
+        self.stdout.write('{} posts were updated'.format(updated))
@@ -6,6 +6,7 @@ from django.db.models import Q
 from mptt.managers import TreeManager
 
 # Local application / specific library imports
+from machina.apps.forum.tree import forum_tree_cache
 
 
 class ForumManager(TreeManager):
@@ -35,6 +36,12 @@ class ForumManager(TreeManager):
                         if hasattr(super_self, 'get_query_set')
                         else super_self.get_queryset)
 
+        # The displayable forums are computed using the snapshot of the tree of forums if the
+        # forum tree cache is enabled.
+        tree = forum_tree_cache.get_tree()
+        if tree is not None and (start_from is None or start_from in tree):
+            return get_queryset().filter(pk__in=tree.get_displayable_subforums(start_from))
+
         parent_field = 'isnull' if start_from is None else 'pk'
         parent_value = True if start_from is None else start_from.pk
         parent_selector = lambda x: '__'.join(['parent' for _ in range(0, x)] + [parent_field, ])
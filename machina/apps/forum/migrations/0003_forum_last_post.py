@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.db.models.deletion
+
+
+def set_last_posts(apps, schema_editor):
+    Forum = apps.get_model('forum', 'Forum')
+    Post = apps.get_model('forum_conversation', 'Post')
+    for forum in Forum.objects.all().iterator():
+        last_posts = list(
+            Post.objects.filter(
+                approved=True, topic__approved=True, topic__forum__tree_id=forum.tree_id,
+                topic__forum__lft__gte=forum.lft, topic__forum__rght__lte=forum.rght)
+            .order_by('-created').values_list('id', flat=True)[:1])
+        Forum.objects.filter(pk=forum.pk).update(last_post=last_posts[0] if last_posts else None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum_conversation', '0001_initial'),
+        ('forum', '0002_auto_20150725_0512'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forum',
+            name='last_post',
+            field=models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to='forum_conversation.Post', null=True, verbose_name='Last post'),
+        ),
+        migrations.RunPython(set_last_posts, migrations.RunPython.noop),
+    ]
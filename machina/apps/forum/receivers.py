@@ -2,18 +2,44 @@
 
 # Standard library imports
 # Third party imports
-from django.db.models import F
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 # Local application / specific library imports
+from machina.apps.forum.counters import forum_redirects_counter
+from machina.apps.forum.signals import forum_moved
 from machina.apps.forum.signals import forum_viewed
+from machina.apps.forum.tree import forum_tree_cache
+from machina.core.db.models import get_model
+
+Forum = get_model('forum', 'Forum')
 
 
 @receiver(forum_viewed)
 def update_forum_redirects_counter(sender, forum, user, request, response, **kwargs):
     """
-    Receiver to handle the update of the link redirects counter associated with link forums.
+    Receiver to handle the update of the link redirects counter associated with link forums. The
+    increments can be buffered (see the MACHINA_VIEW_COUNTERS_BUFFERED setting).
     """
     if forum.is_link and forum.link_redirects:
-        forum.link_redirects_count = F('link_redirects_count') + 1
-        forum.save()
+        forum_redirects_counter.incr(forum.pk)
+
+
+@receiver(post_save, sender=Forum)
+def update_forum_tree_version_on_save(sender, instance, created, **kwargs):
+    """
+    Receiver to handle the invalidation of the snapshot of the tree of forums when a forum is
+    created or when a change impacting the tree of forums is made to an existing forum.
+    """
+    forum_tree_cache.bump_version(None if created else instance)
+
+
+@receiver(post_delete, sender=Forum)
+@receiver(forum_moved)
+def update_forum_tree_version(sender, **kwargs):
+    """
+    Receiver to handle the invalidation of the snapshot of the tree of forums when a forum is
+    deleted or moved.
+    """
+    forum_tree_cache.bump_version()
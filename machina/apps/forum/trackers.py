@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from contextlib import contextmanager
+import threading
+
+# Third party imports
+from django.db import connection
+from django.db import transaction
+from django.db.models import Q
+
+# Local application / specific library imports
+from machina.conf import settings as machina_settings
+from machina.core.db.models import get_model
+from machina.core.utils import BackgroundWorker
+
+
+class TrackersUpdater(object):
+    """
+    Collects the topics and the forums whose trackers (posts counts, topics counts and last post
+    dates) should be computed again while a deferral block is active (see the defer() method).
+    Each topic and each forum collected during such a block is updated only once when the
+    outermost block is left, whatever the number of times its trackers were marked as dirty.
+    If the MACHINA_TRACKERS_UPDATES_IN_BACKGROUND setting is set to True, the updates are
+    performed by a background thread of the current process instead.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._worker = BackgroundWorker('machina-trackers')
+
+    @property
+    def deferring(self):
+        """
+        Returns True if the trackers updates are currently deferred in the current thread.
+        """
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextmanager
+    def defer(self):
+        """
+        Defers the trackers updates that are triggered inside the block until the outermost
+        deferral block is left.
+        """
+        if not self.deferring:
+            self._local.depth = 0
+            self._local.topic_ids = set()
+            self._local.forum_ids = set()
+        self._local.depth += 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if not self._local.depth:
+                topic_ids, forum_ids = self._local.topic_ids, self._local.forum_ids
+                self._local.topic_ids, self._local.forum_ids = set(), set()
+                self._schedule(topic_ids, forum_ids)
+
+    def add_topic(self, topic):
+        """
+        Marks the trackers of the given topic (and of the forums containing it) as dirty. Returns
+        False if the trackers updates are not deferred.
+        """
+        if not self.deferring:
+            return False
+        self._local.topic_ids.add(topic.pk)
+        self._local.forum_ids.add(topic.forum_id)
+        return True
+
+    def add_forum(self, forum):
+        """
+        Marks the trackers of the given forum (and of its ancestors) as dirty. Returns False if
+        the trackers updates are not deferred.
+        """
+        if not self.deferring:
+            return False
+        self._local.forum_ids.add(forum.pk)
+        return True
+
+    def add_ids(self, topic_ids=(), forum_ids=()):
+        """
+        Marks the trackers of the topics and of the forums identified by the given primary keys
+        as dirty. This allows to mark objects that are no longer available (eg. the forums of
+        topics that were deleted using a queryset) or that were never fetched. The updates are
+        scheduled immediately if they are not deferred.
+        """
+        if not self.deferring:
+            self._schedule(set(topic_ids), set(forum_ids))
+            return
+        self._local.topic_ids.update(topic_ids)
+        self._local.forum_ids.update(forum_ids)
+
+    def update(self, topic_ids, forum_ids):
+        """
+        Computes again the trackers of the given topics, of the given forums and of all their
+        ancestors. Each object is updated exactly once.
+        """
+        topic_model = get_model('forum_conversation', 'Topic')
+        forum_model = get_model('forum', 'Forum')
+
+        forum_ids = set(forum_ids)
+        for topic in topic_model._default_manager.filter(pk__in=topic_ids):
+            topic._update_trackers()
+            forum_ids.add(topic.forum_id)
+
+        if not forum_ids:
+            return
+
+        # The ancestors of the dirty forums must be updated too ; the forums are updated from
+        # the deepest ones to the top-level ones.
+        ancestors_filter = Q()
+        for tree_id, lft, rght in forum_model._default_manager.filter(pk__in=forum_ids) \
+                .values_list('tree_id', 'lft', 'rght'):
+            ancestors_filter |= Q(tree_id=tree_id, lft__lte=lft, rght__gte=rght)
+        if not ancestors_filter:
+            return
+        for forum in forum_model._default_manager.filter(ancestors_filter).order_by('-level'):
+            forum._update_trackers()
+
+    def _schedule(self, topic_ids, forum_ids):
+        if not topic_ids and not forum_ids:
+            return
+        in_background = machina_settings.TRACKERS_UPDATES_IN_BACKGROUND \
+            and not self._in_transaction()
+
+        def callback():
+            if in_background:
+                self._worker.enqueue(self.update, topic_ids, forum_ids)
+            else:
+                self.update(topic_ids, forum_ids)
+
+        on_commit = getattr(transaction, 'on_commit', None)
+        if on_commit is not None:
+            # The updates are performed once the current transaction is committed (or
+            # immediately if no transaction is in progress).
+            on_commit(callback)
+        else:
+            callback()
+
+    def _in_transaction(self):
+        # The background thread uses its own connection and cannot see the changes that are not
+        # yet committed. Note that on Django 1.9+, the updates are scheduled on commit anyway.
+        return getattr(connection, 'in_atomic_block', False) \
+            and not hasattr(transaction, 'on_commit')
+
+    def join(self):
+        """
+        Waits for the background thread to process all the pending updates.
+        """
+        self._worker.join()
+
+
+trackers_updater = TrackersUpdater()
+defer_trackers_updates = trackers_updater.defer
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from collections import namedtuple
+import threading
+import time
+
+# Third party imports
+from django.core.cache import InvalidCacheBackendError
+from django.core.exceptions import ImproperlyConfigured
+
+# Local application / specific library imports
+from machina.conf import settings as machina_settings
+from machina.core.compat import get_cache
+from machina.core.db.models import get_model
+
+
+ForumTreeNode = namedtuple('ForumTreeNode', [
+    'id', 'parent_id', 'name', 'slug', 'type', 'display_sub_forum_list', 'tree_id', 'lft', 'rght',
+    'level', ])
+
+
+class ForumTree(object):
+    """
+    An in-memory snapshot of the tree of forums. The nodes of the tree are stored in a list
+    ordered as the MPTT tree (that is by tree ID and left value) so that the descendants of a
+    forum are always stored right after it. The snapshot only contains the fields that define
+    the structure of the tree (and those that are required to display links to the forums) ; it
+    can be used to compute the ancestors, the descendants or the children of a forum without
+    querying the database. Snapshots can be pickled in order to be shared using a cache backend.
+    """
+    def __init__(self, nodes):
+        self.nodes = [ForumTreeNode(*node) for node in nodes]
+        self._indexes = dict((node.id, i) for i, node in enumerate(self.nodes))
+        self._parents = []
+        self._children = [[] for _ in self.nodes]
+        self._roots = []
+
+        for i, node in enumerate(self.nodes):
+            parent_index = self._indexes.get(node.parent_id, -1)
+            self._parents.append(parent_index)
+            if parent_index >= 0:
+                self._children[parent_index].append(i)
+            else:
+                self._roots.append(i)
+
+        # Each node is followed by its descendants ; the position of the last descendant of each
+        # node is computed from the end of the list.
+        self._ends = list(range(1, len(self.nodes) + 1))
+        for i in reversed(range(len(self.nodes))):
+            parent_index = self._parents[i]
+            if parent_index >= 0:
+                self._ends[parent_index] = max(self._ends[parent_index], self._ends[i])
+
+    @classmethod
+    def load(cls):
+        """
+        Returns a snapshot of the tree of forums stored in the database.
+        """
+        forum_model = get_model('forum', 'Forum')
+        return cls(
+            forum_model._default_manager.order_by('tree_id', 'lft').values_list(
+                *ForumTreeNode._fields))
+
+    def __contains__(self, forum):
+        return self._get_pk(forum) in self._indexes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get_node(self, forum):
+        """
+        Returns the node corresponding to the given forum (or forum ID).
+        """
+        return self.nodes[self._get_index(forum)]
+
+    def get_ancestors(self, forum, include_self=False):
+        """
+        Returns the IDs of the ancestors of the given forum, starting from the top-level one.
+        """
+        return [self.nodes[i].id for i in self._get_ancestors_indexes(forum, include_self)]
+
+    def get_ancestor_nodes(self, forum, include_self=False):
+        """
+        Returns the nodes of the ancestors of the given forum, starting from the top-level one.
+        """
+        return [self.nodes[i] for i in self._get_ancestors_indexes(forum, include_self)]
+
+    def get_descendants(self, forum, include_self=False):
+        """
+        Returns the IDs of the descendants of the given forum, ordered as the MPTT tree.
+        """
+        index = self._get_index(forum)
+        start = index if include_self else index + 1
+        return [node.id for node in self.nodes[start:self._ends[index]]]
+
+    def get_children(self, forum=None):
+        """
+        Returns the IDs of the children of the given forum or the IDs of the top-level forums if
+        no forum is given.
+        """
+        return [self.nodes[i].id for i in self._get_children_indexes(forum)]
+
+    def get_displayable_subforums(self, start_from=None):
+        """
+        Returns the IDs of the forums that can be seen from the given forum (or from the root of
+        the tree of forums if no forum is given). This method implements the rules described in
+        the ForumManager.displayable_subforums method.
+        """
+        forum_types = get_model('forum', 'Forum').TYPE_CHOICES
+        displayable = []
+        for i in self._get_children_indexes(start_from):
+            displayable.append(i)
+            node = self.nodes[i]
+            for j in self._children[i]:
+                child = self.nodes[j]
+                if node.type == forum_types.forum_cat or child.display_sub_forum_list:
+                    displayable.append(j)
+                if node.type == forum_types.forum_cat and child.type == forum_types.forum_post:
+                    displayable.extend(
+                        k for k in self._children[j] if self.nodes[k].display_sub_forum_list)
+        return [self.nodes[i].id for i in sorted(displayable)]
+
+    def _get_pk(self, forum):
+        return getattr(forum, 'pk', forum)
+
+    def _get_index(self, forum):
+        return self._indexes[self._get_pk(forum)]
+
+    def _get_ancestors_indexes(self, forum, include_self):
+        index = self._get_index(forum)
+        indexes = [index, ] if include_self else []
+        index = self._parents[index]
+        while index >= 0:
+            indexes.append(index)
+            index = self._parents[index]
+        return list(reversed(indexes))
+
+    def _get_children_indexes(self, forum):
+        return self._roots if forum is None else self._children[self._get_index(forum)]
+
+
+class ForumTreeCache(object):
+    """
+    Keeps a snapshot of the tree of forums in the memory of the current process. Each snapshot
+    is associated with a version of the tree that is stored in a Django cache backend (the name
+    of the considered backend is defined by the MACHINA_FORUM_TREE_CACHE_NAME setting). This
+    version is bumped each time a forum is created, modified or deleted so that all the processes
+    load a new snapshot ; the snapshots themselves are also stored in the cache backend in order
+    to be shared between processes. The forum tree cache is disabled if the setting is not set.
+    """
+    key_prefix = 'machina_forum_tree'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._tree = None
+
+    @property
+    def enabled(self):
+        return bool(machina_settings.FORUM_TREE_CACHE_NAME)
+
+    def get_backend(self):
+        try:
+            cache = get_cache(machina_settings.FORUM_TREE_CACHE_NAME)
+        except InvalidCacheBackendError:
+            raise ImproperlyConfigured(
+                'The forum tree cache backend ({}) is not configured'.format(
+                    machina_settings.FORUM_TREE_CACHE_NAME))
+        return cache
+
+    def get_tree(self):
+        """
+        Returns the snapshot of the current version of the tree of forums or None if the forum
+        tree cache is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        version = self.get_version()
+        with self._lock:
+            if self._version == version:
+                return self._tree
+
+        backend = self.get_backend()
+        key = self._make_key(version)
+        tree = backend.get(key)
+        if tree is None:
+            tree = ForumTree.load()
+            backend.set(key, tree)
+
+        with self._lock:
+            self._version, self._tree = version, tree
+        return tree
+
+    def get_version(self):
+        """
+        Returns the current version of the tree of forums.
+        """
+        backend = self.get_backend()
+        version = backend.get(self.version_key)
+        if version is None:
+            backend.add(self.version_key, int(time.time() * 1000), None)
+            version = backend.get(self.version_key)
+        return version
+
+    def bump_version(self, forum=None):
+        """
+        Increments the version of the tree of forums. If a forum is given, the version is only
+        incremented if the structure of the tree (or the way the forum is displayed in the tree)
+        has changed.
+        """
+        if not self.enabled:
+            return
+        if forum is not None:
+            # The forum is compared with the snapshot that is currently shared. Note that a new
+            # snapshot must not be loaded here because it would already include the changes.
+            tree = self._get_shared_tree()
+            if tree is not None and forum in tree and tree.get_node(forum) == self._get_node(forum):
+                return
+
+        with self._lock:
+            self._version, self._tree = None, None
+        backend = self.get_backend()
+        try:
+            backend.incr(self.version_key)
+        except ValueError:
+            backend.set(self.version_key, int(time.time() * 1000), None)
+
+    @property
+    def version_key(self):
+        return '{}:version'.format(self.key_prefix)
+
+    def _make_key(self, version):
+        return '{}:{}:tree'.format(self.key_prefix, version)
+
+    def _get_shared_tree(self):
+        version = self.get_version()
+        with self._lock:
+            if self._version == version:
+                return self._tree
+        return self.get_backend().get(self._make_key(version))
+
+    def _get_node(self, forum):
+        return ForumTreeNode(*[
+            forum.pk if field == 'id' else getattr(forum, field)
+            for field in ForumTreeNode._fields])
+
+
+forum_tree_cache = ForumTreeCache()
@@ -2,6 +2,7 @@
 
 # Standard library imports
 # Third party imports
+from django.db.models import Sum
 from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.views.generic import ListView
@@ -11,6 +12,8 @@ from machina.apps.forum.signals import forum_viewed
 from machina.conf import settings as machina_settings
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
+from machina.core.paginator import CountedPaginator
+from machina.core.paginator import CursorPaginator
 
 Forum = get_model('forum', 'Forum')
 Topic = get_model('forum_conversation', 'Topic')
@@ -72,9 +75,35 @@ class ForumView(PermissionRequiredMixin, ListView):
     def get_queryset(self):
         self.forum = self.get_forum()
         qs = self.forum.topics.exclude(type=Topic.TYPE_CHOICES.topic_announce).exclude(approved=False) \
-            .select_related('poster')
+            .with_list_data()
         return qs
 
+    def get_announces(self):
+        """
+        Returns the announces of the forum, which are displayed on each page of the forum.
+        """
+        if not hasattr(self, 'announces'):
+            self.announces = self.get_forum().topics.filter(type=Topic.TYPE_CHOICES.topic_announce) \
+                .with_list_data()
+        return self.announces
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        # The number of topics displayed in the forum is computed using the topics counts of the
+        # forum and of its children (which include the topics of their descendants) so that the
+        # topics do not need to be counted.
+        forum = self.get_forum()
+        children_topics_count = Forum.objects.filter(parent=forum) \
+            .aggregate(topics_count=Sum('topics_count'))['topics_count'] or 0
+        approved_announces_count = len([a for a in self.get_announces() if a.approved])
+        kwargs['count'] = forum.topics_count - children_topics_count - approved_announces_count
+
+        if machina_settings.KEYSET_PAGINATION:
+            return CursorPaginator(
+                queryset, per_page, keys=['-type', '-last_post_on', '-id'],
+                after=self.request.GET.get('after'), before=self.request.GET.get('before'),
+                **kwargs)
+        return CountedPaginator(queryset, per_page, **kwargs)
+
     def get_controlled_object(self):
         return self.get_forum()
 
@@ -90,7 +119,7 @@ class ForumView(PermissionRequiredMixin, ListView):
             .forum_list_filter(sub_forums, self.request.user)
 
         # The announces will be displayed on each page of the forum
-        context['announces'] = self.get_forum().topics.filter(type=Topic.TYPE_CHOICES.topic_announce)
+        context['announces'] = self.get_announces()
 
         return context
 
@@ -4,23 +4,35 @@
 from __future__ import unicode_literals
 
 # Third party imports
+from django import VERSION as DJANGO_VERSION
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F
 from django.db.models import Q
 from django.utils.encoding import force_text
 from django.utils.encoding import python_2_unicode_compatible
+from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
 from model_utils import Choices
 
 # Local application / specific library imports
+from machina.apps.forum.deletion import deletion_engine
+from machina.apps.forum.trackers import trackers_updater
+from machina.core.compat import atomic
 from machina.core.compat import slugify
 from machina.core.loading import get_class
-from machina.core.utils import refresh
 from machina.models.abstract_models import DatedModel
+from machina.models.abstract_models import DirtyFieldsModel
 from machina.models.fields import MarkupTextField
 
+if DJANGO_VERSION >= (1, 8):
+    from django.db.models import Case
+    from django.db.models import Value
+    from django.db.models import When
+
 ApprovedManager = get_class('forum_conversation.managers', 'ApprovedManager')
+TopicManager = get_class('forum_conversation.managers', 'TopicManager')
 
 
 TOPIC_TYPES = Choices(
@@ -37,7 +49,7 @@ TOPIC_STATUSES = Choices(
 
 
 @python_2_unicode_compatible
-class AbstractTopic(DatedModel):
+class AbstractTopic(DatedModel, DirtyFieldsModel):
     """
     Represents a forum topic.
     """
@@ -69,10 +81,21 @@ class AbstractTopic(DatedModel):
     # The date of the latest post
     last_post_on = models.DateTimeField(verbose_name=_('Last post added on'), blank=True, null=True)
 
+    # The first post and the latest approved post of the topic
+    first_post = models.ForeignKey(
+        'forum_conversation.Post', verbose_name=_('First post'), related_name='+',
+        blank=True, null=True, editable=False, on_delete=models.SET_NULL)
+    last_post = models.ForeignKey(
+        'forum_conversation.Post', verbose_name=_('Last post'), related_name='+',
+        blank=True, null=True, editable=False, on_delete=models.SET_NULL)
+
     # Many users can subscribe to this topic
     subscribers = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='subscriptions', verbose_name=_('Subscribers'), blank=True)
 
-    objects = models.Manager()
+    # The changes of the forum of a topic must be detected when saving it
+    tracked_fields = ('forum', )
+
+    objects = TopicManager()
     approved_objects = ApprovedManager()
 
     class Meta:
@@ -117,28 +140,6 @@ class AbstractTopic(DatedModel):
         """
         return self.status == self.STATUS_CHOICES.topic_locked
 
-    @property
-    def first_post(self):
-        """
-        Try to fetch the first post associated with the current topic and caches it to
-        lighten the next request.
-        """
-        if not hasattr(self, '_first_post'):
-            posts = self.posts.select_related('poster').all().order_by('created')
-            self._first_post = posts[0] if len(posts) else None
-        return self._first_post
-
-    @property
-    def last_post(self):
-        """
-        Try to fetch the last post associated with the current topic and caches it to
-        lighten the next request.
-        """
-        if not hasattr(self, '_last_post'):
-            posts = self.posts.select_related('poster').filter(approved=True).order_by('-created')
-            self._last_post = posts[0] if len(posts) else None
-        return self._last_post
-
     def clean(self):
         super(AbstractTopic, self).clean()
         if self.forum.is_category or self.forum.is_link:
@@ -146,10 +147,10 @@ class AbstractTopic(DatedModel):
 
     def save(self, *args, **kwargs):
         # It is vital to track the changes of the forum associated with a topic in order to
-        # maintain counters up-to-date.
-        old_instance = None
-        if self.pk:
-            old_instance = self.__class__._default_manager.get(pk=self.pk)
+        # maintain counters up-to-date. The forum that was loaded from the database is kept by
+        # the instance.
+        forum_changed = self.has_changed('forum')
+        old_forum_id = self.get_loaded_value('forum') if forum_changed else None
 
         # Update the slug field
         self.slug = slugify(force_text(self.subject))
@@ -158,11 +159,11 @@ class AbstractTopic(DatedModel):
         super(AbstractTopic, self).save(*args, **kwargs)
 
         # If any change has been made to the parent forum, trigger the update of the counters
-        if old_instance and old_instance.forum != self.forum:
+        if forum_changed:
             self.update_trackers()
             # The previous parent forum counters should also be updated
-            if old_instance.forum:
-                old_forum = refresh(old_instance.forum)
+            if old_forum_id:
+                old_forum = self.forum.__class__._default_manager.get(pk=old_forum_id)
                 old_forum.update_trackers()
 
     def _simple_save(self, *args, **kwargs):
@@ -177,22 +178,80 @@ class AbstractTopic(DatedModel):
         super(AbstractTopic, self).save(*args, **kwargs)
 
     def delete(self, using=None):
-        super(AbstractTopic, self).delete(using)
-        self.forum.update_trackers()
+        # The posts of the topic are deleted by batches ; the trackers of the forum are updated
+        # once the topic is deleted.
+        deletion_engine.delete_topics([self.pk, ])
 
     def update_trackers(self):
         """
-        Updates the posts count, the update date and the link toward the last post
-        associated with the current topic.
+        Updates the posts count, the update date and the links toward the first post and the last
+        post associated with the current topic.
+        If the trackers updates are deferred, the topic is only marked as dirty and its trackers
+        will be computed again once the deferral block is left.
         """
-        self.posts_count = self.posts.filter(approved=True).count()
-        posts = self.posts.filter(approved=True).order_by('-created')
-        self._last_post = posts[0] if posts.exists() else None
-        self.last_post_on = self._last_post.created if self._last_post else None
-        self._simple_save()
+        if trackers_updater.add_topic(self):
+            return
+
+        self._update_trackers()
         # Trigger the forum-level trackers update
         self.forum.update_trackers()
 
+    def _update_trackers(self):
+        """
+        Computes again the trackers of the current topic without updating its forum.
+        """
+        self.posts_count = self.posts.filter(approved=True).count()
+        first_posts = list(self.posts.order_by('created')[:1])
+        self.first_post = first_posts[0] if first_posts else None
+        last_posts = list(self.posts.filter(approved=True).order_by('-created')[:1])
+        self.last_post = last_posts[0] if last_posts else None
+        self.last_post_on = self.last_post.created if self.last_post else None
+        self._simple_save()
+
+    def update_trackers_for_new_post(self, post):
+        """
+        Updates the posts count, the last post and the last post date of the current topic and of
+        the forums containing it after the creation of the given post. The counters are
+        incremented by using F() expressions so that they do not need to be computed again.
+        """
+        is_topic_head = post.is_topic_head
+        posts_delta = 1 if post.approved else 0
+        last_post_on = post.created if post.approved else None
+
+        # Update the topic ; note that the subject and the approved flag of the topic should
+        # correspond to the ones of its first post.
+        self.updated = now()
+        topics = self.__class__._default_manager.filter(pk=self.pk)
+        values = dict(
+            posts_count=F('posts_count') + posts_delta, subject=self.subject,
+            approved=self.approved, first_post=self.first_post_id, updated=self.updated)
+        is_older = Q(last_post_on__isnull=True) | Q(last_post_on__lt=last_post_on)
+        if DJANGO_VERSION >= (1, 8) and last_post_on:
+            # The last post is updated by the same query if it is older than the new post
+            values['last_post_on'] = Case(
+                When(is_older, then=Value(last_post_on)), default=F('last_post_on'),
+                output_field=models.DateTimeField())
+            values['last_post'] = Case(
+                When(is_older, then=Value(post.pk)), default=F('last_post'),
+                output_field=models.IntegerField())
+            topics.update(**values)
+        else:
+            topics.update(**values)
+            if last_post_on:
+                topics.filter(is_older).update(last_post_on=last_post_on, last_post=post)
+        self.posts_count += posts_delta
+        if last_post_on:
+            if self.last_post_on is None or self.last_post_on < last_post_on:
+                self.last_post_on = last_post_on
+                self.last_post = post
+
+        # Update the forum-level trackers ; the topic is taken into account by the forums
+        # counters when its first post is created.
+        topics_delta = 1 if is_topic_head and self.approved else 0
+        self.forum.apply_trackers_deltas(
+            posts_delta=posts_delta, topics_delta=topics_delta,
+            last_post=post if last_post_on and self.approved else None)
+
     def get_absolute_url(self):
         from django.core.urlresolvers import reverse
         return reverse('forum_conversation:topic', kwargs={
@@ -201,7 +260,7 @@ class AbstractTopic(DatedModel):
 
 
 @python_2_unicode_compatible
-class AbstractPost(DatedModel):
+class AbstractPost(DatedModel, DirtyFieldsModel):
     """
     Represents a forum post. A forum post is always linked to a topic.
     """
@@ -229,6 +288,13 @@ class AbstractPost(DatedModel):
     updated_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name=_('Lastly updated by'), editable=False, blank=True, null=True)
     updates_count = models.PositiveIntegerField(verbose_name=_('Updates count'), editable=False, blank=True, default=0)
 
+    # The position of each approved post among the approved posts of its topic is stored in order
+    # to compute the page of a post without counting the previous posts
+    sequence = models.PositiveIntegerField(verbose_name=_('Sequence number'), editable=False, blank=True, null=True)
+
+    # The changes of the approval status of a post must be detected when saving it
+    tracked_fields = ('approved', )
+
     objects = models.Manager()
     approved_objects = ApprovedManager()
 
@@ -237,6 +303,7 @@ class AbstractPost(DatedModel):
         app_label = 'forum_conversation'
         ordering = ['created', ]
         get_latest_by = 'created'
+        index_together = [['topic', 'sequence'], ]
         verbose_name = _('Post')
         verbose_name_plural = _('Posts')
 
@@ -248,41 +315,114 @@ class AbstractPost(DatedModel):
         """
         Returns True if the post is the first post of the topic.
         """
-        return self.topic.first_post.id == self.id
+        return self.topic.first_post_id == self.id
 
     @property
     def is_topic_tail(self):
         """
         Returns True if the post is the last post of the topic.
         """
-        return self.topic.last_post.id == self.id
+        return self.topic.last_post_id == self.id
 
     @property
     def position(self):
         """
-        Returns an integer corresponding to the position of the post in the topic.
+        Returns an integer corresponding to the position of the post in the topic. The stored
+        sequence number is used if the post is approved ; otherwise the position is computed.
         """
+        if self.sequence is not None:
+            return self.sequence
         position = self.topic.posts.filter(Q(created__lt=self.created) | Q(id=self.id)).count()
         return position
 
     def save(self, *args, **kwargs):
+        if self.pk is None:
+            # A new post is inserted in the same transaction as the one in which the row of its
+            # topic is locked in order to compute its sequence number (see _save()).
+            atomic_kwargs = {'savepoint': False} if DJANGO_VERSION >= (1, 6) else {}
+            with atomic(**atomic_kwargs):
+                self._save(True, *args, **kwargs)
+        else:
+            self._save(False, *args, **kwargs)
+
+    def _save(self, created, *args, **kwargs):
+        # Maintain the sequence numbers of the approved posts of the topic: a new post is
+        # appended to the topic while a post that is approved (or disapproved) shifts the
+        # posts that follow it.
+        if created:
+            if self.approved and self.sequence is None:
+                self.sequence = self._get_next_sequence()
+        elif self.has_changed('approved'):
+            self._update_sequences()
+
         super(AbstractPost, self).save(*args, **kwargs)
 
+        # The first post created inside a topic is the head of the topic
+        if created and self.topic.first_post_id is None:
+            self.topic.first_post = self
+
         # Ensures that the subject of the thread corresponds to the one associated
         # with the first post. Do the same with the 'approved' flag.
         if self.is_topic_head:
             if self.subject != self.topic.subject or self.approved != self.topic.approved:
                 self.topic.subject = self.subject
                 self.topic.approved = self.approved
-
-        # Trigger the topic-level trackers update
-        self.topic.update_trackers()
+                if not created:
+                    # The topic row is updated right away: if the trackers updates are deferred,
+                    # the topic will be fetched again from the database before being saved.
+                    self.topic.__class__._default_manager.filter(pk=self.topic.pk) \
+                        .update(subject=self.subject, approved=self.approved)
+
+        # Trigger the topic-level trackers update ; the counters are incremented if the post is
+        # being created, otherwise they are computed again.
+        if created:
+            self.topic.update_trackers_for_new_post(self)
+        else:
+            self.topic.update_trackers()
 
     def delete(self, using=None):
-        if self.is_topic_head and self.is_topic_tail:
+        # Note that the last post of a topic only considers its approved posts: whether the
+        # considered post is the last one of the topic cannot be used to know if it is alone.
+        if self.is_topic_head and not self.topic.posts.exclude(pk=self.pk).exists():
             # The default way of operating is to trigger the deletion of the associated topic
             # only if the considered post is the only post embedded in the topic
             self.topic.delete()
         else:
+            if self.approved:
+                self._shift_next_posts_sequences(-1)
             super(AbstractPost, self).delete(using)
             self.topic.update_trackers()
+
+    def _get_next_sequence(self):
+        """
+        Returns the sequence number of a new approved post of the topic. The posts count of the
+        topic is read from the database while the row of the topic is locked until the end of the
+        current transaction, so that the posts that are concurrently appended to the topic (or
+        that are saved using outdated topic instances) get distinct sequence numbers.
+        """
+        posts_count = self.topic.__class__._default_manager.select_for_update() \
+            .filter(pk=self.topic_id).values_list('posts_count', flat=True)[0]
+        return posts_count + 1
+
+    def _update_sequences(self):
+        """
+        Updates the sequence number of the current post and of the posts that follow it after a
+        change of the approval status of the current post.
+        """
+        if self.approved:
+            self.sequence = self.topic.posts.filter(approved=True).filter(
+                Q(created__lt=self.created) | Q(created=self.created, pk__lt=self.pk)).count() + 1
+            self._shift_next_posts_sequences(1)
+        else:
+            self._shift_next_posts_sequences(-1)
+            self.sequence = None
+
+    def _shift_next_posts_sequences(self, delta):
+        """
+        Shifts the sequence numbers of the approved posts that follow the current post in its
+        topic. The posts are selected using their creation dates so that the sequence number of
+        the current post (which can be outdated) is not used.
+        """
+        self.topic.posts.filter(sequence__isnull=False) \
+            .filter(Q(created__gt=self.created) | Q(created=self.created, pk__gt=self.pk)) \
+            .update(sequence=F('sequence') + delta)
@@ -19,6 +19,7 @@ Topic = get_model('forum_conversation', 'Topic')
 TopicPoll = get_model('forum_polls', 'TopicPoll')
 
 PermissionHandler = get_class('forum_permission.handler', 'PermissionHandler')
+PostingHandler = get_class('forum_conversation.handler', 'PostingHandler')
 
 
 class PostForm(forms.ModelForm):
@@ -80,7 +81,11 @@ class PostForm(forms.ModelForm):
                 post.username = self.cleaned_data['username']
 
         if commit:
-            post.save()
+            if post.pk:
+                post.save()
+            else:
+                # New posts are created by the posting handler
+                PostingHandler().create_post(post, forum=self.forum)
 
         return post
 
@@ -157,8 +162,12 @@ class TopicForm(PostForm):
             if not self.user.is_anonymous():
                 topic.poster = self.user
             self.topic = topic
+
+            # The topic and its first post are created together by the posting handler
+            post = super(TopicForm, self).save(commit=False)
             if commit:
-                topic.save()
+                PostingHandler().create_topic(topic, post)
+            return post
         else:
             if 'topic_type' in self.cleaned_data and len(self.cleaned_data['topic_type']):
                 if self.instance.topic.type != self.cleaned_data['topic_type']:
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+# Third party imports
+# Local application / specific library imports
+from machina.core.compat import atomic
+
+
+class PostingHandler(object):
+    """
+    The PostingHandler allows to create topics and posts. Each post is created inside a single
+    transaction by using a constant number of queries whatever the number of posts of the topic
+    and the depth of the forum in the tree of forums: the posts count of the poster is
+    incremented, the post is inserted and the trackers of the topic and of the forums containing
+    it are updated by using F() expressions.
+    """
+    def create_topic(self, topic, post):
+        """
+        Saves the given new topic and its first post.
+        """
+        with atomic():
+            topic.save()
+            post.topic = topic
+            return self._create_post(post, topic.forum)
+
+    def create_post(self, post, forum=None):
+        """
+        Saves the given new post. The forum of the topic of the post can be passed in order to
+        avoid fetching it again.
+        """
+        with atomic():
+            return self._create_post(post, forum)
+
+    def _create_post(self, post, forum):
+        topic = post.topic
+        if forum is not None and topic.forum_id == forum.pk:
+            topic.forum = forum
+        post.save()
+        return post
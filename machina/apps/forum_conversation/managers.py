@@ -27,3 +27,29 @@ class ApprovedManager(models.Manager):
 
     if DJANGO_VERSION < (1, 6):  # pragma: no cover
         get_query_set = get_queryset
+
+
+class TopicQuerySet(models.query.QuerySet):
+    def with_list_data(self):
+        """
+        Returns the topics with the data that is displayed in the lists of topics: the forums and
+        the posters of the topics are fetched using joins while the first and the last posts of
+        the topics (and the posters of the last posts) are fetched using one query each, whatever
+        the number of topics.
+        """
+        return self.select_related('forum', 'poster') \
+            .prefetch_related('first_post', 'last_post', 'last_post__poster')
+
+
+class TopicManager(models.Manager):
+    def get_queryset(self):
+        return TopicQuerySet(self.model, using=self._db)
+
+    if DJANGO_VERSION < (1, 6):  # pragma: no cover
+        get_query_set = get_queryset
+
+    def with_list_data(self):
+        """
+        Returns all the topics with the data that is displayed in the lists of topics.
+        """
+        return self.get_queryset().with_list_data()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.db.models.deletion
+
+
+def set_first_and_last_posts(apps, schema_editor):
+    Topic = apps.get_model('forum_conversation', 'Topic')
+    Post = apps.get_model('forum_conversation', 'Post')
+    for topic in Topic.objects.all().iterator():
+        posts = Post.objects.filter(topic=topic)
+        first_posts = list(posts.order_by('created').values_list('id', flat=True)[:1])
+        last_posts = list(
+            posts.filter(approved=True).order_by('-created').values_list('id', flat=True)[:1])
+        Topic.objects.filter(pk=topic.pk).update(
+            first_post=first_posts[0] if first_posts else None,
+            last_post=last_posts[0] if last_posts else None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum_conversation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='first_post',
+            field=models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to='forum_conversation.Post', null=True, verbose_name='First post'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='last_post',
+            field=models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to='forum_conversation.Post', null=True, verbose_name='Last post'),
+        ),
+        migrations.RunPython(set_first_and_last_posts, migrations.RunPython.noop),
+    ]
@@ -2,16 +2,17 @@
 
 # Standard library imports
 # Third party imports
-from django.db.models import F
 from django.dispatch import receiver
 
 # Local application / specific library imports
+from machina.apps.forum.counters import topic_views_counter
 from machina.apps.forum_conversation.signals import topic_viewed
 
 
 @receiver(topic_viewed)
 def update_topic_counter(sender, topic, user, request, response, **kwargs):
     """
-    Receiver to handle the update of the views counter associated with topics.
+    Receiver to handle the update of the views counter associated with topics. The increments
+    can be buffered (see the MACHINA_VIEW_COUNTERS_BUFFERED setting).
     """
-    topic.__class__._default_manager.filter(id=topic.id).update(views_count=F('views_count') + 1)
+    topic_views_counter.incr(topic.id)
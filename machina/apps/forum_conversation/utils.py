@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
 # Standard library imports
+from collections import defaultdict
+
 # Third party imports
 # Local application / specific library imports
+from machina.core.utils import iter_slices
 
 
 def get_client_ip(request):
@@ -15,3 +18,27 @@ def get_client_ip(request):
     else:
         ip = request.META.get('REMOTE_ADDR')
     return ip
+
+
+def update_posts_sequences(posts):
+    """
+    Computes again the sequence numbers of the approved posts among the given posts, which should
+    contain all the posts of the considered topics. The posts whose sequence number changed are
+    grouped by sequence number so that they can be updated using a few queries. Returns the
+    number of posts that were updated.
+    """
+    pks_by_sequence = defaultdict(list)
+    current_topic_id, sequence = None, 0
+    for pk, topic_id, current_sequence in posts.filter(approved=True) \
+            .order_by('topic_id', 'created', 'pk').values_list('pk', 'topic_id', 'sequence'):
+        if topic_id != current_topic_id:
+            current_topic_id, sequence = topic_id, 0
+        sequence += 1
+        if current_sequence != sequence:
+            pks_by_sequence[sequence].append(pk)
+
+    updated = 0
+    for sequence, pks in pks_by_sequence.items():
+        for ids in iter_slices(pks):
+            updated += posts.model._default_manager.filter(pk__in=ids).update(sequence=sequence)
+    return updated
@@ -19,6 +19,8 @@ from machina.apps.forum_conversation.utils import get_client_ip
 from machina.conf import settings as machina_settings
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
+from machina.core.paginator import CountedPaginator
+from machina.core.paginator import SequencePaginator
 
 Attachment = get_model('forum_attachments', 'Attachment')
 Forum = get_model('forum', 'Forum')
@@ -58,7 +60,8 @@ class TopicView(PermissionRequiredMixin, ListView):
             try:
                 assert requested_post.isdigit()
                 post = topic.posts.get(pk=requested_post)
-                requested_page = (post.position // machina_settings.TOPIC_POSTS_NUMBER_PER_PAGE) + 1
+                requested_page = \
+                    ((post.position - 1) // machina_settings.TOPIC_POSTS_NUMBER_PER_PAGE) + 1
                 request.GET = request.GET.copy()  # A QueryDict is immutable
                 request.GET.update({'page': requested_page})
             except (Post.DoesNotExist, AssertionError):
@@ -82,6 +85,13 @@ class TopicView(PermissionRequiredMixin, ListView):
             .prefetch_related('attachments', 'poster__forum_profile')
         return qs
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        # The number of approved posts of the topic is already known
+        kwargs['count'] = self.get_topic().posts_count
+        if machina_settings.KEYSET_PAGINATION:
+            return SequencePaginator(queryset, per_page, **kwargs)
+        return CountedPaginator(queryset, per_page, **kwargs)
+
     def get_controlled_object(self):
         return self.get_topic().forum
 
@@ -93,6 +103,10 @@ class TopicView(PermissionRequiredMixin, ListView):
         context['topic'] = topic
         context['forum'] = topic.forum
 
+        # Computes the permissions related to the displayed posts at once
+        self.request.forum_permission_handler.annotate_post_permissions(
+            context['posts'], self.request.user)
+
         # Handles the case when a poll is associated to the topic
         try:
             if hasattr(topic, 'poll') and topic.poll.options.exists():
@@ -15,7 +15,6 @@ Forum = get_model('forum', 'Forum')
 Topic = get_model('forum_conversation', 'Topic')
 
 PermissionHandler = get_class('forum_permission.handler', 'PermissionHandler')
-perm_handler = PermissionHandler()
 
 
 class LastTopicsFeed(Feed):
@@ -35,6 +34,10 @@ class LastTopicsFeed(Feed):
         forum_pk = kwargs.get('forum_pk', None)
         descendants = kwargs.get('descendants', None)
         self.user = request.user
+        # The permission handler attached to the request is used if possible ; otherwise a new
+        # handler is created for the considered request.
+        perm_handler = request.forum_permission_handler \
+            if hasattr(request, 'forum_permission_handler') else PermissionHandler()
 
         if forum_pk:
             forum = get_object_or_404(Forum, pk=forum_pk)
@@ -47,7 +50,8 @@ class LastTopicsFeed(Feed):
                 Forum.objects.all(), request.user)
 
     def items(self):
-        return Topic.objects.filter(forum__in=self.forums, approved=True).order_by('-last_post_on')
+        return Topic.objects.filter(forum__in=self.forums, approved=True).order_by('-last_post_on') \
+            .with_list_data()
 
     def item_pubdate(self, item):
         return item.created
@@ -11,9 +11,12 @@ from django.utils.translation import ugettext_lazy as _
 
 # Local application / specific library imports
 from machina.conf import settings as machina_settings
+from machina.core.loading import get_class
 from machina.models.fields import ExtendedImageField
 from machina.models.fields import MarkupTextField
 
+ForumProfileManager = get_class('forum_member.managers', 'ForumProfileManager')
+
 
 @python_2_unicode_compatible
 class AbstractForumProfile(models.Model):
@@ -33,6 +36,8 @@ class AbstractForumProfile(models.Model):
     # The amount of posts the user has posted
     posts_count = models.PositiveIntegerField(verbose_name=_('Total posts'), blank=True, default=0)
 
+    objects = ForumProfileManager()
+
     class Meta:
         abstract = True
         app_label = 'forum_member'
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from collections import defaultdict
+
+# Third party imports
+from django.db import models
+from django.db.models import F
+
+# Local application / specific library imports
+from machina.core.utils import iter_slices
+
+
+class ForumProfileManager(models.Manager):
+    def update_posts_counts(self, posts_counts, create=False):
+        """
+        Applies the given changes (a dictionary mapping user IDs to posts count changes) to the
+        posts counts of the forum profiles. The profiles that receive the same change are updated
+        using a single query ; the posts counts cannot become negative. If the create argument is
+        set to True, the missing profiles are created first.
+        """
+        user_ids_by_delta = defaultdict(list)
+        for user_id, delta in posts_counts.items():
+            if delta:
+                user_ids_by_delta[delta].append(user_id)
+
+        if create:
+            user_ids = [user_id for ids in user_ids_by_delta.values() for user_id in ids]
+            existing_user_ids = set()
+            for ids in iter_slices(user_ids):
+                existing_user_ids.update(
+                    self.filter(user_id__in=ids).values_list('user_id', flat=True))
+            self.bulk_create([
+                self.model(user_id=user_id) for user_id in user_ids
+                if user_id not in existing_user_ids])
+
+        for delta, user_ids in user_ids_by_delta.items():
+            for ids in iter_slices(user_ids):
+                profiles = self.filter(user_id__in=ids)
+                if delta < 0:
+                    profiles.filter(posts_count__lt=-delta).update(posts_count=0)
+                    profiles = profiles.filter(posts_count__gte=-delta)
+                profiles.update(posts_count=F('posts_count') + delta)
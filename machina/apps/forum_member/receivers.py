@@ -11,6 +11,7 @@ from django.db.models.signals import post_delete
 from django.dispatch import receiver
 
 # Local application / specific library imports
+from machina.apps.forum.deletion import deletion_engine
 from machina.core.loading import get_class
 
 Post = get_class('forum_conversation.models', 'Post')
@@ -23,29 +24,33 @@ def increase_posts_count(sender, instance, **kwargs):
     Receiver to handle the update of the profile related to the user
     who is the poster of the forum post being created or updated.
     """
-    if instance.poster is None:
+    if instance.poster_id is None:
         # An anonymous post is considered. No profile can be updated in
         # that case.
         return
 
-    profile, dummy = ForumProfile.objects.get_or_create(user=instance.poster)
     increase_posts_count = False
 
-    if instance.pk:
+    if instance.pk and not instance._state.adding:
         try:
-            old_instance = instance.__class__._default_manager.get(pk=instance.pk)
+            # The approval status that was loaded from the database is kept by the instance
+            approved_changed = instance.has_changed('approved')
         except ObjectDoesNotExist:  # pragma: no cover
             # This should never happen (except with django loaddata command)
-            increase_posts_count = True
-            old_instance = None
-        if old_instance and old_instance.approved is False and instance.approved is True:
+            approved_changed = True
+        if approved_changed and instance.approved is True:
             increase_posts_count = True
     elif instance.approved:
         increase_posts_count = True
 
+    # The profile is updated using a single query if it already exists
+    profiles = ForumProfile.objects.filter(user_id=instance.poster_id)
+    if increase_posts_count and profiles.update(posts_count=F('posts_count') + 1):
+        return
+
+    profile, created = ForumProfile.objects.get_or_create(user_id=instance.poster_id)
     if increase_posts_count:
-        profile.posts_count = F('posts_count') + 1
-        profile.save()
+        profiles.update(posts_count=F('posts_count') + 1)
 
 
 @receiver(post_delete, sender=Post)
@@ -54,11 +59,15 @@ def decrease_posts_count(sender, instance, **kwargs):
     Receiver to handle the deletion of a forum posts: the posts count
     related to the post's author is decreased.
     """
-    if instance.poster is None:
-        # An anonymous post is considered. No profile can be updated in
-        # that case.
+    if instance.poster_id is None or not instance.approved:
+        # An anonymous post or a post awaiting approval is considered. No
+        # profile should be updated in that case because such posts are not
+        # taken into account by the posts counts.
+        return
+
+    # The posts counts are updated using grouped queries when the posts are deleted by batches
+    if deletion_engine.add_posts_count_delta(instance.poster_id, -1):
         return
 
-    profile, dummy = ForumProfile.objects.get_or_create(user=instance.poster)
-    profile.posts_count = F('posts_count') - 1
-    profile.save()
+    ForumProfile.objects.filter(user_id=instance.poster_id, posts_count__gt=0) \
+        .update(posts_count=F('posts_count') - 1)
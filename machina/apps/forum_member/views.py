@@ -25,9 +25,6 @@ Topic = get_model('forum_conversation', 'Topic')
 
 ForumProfileForm = get_class('forum_member.forms', 'ForumProfileForm')
 
-PermissionHandler = get_class('forum_permission.handler', 'PermissionHandler')
-perm_handler = PermissionHandler()
-
 
 class UserTopicsView(ListView):
     """
@@ -39,13 +36,13 @@ class UserTopicsView(ListView):
     paginate_by = machina_settings.FORUM_TOPICS_NUMBER_PER_PAGE
 
     def get_queryset(self):
-        forums = perm_handler.forum_list_filter(
+        forums = self.request.forum_permission_handler.forum_list_filter(
             Forum.objects.all(), self.request.user)
         topics = Topic.objects.filter(
             forum__in=forums,
             posts__poster_id=self.request.user.id,
             posts__approved=True)
-        return topics.order_by('-updated')
+        return topics.order_by('-updated').with_list_data()
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
@@ -26,6 +26,10 @@ class ModerationApp(Application):
     moderation_queue_detail_view = get_class('forum_moderation.views', 'ModerationQueueDetailView')
     post_approve_view = get_class('forum_moderation.views', 'PostApproveView')
     post_disapprove_view = get_class('forum_moderation.views', 'PostDisapproveView')
+    posts_approve_view = get_class('forum_moderation.views', 'PostsApproveView')
+    posts_disapprove_view = get_class('forum_moderation.views', 'PostsDisapproveView')
+    topics_delete_view = get_class('forum_moderation.views', 'TopicsDeleteView')
+    topics_move_view = get_class('forum_moderation.views', 'TopicsMoveView')
 
     def get_urls(self):
         return [
@@ -39,7 +43,11 @@ class ModerationApp(Application):
                 self.topic_update_to_sticky_topic_view.as_view(), name='topic_update_to_sticky'),
             url(_(r'^topic/(?P<slug>[\w-]+)-(?P<pk>\d+)/change/announce/$'),
                 self.topic_update_to_announce_view.as_view(), name='topic_update_to_announce'),
+            url(_(r'^topics/delete/$'), self.topics_delete_view.as_view(), name='topics_delete'),
+            url(_(r'^topics/move/$'), self.topics_move_view.as_view(), name='topics_move'),
             url(_(r'^queue/$'), self.moderation_queue_list_view.as_view(), name='queue'),
+            url(_(r'^queue/approve/$'), self.posts_approve_view.as_view(), name='approve_queued_posts'),
+            url(_(r'^queue/disapprove/$'), self.posts_disapprove_view.as_view(), name='disapprove_queued_posts'),
             url(_(r'^queue/(?P<pk>\d+)/$'), self.moderation_queue_detail_view.as_view(), name='queued_post'),
             url(_(r'^queue/(?P<pk>\d+)/approve/$'), self.post_approve_view.as_view(), name='approve_queued_post'),
             url(_(r'^queue/(?P<pk>\d+)/disapprove/$'), self.post_disapprove_view.as_view(), name='disapprove_queued_post'),
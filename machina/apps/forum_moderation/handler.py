@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+from collections import defaultdict
+
+# Third party imports
+from django.db.models import Count
+
+# Local application / specific library imports
+from machina.apps.forum.deletion import deletion_engine
+from machina.apps.forum.trackers import trackers_updater
+from machina.apps.forum_conversation.utils import update_posts_sequences
+from machina.core.compat import atomic
+from machina.core.db.models import get_model
+from machina.core.utils import iter_slices
+
+Forum = get_model('forum', 'Forum')
+ForumProfile = get_model('forum_member', 'ForumProfile')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+class ModerationHandler(object):
+    """
+    The ModerationHandler allows to approve, disapprove, delete or move many posts or topics at
+    once. The objects are identified by their primary keys and are updated or deleted using
+    queries that operate on sets of objects (the posts and the topics are deleted by batches by
+    the deletion engine). The trackers of the topics and of the forums that are affected by an
+    action are computed again only once, after the action was performed.
+    """
+    def get_posts_forums(self, post_ids):
+        """
+        Returns the list of the forums containing the given posts.
+        """
+        return self._get_forums(Post._default_manager.all(), 'topic__forum', post_ids)
+
+    def get_topics_forums(self, topic_ids):
+        """
+        Returns the list of the forums containing the given topics.
+        """
+        return self._get_forums(Topic._default_manager.all(), 'forum', topic_ids)
+
+    def approve_posts(self, post_ids):
+        """
+        Approves the given posts. The posts that are already approved are left untouched.
+        Returns the number of posts that were approved.
+        """
+        with atomic():
+            posts = []
+            for ids in iter_slices(post_ids):
+                posts += Post._default_manager.filter(pk__in=ids, approved=False) \
+                    .values_list('pk', 'topic_id', 'poster_id')
+            if not posts:
+                return 0
+
+            for ids in iter_slices(pk for pk, _, _ in posts):
+                Post._default_manager.filter(pk__in=ids).update(approved=True)
+                # The approval status of a topic is the one of its first post
+                Topic._default_manager.filter(first_post__in=ids).update(approved=True)
+
+            topic_ids = set(topic_id for _, topic_id, _ in posts)
+            for ids in iter_slices(sorted(topic_ids)):
+                update_posts_sequences(Post._default_manager.filter(topic_id__in=ids))
+
+            # Increase the posts counts of the posters
+            posts_counts = defaultdict(int)
+            for _, _, poster_id in posts:
+                if poster_id is not None:
+                    posts_counts[poster_id] += 1
+            ForumProfile._default_manager.update_posts_counts(posts_counts, create=True)
+
+            trackers_updater.add_ids(topic_ids=topic_ids)
+        return len(posts)
+
+    def disapprove_posts(self, post_ids):
+        """
+        Disapproves (that is deletes) the given posts. Only the posts awaiting approval are
+        considered. The topics whose posts are all disapproved are deleted too.
+        Returns the number of posts that were disapproved.
+        """
+        with atomic(), trackers_updater.defer():
+            posts = []
+            for ids in iter_slices(post_ids):
+                posts += Post._default_manager.filter(pk__in=ids, approved=False) \
+                    .values_list('pk', 'topic_id')
+            if not posts:
+                return 0
+
+            disapproved_counts = defaultdict(int)
+            for _, topic_id in posts:
+                disapproved_counts[topic_id] += 1
+
+            # A topic is deleted if all its posts are disapproved, as done when its last
+            # remaining post is deleted.
+            deleted_topic_ids = set()
+            for ids in iter_slices(disapproved_counts):
+                for topic_id, posts_count in Post._default_manager.filter(topic_id__in=ids) \
+                        .order_by().values('topic_id').annotate(posts_count=Count('id')) \
+                        .values_list('topic_id', 'posts_count'):
+                    if posts_count == disapproved_counts[topic_id]:
+                        deleted_topic_ids.add(topic_id)
+
+            # Only the first posts of the remaining topics have to be determined again ; the
+            # other trackers of the topics only consider approved posts.
+            remaining_post_ids = [
+                pk for pk, topic_id in posts if topic_id not in deleted_topic_ids]
+            updated_topic_ids = set()
+            for ids in iter_slices(remaining_post_ids):
+                updated_topic_ids.update(
+                    Topic._default_manager.filter(first_post__in=ids)
+                    .values_list('pk', flat=True))
+            deletion_engine.delete_posts(remaining_post_ids)
+            deletion_engine.delete_topics(deleted_topic_ids)
+
+            trackers_updater.add_ids(topic_ids=updated_topic_ids)
+        return len(posts)
+
+    def delete_topics(self, topic_ids):
+        """
+        Deletes the given topics by batches. Returns the number of topics that were deleted.
+        """
+        return deletion_engine.delete_topics(topic_ids)
+
+    def move_topics(self, topic_ids, forum, lock=False):
+        """
+        Moves the given topics to the given forum. The moved topics are locked if the lock
+        argument is set to True. Returns the number of topics that were moved.
+        """
+        status = Topic.STATUS_CHOICES.topic_locked if lock else Topic.STATUS_CHOICES.topic_moved
+        moved_count, forum_ids = 0, set()
+        with atomic():
+            for ids in iter_slices(topic_ids):
+                topics = Topic._default_manager.filter(pk__in=ids).exclude(forum=forum)
+                forum_ids.update(topics.values_list('forum_id', flat=True))
+                moved_count += topics.update(forum=forum, status=status)
+            if moved_count:
+                forum_ids.add(forum.pk)
+            trackers_updater.add_ids(forum_ids=forum_ids)
+        return moved_count
+
+    def _get_forums(self, queryset, forum_lookup, ids):
+        forum_ids = set()
+        for ids_slice in iter_slices(ids):
+            forum_ids.update(
+                queryset.filter(pk__in=ids_slice).values_list(forum_lookup, flat=True))
+        return list(Forum._default_manager.filter(pk__in=forum_ids)) if forum_ids else []
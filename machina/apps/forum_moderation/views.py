@@ -12,6 +12,7 @@ from django.utils.translation import ugettext_lazy as _
 from django.views.generic import DeleteView
 from django.views.generic import DetailView
 from django.views.generic import ListView
+from django.views.generic import View
 from django.views.generic.detail import BaseDetailView
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.detail import SingleObjectTemplateResponseMixin
@@ -19,6 +20,7 @@ from django.views.generic.edit import FormMixin
 from django.views.generic.edit import ProcessFormView
 
 # Local application / specific library imports
+from machina.apps.forum.trackers import defer_trackers_updates
 from machina.conf import settings as machina_settings
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
@@ -29,6 +31,8 @@ Topic = get_model('forum_conversation', 'Topic')
 
 TopicMoveForm = get_class('forum_moderation.forms', 'TopicMoveForm')
 
+ModerationHandler = get_class('forum_moderation.handler', 'ModerationHandler')
+
 PermissionRequiredMixin = get_class('forum_permission.viewmixins', 'PermissionRequiredMixin')
 
 
@@ -162,7 +166,8 @@ class TopicDeleteView(PermissionRequiredMixin, DeleteView):
         """
         self.object = self.get_object()
         success_url = self.get_success_url()
-        self.object.delete()
+        with defer_trackers_updates():
+            self.object.delete()
         return HttpResponseRedirect(success_url)
 
     def get_success_url(self):
@@ -231,8 +236,9 @@ class TopicMoveView(PermissionRequiredMixin, SingleObjectTemplateResponseMixin,
         else:
             topic.status = Topic.STATUS_CHOICES.topic_moved
 
-        topic.save()
-        old_forum.save()
+        with defer_trackers_updates():
+            topic.save()
+            old_forum.save()
 
         messages.success(self.request, self.success_message)
         return HttpResponseRedirect(self.get_success_url())
@@ -407,7 +413,8 @@ class PostApproveView(PermissionRequiredMixin, SingleObjectTemplateResponseMixin
         self.object = self.get_object()
         success_url = self.get_success_url()
         self.object.approved = True
-        self.object.save()
+        with defer_trackers_updates():
+            self.object.save()
         return HttpResponseRedirect(success_url)
 
     def post(self, request, *args, **kwargs):
@@ -446,7 +453,8 @@ class PostDisapproveView(PermissionRequiredMixin, SingleObjectTemplateResponseMi
         """
         self.object = self.get_object()
         success_url = self.get_success_url()
-        self.object.delete()
+        with defer_trackers_updates():
+            self.object.delete()
         return HttpResponseRedirect(success_url)
 
     def post(self, request, *args, **kwargs):
@@ -468,3 +476,165 @@ class PostDisapproveView(PermissionRequiredMixin, SingleObjectTemplateResponseMi
 
     def perform_permissions_check(self, user, obj, perms):
         return self.request.forum_permission_handler.can_approve_posts(obj, user)
+
+
+class BulkModerationBaseView(PermissionRequiredMixin, View):
+    """
+    A base view providing the ability to moderate many posts or topics at once. The primary keys
+    of the considered objects are submitted using the ``pk`` field of a POST request and the
+    permission is checked for all the forums containing these objects at once.
+    """
+    http_method_names = ['post', ]
+    success_message = ''
+
+    # The following attributes should be defined in subclasses: the permission required to
+    # moderate the objects and the names of the methods of the moderation handler returning the
+    # forums containing the objects and performing the moderation action
+    permission = None
+    forums_getter = None
+    action = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # The permissions are not checked if the request cannot be handled anyway
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        return super(BulkModerationBaseView, self).dispatch(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        count = self.perform_action(self.get_object_ids())
+        messages.success(request, self.success_message.format(count=count))
+        return HttpResponseRedirect(self.get_success_url())
+
+    def get_object_ids(self):
+        """
+        Returns the primary keys of the objects that should be moderated.
+        """
+        if not hasattr(self, 'object_ids'):
+            self.object_ids = sorted(set(
+                int(pk) for pk in self.request.POST.getlist('pk') if pk.isdigit()))
+        return self.object_ids
+
+    def get_handler(self):
+        if not hasattr(self, 'handler'):
+            self.handler = ModerationHandler()
+        return self.handler
+
+    def get_forums(self):
+        """
+        Returns the list of the forums containing the objects that should be moderated.
+        """
+        return getattr(self.get_handler(), self.forums_getter)(self.get_object_ids())
+
+    def get_action_kwargs(self):
+        """
+        Returns the keyword arguments used to perform the moderation action.
+        """
+        return {}
+
+    def perform_action(self, object_ids):
+        """
+        Moderates the objects identified by the given primary keys and returns the number of
+        objects that were moderated.
+        """
+        return getattr(self.get_handler(), self.action)(object_ids, **self.get_action_kwargs())
+
+    def get_success_url(self):
+        # The user is redirected to the forum containing the objects if they all belong to the
+        # same forum.
+        forums = self.get_controlled_object()
+        if len(forums) == 1:
+            return reverse('forum:forum', kwargs={'slug': forums[0].slug, 'pk': forums[0].pk})
+        return reverse('forum:index')
+
+    # Permissions checks
+
+    def get_controlled_object(self):
+        if not hasattr(self, 'forums'):
+            self.forums = self.get_forums()
+        return self.forums
+
+    def perform_permissions_check(self, user, obj, perms):
+        return self.request.forum_permission_handler.has_perm_for_forums(
+            obj or [], user, self.permission)
+
+
+class PostsBulkModerationBaseView(BulkModerationBaseView):
+    """
+    A base view providing the ability to moderate many queued forum posts at once.
+    """
+    permission = 'can_approve_posts'
+    forums_getter = 'get_posts_forums'
+
+    def get_success_url(self):
+        return reverse('forum_moderation:queue')
+
+
+class PostsApproveView(PostsBulkModerationBaseView):
+    """
+    A view providing the ability to approve many queued forum posts at once.
+    """
+    action = 'approve_posts'
+    success_message = _('{count} posts have been approved successfully.')
+
+
+class PostsDisapproveView(PostsBulkModerationBaseView):
+    """
+    A view providing the ability to disapprove many queued forum posts at once.
+    """
+    action = 'disapprove_posts'
+    success_message = _('{count} posts have been disapproved successfully.')
+
+
+class TopicsBulkModerationBaseView(BulkModerationBaseView):
+    """
+    A base view providing the ability to moderate many forum topics at once.
+    """
+    forums_getter = 'get_topics_forums'
+
+
+class TopicsDeleteView(TopicsBulkModerationBaseView):
+    """
+    A view providing the ability to delete many forum topics at once.
+    """
+    # The can_delete_posts permission is used here because a user who can delete all the posts
+    # of a topic is also able to delete the topic itself.
+    permission = 'can_delete_posts'
+    action = 'delete_topics'
+    success_message = _('{count} topics have been deleted successfully.')
+
+
+class TopicsMoveView(TopicsBulkModerationBaseView):
+    """
+    A view providing the ability to move many forum topics at once. The destination forum is
+    submitted using the ``forum`` field of the POST request and the topics are locked if the
+    ``lock_topics`` field is set.
+    """
+    permission = 'can_move_topics'
+    action = 'move_topics'
+    success_message = _('{count} topics have been moved successfully.')
+
+    def get_destination_forum(self):
+        if not hasattr(self, 'destination_forum'):
+            forum_id = self.request.POST.get('forum', '')
+            self.destination_forum = Forum.objects.filter(
+                pk=int(forum_id), type=Forum.TYPE_CHOICES.forum_post).first() \
+                if forum_id.isdigit() else None
+        return self.destination_forum
+
+    def get_action_kwargs(self):
+        return {
+            'forum': self.get_destination_forum(),
+            'lock': bool(self.request.POST.get('lock_topics')),
+        }
+
+    def get_success_url(self):
+        forum = self.get_destination_forum()
+        return reverse('forum:forum', kwargs={'slug': forum.slug, 'pk': forum.pk})
+
+    # Permissions checks
+
+    def perform_permissions_check(self, user, obj, perms):
+        # The topics can only be moved to a forum from which topics can be moved too
+        destination_forum = self.get_destination_forum()
+        return bool(obj) and destination_forum is not None and super(TopicsMoveView, self) \
+            .perform_permissions_check(user, list(obj) + [destination_forum, ], perms)
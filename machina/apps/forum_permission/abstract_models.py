@@ -12,6 +12,10 @@ from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
 # Local application / specific library imports
+from machina.core.loading import get_class
+
+EffectiveForumPermissionManager = get_class(
+    'forum_permission.managers', 'EffectiveForumPermissionManager')
 
 
 @python_2_unicode_compatible
@@ -114,3 +118,30 @@ class AbstractGroupForumPermission(BaseAuthForumPermission):
         if self.forum:
             return '{} - {} - {}'.format(self.permission, self.group, self.forum)
         return '{} - {}'.format(self.permission, self.group)
+
+
+@python_2_unicode_compatible
+class AbstractEffectiveForumPermission(models.Model):
+    """
+    Represents the permissions that are effectively granted to a user (or to anonymous users) on
+    a specific forum. These permissions result from the combination of the user and group
+    permissions that apply to the considered forum and are stored as a permission mask.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name=_('User'), null=True, blank=True)
+    anonymous_user = models.BooleanField(
+        verbose_name=_('Target anonymous user'), default=False, db_index=True)
+    forum = models.ForeignKey(
+        'forum.Forum', related_name='effective_permissions', verbose_name=_('Forum'))
+    perms = models.BigIntegerField(verbose_name=_('Permissions mask'), default=0)
+
+    objects = EffectiveForumPermissionManager()
+
+    class Meta:
+        abstract = True
+        unique_together = ('user', 'forum', )
+        app_label = 'forum_permission'
+        verbose_name = _('Effective forum permission')
+        verbose_name_plural = _('Effective forum permissions')
+
+    def __str__(self):
+        return '{} - {}'.format(self.user if not self.anonymous_user else 'anonymous', self.forum)
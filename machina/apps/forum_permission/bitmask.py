@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import ugettext_lazy as _
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+from machina.core.loading import get_class
+
+ForumPermission = get_model('forum_permission', 'ForumPermission')
+
+PermissionConfig = get_class('forum_permission.defaults', 'PermissionConfig')
+
+
+class PermissionBitmask(object):
+    """
+    Maps each forum permission codename to a stable bit position so that the permissions granted
+    to a user for a specific forum can be represented by a single integer.
+    The permissions defined by the default permission configuration use the first bits (in the
+    order of their definition) ; the other forum permissions use the next bits, in the order of
+    their primary keys. This allows the masks to be shared between processes as long as the
+    extra forum permissions are only added: the extra bits are loaded again each time an unknown
+    codename or bit is encountered, for example when a forum permission was created by another
+    process. As the masks are stored in signed 64-bit integers, at most MAX_BITS forum
+    permissions can be defined.
+    """
+    MAX_BITS = 63
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """
+        Resets the codenames that are not part of the default permission configuration.
+        """
+        self._bits = dict(
+            (config['codename'], 1 << i) for i, config in enumerate(PermissionConfig.permissions))
+
+    def get_bit(self, codename):
+        """
+        Returns the bit associated with the given permission codename or 0 if the codename
+        cannot be found.
+        """
+        if codename not in self._bits:
+            self._load_extra_bits()
+        return self._bits.get(codename, 0)
+
+    def encode(self, codenames):
+        """
+        Returns the mask corresponding to the given permission codenames.
+        """
+        mask = 0
+        for codename in codenames:
+            mask |= self.get_bit(codename)
+        return mask
+
+    def decode(self, mask):
+        """
+        Returns the set of permission codenames corresponding to the given mask.
+        """
+        codenames = set(codename for codename, bit in self._bits.items() if mask & bit)
+        if mask & ~self.encode(codenames):
+            self._load_extra_bits()
+            codenames = set(codename for codename, bit in self._bits.items() if mask & bit)
+        return codenames
+
+    def _load_extra_bits(self):
+        default_codenames = [config['codename'] for config in PermissionConfig.permissions]
+        offset = len(default_codenames)
+        extra_codenames = list(
+            ForumPermission.objects.exclude(codename__in=default_codenames)
+            .order_by('pk').values_list('codename', flat=True))
+        if offset + len(extra_codenames) > self.MAX_BITS:
+            raise ImproperlyConfigured(
+                _('At most {} forum permissions can be defined ; {} forum permissions exist').format(
+                    self.MAX_BITS, offset + len(extra_codenames)))
+        for index, codename in enumerate(extra_codenames):
+            self._bits[codename] = 1 << (offset + index)
+
+
+bitmask = PermissionBitmask()
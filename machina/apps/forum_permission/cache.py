@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+import threading
+import time
+
+# Third party imports
+from django.core.cache import InvalidCacheBackendError
+from django.core.exceptions import ImproperlyConfigured
+
+# Local application / specific library imports
+from machina.conf import settings as machina_settings
+from machina.core.compat import get_cache
+
+
+class PermissionCache(object):
+    """
+    The permission cache allows to share the permissions computed for each user between
+    requests and processes. It acts as a wrapper around a Django cache backend (the name of the
+    considered backend is defined by the MACHINA_PERMISSION_CACHE_NAME setting) and is
+    disabled if this setting is not set.
+    Each value is stored under a key that embeds the current permission version. This version
+    is bumped each time a permission, a group membership or the tree of forums is changed ;
+    consequently all the values that were previously stored are invalidated at once.
+    """
+    key_prefix = 'machina_forum_permission'
+
+    @property
+    def enabled(self):
+        return bool(machina_settings.PERMISSION_CACHE_NAME)
+
+    def get_backend(self):
+        try:
+            cache = get_cache(machina_settings.PERMISSION_CACHE_NAME)
+        except InvalidCacheBackendError:
+            raise ImproperlyConfigured(
+                'The permission cache backend ({}) is not configured'.format(
+                    machina_settings.PERMISSION_CACHE_NAME))
+        return cache
+
+    def get_version(self):
+        """
+        Returns the current permission version.
+        """
+        backend = self.get_backend()
+        version = backend.get(self.version_key)
+        if version is None:
+            # The version is initialized with a value that cannot collide with a version that
+            # would have been used before an eviction of the version key.
+            backend.add(self.version_key, self._get_initial_version(), None)
+            version = backend.get(self.version_key)
+        return version
+
+    def bump_version(self):
+        """
+        Increments the permission version ; this invalidates all the permissions that were
+        previously stored in the cache.
+        """
+        if not self.enabled:
+            return
+        backend = self.get_backend()
+        try:
+            backend.incr(self.version_key)
+        except ValueError:
+            backend.set(self.version_key, self._get_initial_version(), None)
+
+    def get(self, key, version=None):
+        """
+        Returns the value stored for the given key with the given permission version (or the
+        current version if no version is specified). None is returned if the cache is disabled or
+        if no value can be found.
+        """
+        if not self.enabled:
+            return None
+        version = version or self.get_version()
+        return self.get_backend().get(self._make_key(key, version))
+
+    def set(self, key, value, version=None):
+        """
+        Stores the given value under the given key for the given permission version (or the
+        current version if no version is specified).
+        """
+        if not self.enabled:
+            return
+        version = version or self.get_version()
+        self.get_backend().set(self._make_key(key, version), value)
+
+    @property
+    def version_key(self):
+        return '{}:version'.format(self.key_prefix)
+
+    def _make_key(self, key, version):
+        return '{}:{}:{}'.format(self.key_prefix, version, key)
+
+    def _get_initial_version(self):
+        return int(time.time() * 1000)
+
+
+class AnonymousPermissionSnapshot(object):
+    """
+    Anonymous users all share the same permissions. The anonymous permission snapshot allows to
+    keep the values computed for anonymous users in the memory of the current process so that
+    they can be reused by all the requests and threads handled by this process. The stored values
+    are only valid for a specific permission version (as defined by the permission cache) and
+    are discarded as soon as a newer version is used.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._values = {}
+
+    def get(self, key, version):
+        """
+        Returns the value stored for the given key if it was stored for the given permission
+        version. None is returned otherwise.
+        """
+        with self._lock:
+            if version is None or version != self._version:
+                return None
+            return self._values.get(key)
+
+    def set(self, key, value, version):
+        """
+        Stores the given value under the given key for the given permission version. All the
+        values that were stored for another version are discarded.
+        """
+        if version is None:
+            return
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._values = {}
+            self._values[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._values = {}
+
+
+cache = PermissionCache()
+anonymous_snapshot = AnonymousPermissionSnapshot()
@@ -2,6 +2,7 @@
 
 # Standard library imports
 from __future__ import unicode_literals
+from collections import defaultdict
 
 # Third party imports
 from django.contrib.auth import get_user_model
@@ -10,11 +11,18 @@ from django.db.models import Q
 # Local application / specific library imports
 from machina.conf import settings as machina_settings
 from machina.core.db.models import get_model
+from machina.core.loading import get_class
 
+Forum = get_model('forum', 'Forum')
+EffectiveForumPermission = get_model('forum_permission', 'EffectiveForumPermission')
 ForumPermission = get_model('forum_permission', 'ForumPermission')
 GroupForumPermission = get_model('forum_permission', 'GroupForumPermission')
 UserForumPermission = get_model('forum_permission', 'UserForumPermission')
 
+bitmask = get_class('forum_permission.bitmask', 'bitmask')
+anonymous_snapshot = get_class('forum_permission.cache', 'anonymous_snapshot')
+perm_cache = get_class('forum_permission.cache', 'cache')
+
 
 class ForumPermissionChecker(object):
     """
@@ -24,6 +32,8 @@ class ForumPermissionChecker(object):
     def __init__(self, user):
         self.user = user
         self._forum_perms_cache = {}
+        self._shared_perms_loaded = False
+        self._superuser_perms = None
 
     def has_perm(self, perm, forum):
         """
@@ -33,68 +43,196 @@ class ForumPermissionChecker(object):
             return False
         elif self.user and self.user.is_superuser:
             return True
-        return perm in self.get_perms(forum)
+        return bool(self.get_perms_masks([forum, ])[forum.id] & bitmask.get_bit(perm))
 
     def get_perms(self, forum):
         """
         Returns the list of permission codenames of all permissions for the given forum.
         """
+        return self.get_perms_for_forums([forum, ])[forum.id]
+
+    def get_perms_for_forums(self, forums):
+        """
+        Computes the permission codenames granted for each of the given forums. All the
+        permissions related to the considered forums are fetched at once and the results are
+        stored in the forum permissions cache ; so any subsequent check performed on one of
+        these forums will not hit the database.
+        Returns a dictionary of permission codenames indexed by forum IDs.
+        """
+        if not self.user.is_anonymous() and not self.user.is_active:
+            return dict((forum.id, []) for forum in forums)
+        elif self.user and self.user.is_superuser:
+            if self._superuser_perms is None:
+                self._superuser_perms = list(ForumPermission.objects.values_list('codename', flat=True))
+            return dict((forum.id, self._superuser_perms) for forum in forums)
+
+        masks = self.get_perms_masks(forums)
+        return dict((forum_id, bitmask.decode(mask)) for forum_id, mask in masks.items())
+
+    def get_perms_masks(self, forums):
+        """
+        Computes the permissions granted for each of the given forums in the same way as the
+        get_perms_for_forums method but returns a dictionary of permission masks (integers whose
+        bits are defined by the permission bitmask) indexed by forum IDs.
+        """
         if not self.user.is_anonymous() and not self.user.is_active:
-            return []
-        user_model = get_user_model()
-        user_groups_related_name = user_model.groups.field.related_query_name()
+            return dict((forum.id, 0) for forum in forums)
+
+        forum_ids = [forum.id for forum in forums if forum.id not in self._forum_perms_cache]
 
-        if forum.id not in self._forum_perms_cache:
+        if forum_ids:
             if self.user and self.user.is_superuser:
-                perms = list(ForumPermission.objects.values_list('codename', flat=True))
+                mask = bitmask.encode(ForumPermission.objects.values_list('codename', flat=True))
+                for forum_id in forum_ids:
+                    self._forum_perms_cache[forum_id] = mask
+            elif self.user and perm_cache.enabled and not self._shared_perms_loaded:
+                self._load_shared_perms(forum_ids)
+            elif self.user and machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+                self._load_effective_perms(forum_ids)
             elif self.user:
-                default_auth_forum_perms = machina_settings.DEFAULT_AUTHENTICATED_USER_FORUM_PERMISSIONS
+                self._compute_perms(forum_ids)
 
-                user_kwargs_filter = {'anonymous_user': True} if self.user.is_anonymous() \
-                    else {'user': self.user}
+        return dict((forum.id, self._forum_perms_cache[forum.id]) for forum in forums)
 
-                user_perms = UserForumPermission.objects.select_related().filter(**user_kwargs_filter) \
-                    .filter(Q(forum__isnull=True) | Q(forum=forum))
+    def _compute_perms(self, forum_ids, filter_forums=True, raw_perms=None):
+        """
+        Computes the permissions granted for the given forum IDs and stores them into the forum
+        permissions cache. The permissions that are fetched from the database are not restricted
+        to the given forums if filter_forums is False. The raw user and group permissions of the
+        considered user can be passed (as returned by the _get_raw_perms() method) in order to
+        not fetch them.
+        """
+        user_perms, group_perms = raw_perms if raw_perms is not None \
+            else self._get_raw_perms(forum_ids if filter_forums else None)
 
-                globally_granted_user_perms = list(filter(lambda p: p.has_perm and p.forum is None, user_perms))
-                globally_granted_user_perms = [p.permission.codename for p in globally_granted_user_perms]
+        # The raw permissions are converted to (granted mask, non-granted mask) pairs indexed by
+        # forum IDs ; global permissions are indexed by None.
+        user_masks = self._get_masks(user_perms)
+        group_masks = self._get_masks(group_perms)
 
-                per_forum_granted_user_perms = list(filter(lambda p: p.has_perm and p.forum is not None, user_perms))
-                per_forum_granted_user_perms = [p.permission.codename for p in per_forum_granted_user_perms]
+        for forum_id in forum_ids:
+            self._forum_perms_cache[forum_id] = self._get_granted_perms(
+                user_masks[None], user_masks.get(forum_id, (0, 0)),
+                group_masks[None], group_masks.get(forum_id, (0, 0)))
 
-                per_forum_nongranted_user_perms = list(filter(lambda p: not p.has_perm and p.forum is not None, user_perms))
-                per_forum_nongranted_user_perms = [p.permission.codename for p in per_forum_nongranted_user_perms]
+    def _get_masks(self, raw_perms):
+        """
+        Given a list of (forum ID, codename, has_perm) tuples, returns a dictionary of
+        (granted mask, non-granted mask) tuples indexed by forum IDs.
+        """
+        masks = defaultdict(lambda: (0, 0))
+        for forum_id, codename, has_perm in raw_perms:
+            granted_mask, nongranted_mask = masks[forum_id]
+            if has_perm:
+                granted_mask |= bitmask.get_bit(codename)
+            else:
+                nongranted_mask |= bitmask.get_bit(codename)
+            masks[forum_id] = (granted_mask, nongranted_mask)
+        return masks
+
+    def _load_effective_perms(self, forum_ids):
+        """
+        Fills the forum permissions cache with the effective permissions that were stored for the
+        considered user. The permissions of the forums for which no effective permissions can be
+        found are computed from the user and group permissions.
+        """
+        user_kwargs_filter = {'anonymous_user': True} if self.user.is_anonymous() \
+            else {'user': self.user}
+        effective_perms = EffectiveForumPermission.objects \
+            .filter(**user_kwargs_filter).filter(forum_id__in=forum_ids) \
+            .values_list('forum_id', 'perms')
+
+        for forum_id, perms in effective_perms:
+            self._forum_perms_cache[forum_id] = perms
 
-                if self.user.is_authenticated() and not globally_granted_user_perms:
-                    globally_granted_user_perms = default_auth_forum_perms
+        missing_forum_ids = [f for f in forum_ids if f not in self._forum_perms_cache]
+        if missing_forum_ids:
+            self._compute_perms(missing_forum_ids)
+
+    def _load_shared_perms(self, forum_ids):
+        """
+        Fills the forum permissions cache with the permissions stored in the shared permission
+        cache. If the permissions of some of the given forum IDs cannot be found, the permissions
+        of all the forums are computed and stored into the shared permission cache in order to
+        allow the next checks (possibly performed by other requests) to not hit the database.
+        """
+        self._shared_perms_loaded = True
 
-                granted_user_perms = [c for c in globally_granted_user_perms if
-                                      c not in per_forum_nongranted_user_perms] + per_forum_granted_user_perms
-                granted_user_perms = set(granted_user_perms)
+        cache_key = 'perms_masks:{}'.format(self.user.id if not self.user.is_anonymous() else 'anonymous')
+        version = perm_cache.get_version()
 
-                perms = granted_user_perms
+        # The permissions of anonymous users are shared by all the requests handled by the
+        # current process.
+        shared_perms = anonymous_snapshot.get(cache_key, version) if self.user.is_anonymous() \
+            else None
+        if shared_perms is None:
+            shared_perms = perm_cache.get(cache_key, version=version) or {}
 
-                if not self.user.is_anonymous():
-                    group_perms = GroupForumPermission.objects.select_related() \
-                        .filter(**{'group__{}'.format(user_groups_related_name): self.user}) \
-                        .filter(Q(forum__isnull=True) | Q(forum=forum))
+        if any(forum_id not in shared_perms for forum_id in forum_ids):
+            all_forum_ids = list(Forum.objects.values_list('id', flat=True))
+            self._compute_perms(list(set(all_forum_ids + forum_ids)), filter_forums=False)
+            shared_perms = dict(
+                (forum_id, self._forum_perms_cache[forum_id]) for forum_id in all_forum_ids)
+            perm_cache.set(cache_key, shared_perms, version=version)
 
-                    globally_granted_group_perms = list(filter(lambda p: p.has_perm and p.forum is None, group_perms))
-                    globally_granted_group_perms = [p.permission.codename for p in globally_granted_group_perms]
+        if self.user.is_anonymous():
+            anonymous_snapshot.set(cache_key, shared_perms, version)
+
+        for forum_id, perms in shared_perms.items():
+            self._forum_perms_cache.setdefault(forum_id, perms)
+
+    def _get_raw_perms(self, forum_ids):
+        """
+        Returns two lists of (forum ID, codename, has_perm) tuples: the first one contains the
+        user permissions that could apply to the given forums (global permissions and per-forum
+        permissions) while the second one contains the related group permissions. All the
+        permissions are returned if no forum IDs are specified.
+        """
+        user_kwargs_filter = {'anonymous_user': True} if self.user.is_anonymous() \
+            else {'user': self.user}
+        forums_filter = Q(forum__isnull=True) | Q(forum_id__in=forum_ids) if forum_ids is not None \
+            else Q()
+
+        user_perms = list(
+            UserForumPermission.objects.filter(**user_kwargs_filter).filter(forums_filter)
+            .values_list('forum_id', 'permission__codename', 'has_perm'))
+
+        group_perms = []
+        if not self.user.is_anonymous():
+            user_model = get_user_model()
+            user_groups_related_name = user_model.groups.field.related_query_name()
+            group_perms = list(
+                GroupForumPermission.objects
+                .filter(**{'group__{}'.format(user_groups_related_name): self.user})
+                .filter(forums_filter)
+                .values_list('forum_id', 'permission__codename', 'has_perm'))
+
+        return user_perms, group_perms
+
+    def _get_granted_perms(self, global_user_masks, forum_user_masks,
+                           global_group_masks, forum_group_masks):
+        """
+        Given the global and per-forum user and group permissions of a specific forum (as
+        (granted mask, non-granted mask) tuples), returns the mask of the permissions that are
+        granted to the user for the considered forum.
+        """
+        default_auth_forum_perms = machina_settings.DEFAULT_AUTHENTICATED_USER_FORUM_PERMISSIONS
 
-                    per_forum_granted_group_perms = list(filter(lambda p: p.has_perm and p.forum is not None, group_perms))
-                    per_forum_granted_group_perms = [p.permission.codename for p in per_forum_granted_group_perms]
+        globally_granted_user_perms = global_user_masks[0]
+        per_forum_granted_user_perms, per_forum_nongranted_user_perms = forum_user_masks
 
-                    per_forum_nongranted_group_perms = list(filter(lambda p: not p.has_perm and p.forum is not None, group_perms))
-                    per_forum_nongranted_group_perms = [p.permission.codename for p in per_forum_nongranted_group_perms]
+        if self.user.is_authenticated() and not globally_granted_user_perms:
+            globally_granted_user_perms = bitmask.encode(default_auth_forum_perms)
 
-                    granted_group_perms = [c for c in globally_granted_group_perms if
-                                           c not in per_forum_nongranted_group_perms] + per_forum_granted_group_perms
-                    granted_group_perms = filter(lambda x: x not in per_forum_nongranted_user_perms, granted_group_perms)
-                    granted_group_perms = set(granted_group_perms)
+        perms = (globally_granted_user_perms & ~per_forum_nongranted_user_perms) \
+            | per_forum_granted_user_perms
 
-                    perms |= granted_group_perms
+        if not self.user.is_anonymous():
+            globally_granted_group_perms = global_group_masks[0]
+            per_forum_granted_group_perms, per_forum_nongranted_group_perms = forum_group_masks
 
-            self._forum_perms_cache[forum.id] = perms
+            granted_group_perms = (globally_granted_group_perms & ~per_forum_nongranted_group_perms) \
+                | per_forum_granted_group_perms
+            perms |= granted_group_perms & ~per_forum_nongranted_user_perms
 
-        return self._forum_perms_cache[forum.id]
+        return perms
@@ -5,6 +5,8 @@ from datetime import timedelta
 
 # Third party imports
 from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models import Max
 from django.db.models import Q
 from django.shortcuts import _get_queryset
 from django.utils.timezone import now
@@ -14,13 +16,19 @@ from machina.conf import settings as machina_settings
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
 
+EffectiveForumPermission = get_model('forum_permission', 'EffectiveForumPermission')
 Forum = get_model('forum', 'Forum')
 GroupForumPermission = get_model('forum_permission', 'GroupForumPermission')
 Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
 UserForumPermission = get_model('forum_permission', 'UserForumPermission')
 
 ForumPermissionChecker = get_class('forum_permission.checker', 'ForumPermissionChecker')
 
+bitmask = get_class('forum_permission.bitmask', 'bitmask')
+anonymous_snapshot = get_class('forum_permission.cache', 'anonymous_snapshot')
+perm_cache = get_class('forum_permission.cache', 'cache')
+
 
 class PermissionHandler(object):
     """
@@ -31,6 +39,11 @@ class PermissionHandler(object):
     def __init__(self):
         self._granted_forums_cache = {}
         self._user_perm_checkers_cache = {}
+        self._forums_max_level = None
+        self._forums_last_posts_cache = {}
+        self._forums_own_last_posts = {}
+        self._forums_visibility_cache = {}
+        self._forums_trackers = None
 
     # Filtering methods
     # --
@@ -45,28 +58,93 @@ class PermissionHandler(object):
             return qs
 
         # Check whether the forums can be viewed by the given user
-        forums_to_hide = self._get_hidden_forum_ids(qs, user)
-
-        return qs.exclude(id__in=forums_to_hide)
+        return qs.filter(self._get_visible_forums_filter(user))
 
     def get_forum_last_post(self, forum, user):
         """
         Given a forum, fetch the last post that can be read by the passed user.
         """
-        forums = forum.get_descendants(include_self=True)
-        hidden_forums = []
-
-        # Only non-superusers permissions are checked against the considered forums
-        if not user.is_superuser:
-            hidden_forums = self._get_hidden_forum_ids(forums, user)
-
-        forums = forums.exclude(id__in=hidden_forums)
-        posts = Post.approved_objects.filter(topic__forum__in=forums).order_by('-created')
-        posts = list(posts)
-
-        if not posts:
-            return None
-        return posts[0]
+        return self.get_forums_last_posts([forum, ], user).get(forum.pk)
+
+    def get_forums_last_posts(self, forums, user):
+        """
+        Given a list of forums, returns a dictionary containing the last post that can be read by
+        the passed user for each of these forums. The last post that is stored for a forum is used
+        if all the descendants of this forum can be seen by the user ; otherwise the last posts of
+        its visible descendants are compared. The posts are cached for the lifetime of the
+        handler so that they can be computed at once for a whole list of forums ; consequently
+        the cache is only warmed for the handler that is used afterwards (eg. the handler
+        attached to the request by the ForumPermissionHandlerMiddleware).
+        """
+        user_key = user.id if not user.is_anonymous() else 'anonymous'
+        last_posts = self._forums_last_posts_cache.get(user_key, {})
+        forum_ids = [forum.pk for forum in forums if forum.pk not in last_posts]
+        if not forum_ids:
+            return last_posts
+
+        if self._forums_trackers is None:
+            self._forums_trackers = list(
+                Forum.objects.order_by('tree_id', 'lft').values_list(
+                    'id', 'tree_id', 'lft', 'rght', 'last_post_on', 'last_post_id'))
+        forums_trackers = self._forums_trackers
+        forums_indexes = dict((row[0], i) for i, row in enumerate(forums_trackers))
+
+        if user_key not in self._forums_last_posts_cache:
+            hidden_forum_ids = set() if user.is_superuser \
+                else set(self._get_hidden_forum_ids(forums, user))
+
+            # The forums that are visible but that contain hidden forums cannot rely on their
+            # stored last post ; these forums are the ancestors of the hidden forums.
+            partially_visible_forum_ids, ancestors = set(), []
+            for forum_id, tree_id, lft, rght, _, _ in forums_trackers:
+                while ancestors and (ancestors[-1][1] != tree_id or ancestors[-1][2] < lft):
+                    ancestors.pop()
+                if forum_id in hidden_forum_ids:
+                    partially_visible_forum_ids.update(a[0] for a in ancestors)
+                ancestors.append((forum_id, tree_id, rght))
+
+            self._forums_visibility_cache[user_key] = (
+                hidden_forum_ids, partially_visible_forum_ids)
+            self._forums_last_posts_cache[user_key] = last_posts
+        hidden_forum_ids, partially_visible_forum_ids = self._forums_visibility_cache[user_key]
+
+        last_post_ids = {}
+        for forum_id in forum_ids:
+            index = forums_indexes.get(forum_id)
+            if index is None or forum_id in hidden_forum_ids:
+                last_post_ids[forum_id] = None
+                continue
+
+            # The descendants of the forum are browsed: the fully visible forums provide their
+            # stored last post while the partially visible forums provide the last post of
+            # their own topics.
+            _, tree_id, lft, rght, _, _ = forums_trackers[index]
+            candidates = []
+            while index < len(forums_trackers) and forums_trackers[index][1] == tree_id \
+                    and forums_trackers[index][2] < rght:
+                descendant_id, _, _, descendant_rght, last_post_on, last_post_id = \
+                    forums_trackers[index]
+                if descendant_id in partially_visible_forum_ids:
+                    candidates.append(self._get_forum_own_last_post(descendant_id))
+                    index += 1
+                    continue
+                if descendant_id not in hidden_forum_ids and last_post_id:
+                    candidates.append((last_post_on, last_post_id))
+                # The descendants of this forum are skipped
+                index += 1
+                while index < len(forums_trackers) and forums_trackers[index][1] == tree_id \
+                        and forums_trackers[index][2] < descendant_rght:
+                    index += 1
+
+            candidates = [c for c in candidates if c[1]]
+            last_post_ids[forum_id] = max(candidates)[1] if candidates else None
+
+        posts = Post.objects.select_related('poster', 'topic') \
+            .in_bulk([pk for pk in last_post_ids.values() if pk])
+        for forum_id, post_id in last_post_ids.items():
+            last_posts[forum_id] = posts.get(post_id)
+
+        return last_posts
 
     def get_movable_forums(self, user):
         """
@@ -155,6 +233,43 @@ class PermissionHandler(object):
                       or checker.has_perm('can_delete_posts', post.topic.forum))
         return can_delete
 
+    def annotate_post_permissions(self, posts, user):
+        """
+        Given a list of forum posts, computes at once whether the user can edit and delete each
+        of these posts. The results are stored in a ``user_permissions`` dictionary attached to
+        each post (eg. ``post.user_permissions['can_edit_post']``) and the considered user is
+        stored in the ``user_permissions_user`` attribute of each post. The permissions of the
+        forums related to the posts are fetched only once for the whole list.
+        Returns the list of posts.
+        """
+        checker = self._get_checker(user)
+        posts = list(posts)
+
+        forums = dict((post.topic.forum_id, post.topic.forum) for post in posts)
+        masks = checker.get_perms_masks(forums.values())
+
+        edit_own_posts_bit = bitmask.get_bit('can_edit_own_posts')
+        edit_posts_bit = bitmask.get_bit('can_edit_posts')
+        delete_own_posts_bit = bitmask.get_bit('can_delete_own_posts')
+        delete_posts_bit = bitmask.get_bit('can_delete_posts')
+
+        for post in posts:
+            mask = masks[post.topic.forum_id]
+            is_poster = user.is_authenticated() and post.poster_id == user.pk
+            post.user_permissions = {
+                'can_edit_post': bool(
+                    user.is_superuser
+                    or (is_poster and mask & edit_own_posts_bit)
+                    or mask & edit_posts_bit),
+                'can_delete_post': bool(
+                    user.is_superuser
+                    or (is_poster and mask & delete_own_posts_bit)
+                    or mask & delete_posts_bit),
+            }
+            post.user_permissions_user = user
+
+        return posts
+
     # Polls
 
     def can_create_polls(self, forum, user):
@@ -266,42 +381,98 @@ class PermissionHandler(object):
         """
         return self._perform_basic_permission_check(forum, user, 'can_approve_posts')
 
+    def has_perm_for_forums(self, forums, user, permission):
+        """
+        Given a list of forums, checks whether the user has the given permission for each of
+        these forums (eg. in order to moderate many posts or topics at once). The permissions
+        of all the forums are fetched at once. Returns False if the list of forums is empty.
+        """
+        forums = list(forums)
+        if not forums:
+            return False
+        if user.is_superuser:
+            return True
+
+        checker = self._get_checker(user)
+        masks = checker.get_perms_masks(forums)
+        bit = bitmask.get_bit(permission)
+        return all(masks[forum.id] & bit for forum in forums)
+
     # Common
     # --
 
+    def _get_visible_forums_filter(self, user):
+        """
+        Returns a Q object that can be used to filter a queryset of forums in order to keep only
+        the forums that can be seen or read by the given user. A forum is visible if it is
+        granted to the user and if all its ancestors are also granted to the user. Each ancestor
+        is checked by a dedicated subquery so that the whole filter is performed in a single SQL
+        statement.
+        """
+        visible_forum_ids = self._get_forums_for_user(
+            user, ['can_see_forum', 'can_read_forum', ]).values('pk')
+
+        if self._forums_max_level is None:
+            self._forums_max_level = Forum.objects.aggregate(max_level=Max('level'))['max_level'] or 0
+
+        visible_filter = Q(pk__in=visible_forum_ids)
+        for level in range(1, self._forums_max_level + 1):
+            # The ancestor located <level> levels above the forum must be visible if it exists.
+            ancestor_lookup = '__'.join(['parent', ] * level + ['pk', 'in', ])
+            visible_filter &= Q(level__lt=level) | Q(**{ancestor_lookup: visible_forum_ids})
+
+        return visible_filter
+
     def _get_hidden_forum_ids(self, forums, user):
         """
         Given a set of forums and an initialized checker, returns the list of forums
         that are not visible by the user or the group associated with this checker.
+        Note that the returned list can also contain the IDs of hidden forums that are not
+        part of the given set of forums.
         """
         visible_forums = self._get_forums_for_user(user, ['can_see_forum', 'can_read_forum', ])
-        hidden_forums = []
+        visible_forum_ids = set(visible_forums.values_list('id', flat=True))
+
+        # The forums are processed in the order of their position in the tree of forums. This way,
+        # a forum that is not visible by the user can be used as a marker: all the forums that
+        # follow it and that are positioned inside its (lft, rght) interval are its descendants,
+        # so they must also be hidden.
+        forums_tree = Forum.objects.order_by('tree_id', 'lft').values_list('id', 'tree_id', 'lft', 'rght')
 
-        for forum in forums:
-            if forum.id not in hidden_forums:
-                # First cheks if any of the forum ancestors is hidden
-                ancestors_visible = True
-                for ancestor in forum.get_ancestors():
-                    if ancestor not in visible_forums:
-                        ancestors_visible = False
-                        break
-
-                if (ancestors_visible is False) or (forum not in visible_forums):
-                    # If one forum can not be seen by a given user, all of its descendants
-                    # should also be hidden.
-                    forum_and_descendants = forum.get_descendants(include_self=True)
-                    hidden_forums.extend(forum_and_descendants.values_list('id', flat=True))
+        hidden_forums = []
+        hidden_tree_id, hidden_rght = None, None
+
+        for forum_id, tree_id, lft, rght in forums_tree:
+            if tree_id == hidden_tree_id and lft < hidden_rght:
+                # One of the forum ancestors is hidden
+                hidden_forums.append(forum_id)
+            elif forum_id not in visible_forum_ids:
+                # If one forum can not be seen by a given user, all of its descendants
+                # should also be hidden.
+                hidden_forums.append(forum_id)
+                hidden_tree_id, hidden_rght = tree_id, rght
 
         return hidden_forums
 
+    def _get_forum_own_last_post(self, forum_id):
+        """
+        Returns a (last_post_on, last_post_id) tuple corresponding to the last post of the topics
+        that are directly associated with the given forum.
+        """
+        if forum_id not in self._forums_own_last_posts:
+            last_posts = list(
+                Topic.objects.filter(forum_id=forum_id, approved=True, last_post__isnull=False)
+                .order_by('-last_post_on').values_list('last_post_on', 'last_post_id')[:1])
+            self._forums_own_last_posts[forum_id] = last_posts[0] if last_posts else (None, None)
+        return self._forums_own_last_posts[forum_id]
+
     def _get_forums_for_user(self, user, perm_codenames):
         """
         Returns all the forums that satisfy the given list of permission
         codenames. User and group forum permissions are used.
         """
-        granted_forums_cache_key = '{}__{}'.format(
-            ':'.join(perm_codenames),
-            user.id if not user.is_anonymous() else 'anonymous')
+        user_key = user.id if not user.is_anonymous() else 'anonymous'
+        granted_forums_cache_key = '{}__{}'.format(':'.join(perm_codenames), user_key)
 
         if granted_forums_cache_key in self._granted_forums_cache:
             return self._granted_forums_cache[granted_forums_cache_key]
@@ -313,50 +484,40 @@ class PermissionHandler(object):
         if user.is_superuser:  # pragma: no cover
             forum_objects = forum_queryset
 
+        elif machina_settings.EFFECTIVE_PERMISSIONS_ENABLED \
+                and self._get_effective_perms(user).exists():
+            # The forums are filtered using the effective permissions that were stored for the
+            # user ; these permissions already embed the default authenticated user permissions.
+            # A forum is retained if one of the given permissions is granted for it.
+            perms_mask = bitmask.encode(perm_codenames)
+            granted_forum_ids = self._get_effective_perms(user) \
+                .annotate(granted_perms=F('perms').bitand(perms_mask)) \
+                .exclude(granted_perms=0) \
+                .values('forum_id')
+            forum_objects = forum_queryset.filter(pk__in=granted_forum_ids)
+
         else:
-            # Generates the appropriate queryset filter in order to handle both
-            # authenticated users and anonymous users.
-            user_kwargs_filter = {'anonymous_user': True} if user.is_anonymous() \
-                else {'user': user}
-
-            # Get all the user permissions for the considered user.
-            user_perms = UserForumPermission.objects \
-                .filter(**user_kwargs_filter) \
-                .filter(permission__codename__in=perm_codenames)
-
-            globally_granted_user_perms = list(filter(lambda p: p.has_perm and p.forum is None, user_perms))
-            per_forum_granted_user_perms = list(filter(lambda p: p.has_perm and p.forum is not None, user_perms))
-            per_forum_nongranted_user_perms = list(filter(lambda p: not p.has_perm and p.forum is not None, user_perms))
-
-            user_granted_forum_ids = [p.forum_id for p in per_forum_granted_user_perms]
-            user_nongranted_forum_ids = [p.forum_id for p in per_forum_nongranted_user_perms]
-
-            if not user.is_anonymous():
-                # Get all the group permissions for the considered user.
-                group_perms = GroupForumPermission.objects \
-                    .filter(**{'group__{0}'.format(get_user_model().groups.field.related_query_name()): user}) \
-                    .filter(permission__codename__in=perm_codenames)
-
-                globally_granted_group_perms = list(filter(lambda p: p.has_perm and p.forum is None, group_perms))
-                per_forum_granted_group_perms = list(filter(lambda p: p.has_perm and p.forum is not None, group_perms))
-                per_forum_nongranted_group_perms = list(filter(lambda p: not p.has_perm and p.forum is not None, group_perms))
-
-                group_granted_forum_ids = [p.forum_id for p in per_forum_granted_group_perms]
-                group_nongranted_forum_ids = [p.forum_id for p in per_forum_nongranted_group_perms]
-
-                if globally_granted_user_perms or globally_granted_group_perms:
-                    forum_objects = forum_queryset.filter(
-                        ~Q(pk__in=(user_nongranted_forum_ids + group_nongranted_forum_ids)))
-                else:
-                    forum_objects = forum_queryset.filter(
-                        Q(pk__in=user_granted_forum_ids) | Q(pk__in=group_granted_forum_ids)) \
-                        .filter(~Q(pk__in=(user_nongranted_forum_ids + group_nongranted_forum_ids)))
+            # The IDs of the forums that are granted or not to the user are retrieved from
+            # the shared permission cache if possible.
+            shared_cache_key = 'forums:{}'.format(granted_forums_cache_key)
+            version = perm_cache.get_version() if perm_cache.enabled else None
+            granted_forums = anonymous_snapshot.get(shared_cache_key, version) \
+                if user.is_anonymous() else None
+            if granted_forums is None:
+                granted_forums = perm_cache.get(shared_cache_key, version=version)
+            if granted_forums is None:
+                granted_forums = self._get_granted_forum_ids(user, perm_codenames)
+                perm_cache.set(shared_cache_key, granted_forums, version=version)
+            if user.is_anonymous():
+                anonymous_snapshot.set(shared_cache_key, granted_forums, version)
+
+            globally_granted, granted_forum_ids, nongranted_forum_ids = granted_forums
+
+            if globally_granted:
+                forum_objects = forum_queryset.filter(~Q(pk__in=nongranted_forum_ids))
             else:
-                if globally_granted_user_perms:
-                    forum_objects = forum_queryset.filter(~Q(pk__in=user_nongranted_forum_ids))
-                else:
-                    forum_objects = forum_queryset.filter(Q(pk__in=user_granted_forum_ids)) \
-                        .filter(~Q(pk__in=user_nongranted_forum_ids))
+                forum_objects = forum_queryset.filter(Q(pk__in=granted_forum_ids)) \
+                    .filter(~Q(pk__in=nongranted_forum_ids))
 
             if not user.is_anonymous() and not forum_objects.exists() and set(perm_codenames).issubset(set(
                     machina_settings.DEFAULT_AUTHENTICATED_USER_FORUM_PERMISSIONS)):
@@ -365,6 +526,49 @@ class PermissionHandler(object):
         self._granted_forums_cache[granted_forums_cache_key] = forum_objects
         return forum_objects
 
+    def _get_effective_perms(self, user):
+        """
+        Returns a queryset of the effective permissions that were stored for the given user.
+        """
+        user_kwargs_filter = {'anonymous_user': True} if user.is_anonymous() \
+            else {'user': user}
+        return EffectiveForumPermission.objects.filter(**user_kwargs_filter)
+
+    def _get_granted_forum_ids(self, user, perm_codenames):
+        """
+        Returns a (globally_granted, granted_forum_ids, nongranted_forum_ids) tuple for the given
+        user and the given list of permission codenames. globally_granted is True if one of these
+        permissions is granted globally to the user (or to one of its groups).
+        """
+        # Generates the appropriate queryset filter in order to handle both
+        # authenticated users and anonymous users.
+        user_kwargs_filter = {'anonymous_user': True} if user.is_anonymous() \
+            else {'user': user}
+
+        # Get all the user permissions for the considered user.
+        user_perms = UserForumPermission.objects \
+            .filter(**user_kwargs_filter) \
+            .filter(permission__codename__in=perm_codenames) \
+            .values_list('forum_id', 'has_perm')
+
+        globally_granted = any(has_perm and forum_id is None for forum_id, has_perm in user_perms)
+        granted_forum_ids = [f for f, h in user_perms if h and f is not None]
+        nongranted_forum_ids = [f for f, h in user_perms if not h and f is not None]
+
+        if not user.is_anonymous():
+            # Get all the group permissions for the considered user.
+            group_perms = GroupForumPermission.objects \
+                .filter(**{'group__{0}'.format(get_user_model().groups.field.related_query_name()): user}) \
+                .filter(permission__codename__in=perm_codenames) \
+                .values_list('forum_id', 'has_perm')
+
+            globally_granted = globally_granted or \
+                any(has_perm and forum_id is None for forum_id, has_perm in group_perms)
+            granted_forum_ids += [f for f, h in group_perms if h and f is not None]
+            nongranted_forum_ids += [f for f, h in group_perms if not h and f is not None]
+
+        return globally_granted, granted_forum_ids, nongranted_forum_ids
+
     def _perform_basic_permission_check(self, forum, user, permission):
         """
         Given a forum and a user, checks whether the latter has the passed
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.management.base import BaseCommand
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+
+EffectiveForumPermission = get_model('forum_permission', 'EffectiveForumPermission')
+
+
+class Command(BaseCommand):
+    help = 'Computes again the effective forum permissions of all the users and all the forums'
+
+    def handle(self, *args, **options):
+        EffectiveForumPermission.objects.rebuild()
+        self.stdout.write('{} effective forum permissions were stored'.format(
+            EffectiveForumPermission.objects.count()))
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from collections import defaultdict
+
+# Third party imports
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import models
+
+# Local application / specific library imports
+from machina.core.compat import atomic
+from machina.core.db.models import get_model
+from machina.core.loading import get_class
+
+# The number of users whose effective permissions are computed and stored at once
+USERS_BATCH_SIZE = 500
+
+
+class EffectiveForumPermissionManager(models.Manager):
+    def get_users(self):
+        """
+        Returns the users whose effective permissions should be stored, that is the users that
+        were granted user permissions or that belong to groups that were granted permissions.
+        The permissions of all the other authenticated users are only defined by the default
+        authenticated user permissions and do not need to be stored.
+        """
+        GroupForumPermission = get_model('forum_permission', 'GroupForumPermission')
+        UserForumPermission = get_model('forum_permission', 'UserForumPermission')
+        return get_user_model().objects.filter(
+            models.Q(pk__in=UserForumPermission.objects.filter(user__isnull=False).values('user_id'))
+            | models.Q(groups__in=GroupForumPermission.objects.values('group_id'))).distinct()
+
+    def update_user_permissions(self, user, forums=None):
+        """
+        Computes the effective permissions of the given user (an AnonymousUser instance can be
+        used in order to target anonymous users) for the given forums - or for all the forums if
+        no forums are specified - and stores them.
+        """
+        self.update_users_permissions(
+            [user, ], forum_ids=[f.id for f in forums] if forums is not None else None)
+
+    def update_users_permissions(self, users, forum_ids=None):
+        """
+        Computes the effective permissions of the given users (an AnonymousUser instance can be
+        used in order to target anonymous users) for the forums identified by the given IDs - or
+        for all the forums if no forum IDs are specified - and stores them. The users are
+        processed by batches: the permissions of each batch of users are fetched, removed and
+        stored using a constant number of queries.
+        """
+        Forum = get_model('forum', 'Forum')
+
+        filter_forums = forum_ids is not None
+        forum_ids = list(forum_ids) if filter_forums \
+            else list(Forum.objects.values_list('id', flat=True))
+        users = list(users)
+
+        with atomic():
+            for i in range(0, len(users), USERS_BATCH_SIZE):
+                self._update_users_permissions(
+                    users[i:i + USERS_BATCH_SIZE], forum_ids, filter_forums)
+
+    def update_forum_permissions(self, forum):
+        """
+        Computes and stores the effective permissions of all the considered users for the given
+        forum.
+        """
+        self.update_users_permissions(
+            [AnonymousUser(), ] + list(self.get_users()), forum_ids=[forum.id, ])
+
+    def rebuild(self):
+        """
+        Removes all the stored effective permissions and computes them again for all the
+        considered users and all the forums.
+        """
+        with atomic():
+            self.all().delete()
+            self.update_users_permissions([AnonymousUser(), ] + list(self.get_users()))
+
+    def _update_users_permissions(self, users, forum_ids, filter_forums):
+        ForumPermissionChecker = get_class('forum_permission.checker', 'ForumPermissionChecker')
+
+        user_ids = [user.pk for user in users if not user.is_anonymous()]
+        anonymous = any(user.is_anonymous() for user in users)
+        raw_perms = self._get_raw_perms(user_ids, anonymous, forum_ids if filter_forums else None)
+
+        # The permissions are computed from the user and group permissions without taking into
+        # account the state of the users (is_active, is_superuser) ; this state is handled by the
+        # permission checker.
+        effective_perms = []
+        for user in users:
+            key = None if user.is_anonymous() else user.pk
+            checker = ForumPermissionChecker(user)
+            checker._compute_perms(forum_ids, filter_forums=filter_forums, raw_perms=raw_perms[key])
+            user_kwargs = {'anonymous_user': True, 'user': None} if user.is_anonymous() \
+                else {'anonymous_user': False, 'user_id': user.pk}
+            effective_perms += [
+                self.model(forum_id=forum_id, perms=checker._forum_perms_cache[forum_id], **user_kwargs)
+                for forum_id in forum_ids]
+
+        qs = self.filter(self._get_users_filter(user_ids, anonymous))
+        if filter_forums:
+            qs = qs.filter(forum_id__in=forum_ids)
+        qs.delete()
+        self.bulk_create(effective_perms)
+
+    def _get_raw_perms(self, user_ids, anonymous, forum_ids):
+        """
+        Returns a dictionary of (user permissions, group permissions) tuples indexed by user IDs
+        (the raw permissions of anonymous users are indexed by None). The raw permissions are
+        lists of (forum ID, codename, has_perm) tuples, as expected by the permission checker.
+        """
+        GroupForumPermission = get_model('forum_permission', 'GroupForumPermission')
+        UserForumPermission = get_model('forum_permission', 'UserForumPermission')
+
+        raw_perms = defaultdict(lambda: ([], []))
+        forums_filter = models.Q(forum__isnull=True) | models.Q(forum_id__in=forum_ids) \
+            if forum_ids is not None else models.Q()
+
+        for user_id, anonymous_user, forum_id, codename, has_perm in UserForumPermission.objects \
+                .filter(self._get_users_filter(user_ids, anonymous)).filter(forums_filter) \
+                .values_list('user_id', 'anonymous_user', 'forum_id', 'permission__codename', 'has_perm'):
+            raw_perms[None if anonymous_user else user_id][0].append((forum_id, codename, has_perm))
+
+        if user_ids:
+            user_groups_related_name = get_user_model().groups.field.related_query_name()
+            for user_id, forum_id, codename, has_perm in GroupForumPermission.objects \
+                    .filter(**{'group__{}__in'.format(user_groups_related_name): user_ids}) \
+                    .filter(forums_filter) \
+                    .values_list(
+                        'group__{}'.format(user_groups_related_name), 'forum_id',
+                        'permission__codename', 'has_perm'):
+                raw_perms[user_id][1].append((forum_id, codename, has_perm))
+
+        return raw_perms
+
+    def _get_users_filter(self, user_ids, anonymous):
+        users_filter = models.Q()
+        if user_ids:
+            users_filter |= models.Q(user_id__in=user_ids)
+        if anonymous:
+            users_filter |= models.Q(anonymous_user=True)
+        return users_filter
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('forum_permission', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectiveForumPermission',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('anonymous_user', models.BooleanField(default=False, db_index=True, verbose_name='Target anonymous user')),
+                ('perms', models.BigIntegerField(default=0, verbose_name='Permissions mask')),
+                ('forum', models.ForeignKey(related_name='effective_permissions', verbose_name='Forum', to='forum.Forum')),
+                ('user', models.ForeignKey(verbose_name='User', blank=True, to=settings.AUTH_USER_MODEL, null=True)),
+            ],
+            options={
+                'abstract': False,
+                'verbose_name': 'Effective forum permission',
+                'verbose_name_plural': 'Effective forum permissions',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='effectiveforumpermission',
+            unique_together=set([('user', 'forum')]),
+        ),
+    ]
@@ -5,6 +5,7 @@
 import django
 
 # Local application / specific library imports
+from machina.apps.forum_permission.abstract_models import AbstractEffectiveForumPermission
 from machina.apps.forum_permission.abstract_models import AbstractForumPermission
 from machina.apps.forum_permission.abstract_models import AbstractGroupForumPermission
 from machina.apps.forum_permission.abstract_models import AbstractUserForumPermission
@@ -14,6 +15,7 @@ from machina.core.db.models import model_factory
 ForumPermission = model_factory(AbstractForumPermission)
 GroupForumPermission = model_factory(AbstractGroupForumPermission)
 UserForumPermission = model_factory(AbstractUserForumPermission)
+EffectiveForumPermission = model_factory(AbstractEffectiveForumPermission)
 
 
 if django.VERSION < (1, 7):  # pragma: no cover
@@ -4,14 +4,31 @@
 from __future__ import unicode_literals
 
 # Third party imports
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 
 # Local application / specific library imports
+from machina.conf import settings as machina_settings
 from machina.core.loading import get_class
+from machina.core.loading import get_classes
 
-ForumPermission = get_class('forum_permission.models', 'ForumPermission')
+Forum = get_class('forum.models', 'Forum')
+EffectiveForumPermission, ForumPermission, GroupForumPermission, UserForumPermission = get_classes(
+    'forum_permission.models',
+    ['EffectiveForumPermission', 'ForumPermission', 'GroupForumPermission', 'UserForumPermission'])
 PermissionConfig = get_class('forum_permission.defaults', 'PermissionConfig')
 
+forum_moved = get_class('forum.signals', 'forum_moved')
+
+bitmask = get_class('forum_permission.bitmask', 'bitmask')
+perm_cache = get_class('forum_permission.cache', 'cache')
+
 
 def create_permissions():
     for config in PermissionConfig.permissions:
@@ -48,3 +65,163 @@ try:  # pragma: no cover
             create_permissions()
 except ImportError:  # pragma: no cover
     pass
+
+
+@receiver(post_save, sender=ForumPermission)
+@receiver(post_delete, sender=ForumPermission)
+def reset_permission_bitmask(sender, **kwargs):
+    """
+    Receiver to reset the bits associated with the forum permissions that are not part of the
+    default permission configuration when a forum permission is created, updated or removed.
+    """
+    bitmask.clear()
+
+
+@receiver(post_save, sender=ForumPermission)
+@receiver(post_delete, sender=ForumPermission)
+@receiver(post_save, sender=UserForumPermission)
+@receiver(post_delete, sender=UserForumPermission)
+@receiver(post_save, sender=GroupForumPermission)
+@receiver(post_delete, sender=GroupForumPermission)
+def invalidate_cached_permissions(sender, **kwargs):
+    """
+    Receiver to invalidate the permissions stored in the shared permission cache when a
+    permission is granted, updated or removed.
+    """
+    perm_cache.bump_version()
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_cached_permissions_on_group_change(sender, action, **kwargs):
+    """
+    Receiver to invalidate the permissions stored in the shared permission cache when the
+    groups of a user are changed.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        perm_cache.bump_version()
+
+
+@receiver(post_save, sender=Forum)
+def invalidate_cached_permissions_on_forum_creation(sender, instance, created, **kwargs):
+    """
+    Receiver to invalidate the permissions stored in the shared permission cache when a forum
+    is created.
+    """
+    if created:
+        perm_cache.bump_version()
+
+
+@receiver(post_delete, sender=Forum)
+@receiver(forum_moved)
+def invalidate_cached_permissions_on_forum_change(sender, **kwargs):
+    """
+    Receiver to invalidate the permissions stored in the shared permission cache when the tree
+    of forums is updated.
+    """
+    perm_cache.bump_version()
+
+
+def _get_permission_forum_ids(permission):
+    # A per-forum permission only affects the effective permissions of its forum while a global
+    # permission affects the effective permissions of all the forums.
+    return [permission.forum_id, ] if permission.forum_id else None
+
+
+@receiver(post_save, sender=UserForumPermission)
+@receiver(post_delete, sender=UserForumPermission)
+def update_effective_permissions_on_user_permission_change(sender, instance, **kwargs):
+    """
+    Receiver to update the effective permissions of a user when one of its permissions is
+    granted, updated or removed. Only the effective permissions of the forum targeted by the
+    permission are updated if it is a per-forum permission.
+    """
+    if not machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        return
+    user = AnonymousUser() if instance.anonymous_user else \
+        get_user_model().objects.filter(pk=instance.user_id).first()
+    if user is not None:
+        EffectiveForumPermission.objects.update_users_permissions(
+            [user, ], forum_ids=_get_permission_forum_ids(instance))
+
+
+@receiver(post_save, sender=GroupForumPermission)
+@receiver(post_delete, sender=GroupForumPermission)
+def update_effective_permissions_on_group_permission_change(sender, instance, **kwargs):
+    """
+    Receiver to update the effective permissions of the users of a group when one of the
+    permissions of this group is granted, updated or removed. Only the effective permissions of
+    the forum targeted by the permission are updated if it is a per-forum permission.
+    """
+    if not machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        return
+    EffectiveForumPermission.objects.update_users_permissions(
+        get_user_model().objects.filter(groups__pk=instance.group_id),
+        forum_ids=_get_permission_forum_ids(instance))
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def update_effective_permissions_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Receiver to update the effective permissions of the users whose groups are changed.
+    """
+    if not machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        return
+
+    if not reverse:
+        # The groups of a specific user are changed.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            EffectiveForumPermission.objects.update_user_permissions(instance)
+        return
+
+    # The users of a specific group are changed ; the IDs of the users of the group must be
+    # collected before they are removed when the group is cleared.
+    if action == 'pre_clear':
+        instance._machina_cleared_user_ids = list(
+            get_user_model().objects.filter(groups=instance).values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = pk_set if action != 'post_clear' \
+            else getattr(instance, '_machina_cleared_user_ids', [])
+        EffectiveForumPermission.objects.update_users_permissions(
+            get_user_model().objects.filter(pk__in=user_ids))
+
+
+@receiver(pre_delete, sender=Group)
+def collect_group_users_before_group_deletion(sender, instance, **kwargs):
+    """
+    Receiver to collect the IDs of the users of a group before this group is deleted.
+    """
+    if machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        instance._machina_deleted_user_ids = list(
+            get_user_model().objects.filter(groups=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def update_effective_permissions_on_group_deletion(sender, instance, **kwargs):
+    """
+    Receiver to update the effective permissions of the users of a group when this group is
+    deleted.
+    """
+    if not machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        return
+    user_ids = getattr(instance, '_machina_deleted_user_ids', [])
+    EffectiveForumPermission.objects.update_users_permissions(
+        get_user_model().objects.filter(pk__in=user_ids))
+
+
+@receiver(post_delete, sender=ForumPermission)
+def rebuild_effective_permissions_on_permission_deletion(sender, **kwargs):
+    """
+    Receiver to compute again all the effective permissions when a forum permission is removed:
+    the bits of the forum permissions that follow the removed permission are shifted.
+    """
+    if machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        EffectiveForumPermission.objects.rebuild()
+
+
+@receiver(post_save, sender=Forum)
+def update_effective_permissions_on_forum_creation(sender, instance, created, **kwargs):
+    """
+    Receiver to compute the effective permissions related to a forum when it is created.
+    """
+    if created and machina_settings.EFFECTIVE_PERMISSIONS_ENABLED:
+        EffectiveForumPermission.objects.update_forum_permissions(instance)
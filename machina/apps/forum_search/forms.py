@@ -14,7 +14,6 @@ from machina.core.loading import get_class
 Forum = get_model('forum', 'Forum')
 
 PermissionHandler = get_class('forum_permission.handler', 'PermissionHandler')
-perm_handler = PermissionHandler()
 
 
 class SearchForm(FacetedSearchForm):
@@ -31,6 +30,7 @@ class SearchForm(FacetedSearchForm):
 
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
+        self.perm_handler = kwargs.pop('perm_handler', None) or PermissionHandler()
 
         super(SearchForm, self).__init__(*args, **kwargs)
 
@@ -39,7 +39,7 @@ class SearchForm(FacetedSearchForm):
         self.fields['q'].widget.attrs['placeholder'] = _('Keywords or phrase')
         self.fields['search_poster_name'].widget.attrs['placeholder'] = _('Poster name')
 
-        self.allowed_forums = perm_handler.forum_list_filter(Forum.objects.all(), user)
+        self.allowed_forums = self.perm_handler.forum_list_filter(Forum.objects.all(), user)
         if self.allowed_forums:
             self.fields['search_forums'].choices = [(f.id, '{} {}'.format('-' * f.margin_level, f.name)) for f in self.allowed_forums]
         else:
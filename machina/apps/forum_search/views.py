@@ -14,5 +14,8 @@ class FacetedSearchView(views.FacetedSearchView):
     template = 'forum_search/search.html'
 
     def build_form(self):
-        form = super(self.__class__, self).build_form(form_kwargs={'user': self.request.user})
+        form = super(self.__class__, self).build_form(form_kwargs={
+            'user': self.request.user,
+            'perm_handler': self.request.forum_permission_handler,
+        })
         return form
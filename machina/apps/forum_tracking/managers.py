@@ -5,6 +5,8 @@
 from django.db import models
 
 # Local application / specific library imports
+from machina.apps.forum.tree import forum_tree_cache
+from machina.core.db.models import get_model
 
 
 class ForumReadTrackManager(models.Manager):
@@ -20,7 +22,16 @@ class ForumReadTrackManager(models.Manager):
                         if hasattr(super_self, 'get_query_set')
                         else super_self.get_queryset)
 
-        unread_forums = []
+        tree = forum_tree_cache.get_tree()
+        unread_forums, unread_forum_ids = [], set()
+
+        def add_unread_forum(forum):
+            # The ancestors of the forum are computed using the snapshot of the tree of forums if
+            # the forum tree cache is enabled.
+            if tree is not None and forum in tree:
+                unread_forum_ids.update(tree.get_ancestors(forum, include_self=True))
+            else:
+                unread_forums.extend(forum.get_ancestors(include_self=True))
 
         tracks = get_queryset().select_related('forum').filter(
             user=user,
@@ -29,12 +40,17 @@ class ForumReadTrackManager(models.Manager):
 
         for track in tracks:
             if (track.forum.last_post_on and track.mark_time < track.forum.last_post_on) \
-                    and track.forum not in unread_forums:
-                unread_forums.extend(track.forum.get_ancestors(include_self=True))
+                    and track.forum not in unread_forums and track.forum.pk not in unread_forum_ids:
+                add_unread_forum(track.forum)
             tracked_forums.append(track.forum)
 
         for forum in forums:
-            if forum not in tracked_forums and forum not in unread_forums and forum.topics.count() > 0:
-                unread_forums.extend(forum.get_ancestors(include_self=True))
+            if forum not in tracked_forums and forum not in unread_forums \
+                    and forum.pk not in unread_forum_ids and forum.topics.count() > 0:
+                add_unread_forum(forum)
+
+        if unread_forum_ids:
+            forum_model = get_model('forum', 'Forum')
+            unread_forums.extend(forum_model._default_manager.filter(pk__in=unread_forum_ids))
 
         return list(set(unread_forums))
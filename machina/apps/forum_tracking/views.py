@@ -24,7 +24,6 @@ ForumReadTrack, TopicReadTrack = get_classes('forum_tracking.models',
 Topic = get_model('forum_conversation', 'Topic')
 
 TrackingHandler = get_class('forum_tracking.handler', 'TrackingHandler')
-track_handler = TrackingHandler()
 
 PermissionRequiredMixin = get_class('forum_permission.viewmixins', 'PermissionRequiredMixin')
 
@@ -110,8 +109,9 @@ class UnreadTopicsView(ListView):
         forums = self.request.forum_permission_handler.forum_list_filter(
             Forum.objects.all(), self.request.user)
         topics = Topic.objects.filter(forum__in=forums)
+        track_handler = TrackingHandler(self.request)
         topics_pk = map(lambda t: t.pk, track_handler.get_unread_topics(topics, self.request.user))
-        return Topic.objects.filter(pk__in=topics_pk).order_by('-last_post_on')
+        return Topic.objects.filter(pk__in=topics_pk).order_by('-last_post_on').with_list_data()
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
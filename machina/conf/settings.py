@@ -13,6 +13,7 @@ from django.conf import settings
 MACHINA_FORUM_NAME = getattr(settings, 'MACHINA_FORUM_NAME', 'Machina')
 MACHINA_MARKUP_LANGUAGE = getattr(settings, 'MACHINA_MARKUP_LANGUAGE', ('django_markdown.utils.markdown', {}))
 MACHINA_MARKUP_WIDGET = getattr(settings, 'MACHINA_MARKUP_WIDGET', 'django_markdown.widgets.MarkdownWidget')
+KEYSET_PAGINATION = getattr(settings, 'MACHINA_KEYSET_PAGINATION', False)
 
 
 # Forum
@@ -27,6 +28,13 @@ DEFAULT_FORUM_IMAGE_SETTINGS = {
 
 FORUM_TOPICS_NUMBER_PER_PAGE = getattr(settings, 'MACHINA_FORUM_TOPICS_NUMBER_PER_PAGE', 20)
 
+TRACKERS_UPDATES_IN_BACKGROUND = getattr(settings, 'MACHINA_TRACKERS_UPDATES_IN_BACKGROUND', False)
+FORUM_TREE_CACHE_NAME = getattr(settings, 'MACHINA_FORUM_TREE_CACHE_NAME', None)
+VIEW_COUNTERS_BUFFERED = getattr(settings, 'MACHINA_VIEW_COUNTERS_BUFFERED', False)
+VIEW_COUNTERS_FLUSH_INTERVAL = getattr(settings, 'MACHINA_VIEW_COUNTERS_FLUSH_INTERVAL', 60)
+VIEW_COUNTERS_FLUSH_SIZE = getattr(settings, 'MACHINA_VIEW_COUNTERS_FLUSH_SIZE', 1000)
+DELETION_BATCH_SIZE = getattr(settings, 'MACHINA_DELETION_BATCH_SIZE', 500)
+
 
 # Conversation
 TOPIC_ANSWER_SUBJECT_PREFIX = getattr(settings, 'MACHINA_TOPIC_ANSWER_SUBJECT_PREFIX', 'Re:')
@@ -71,3 +79,5 @@ PROFILE_SIGNATURE_MAX_LENGTH = getattr(settings, 'MACHINA_PROFILE_SIGNATURE_MAX_
 # Permission
 DEFAULT_AUTHENTICATED_USER_FORUM_PERMISSIONS = getattr(
     settings, 'MACHINA_DEFAULT_AUTHENTICATED_USER_FORUM_PERMISSIONS', [])
+PERMISSION_CACHE_NAME = getattr(settings, 'MACHINA_PERMISSION_CACHE_NAME', None)
+EFFECTIVE_PERMISSIONS_ENABLED = getattr(settings, 'MACHINA_EFFECTIVE_PERMISSIONS_ENABLED', False)
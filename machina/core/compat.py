@@ -53,3 +53,10 @@ if DJANGO_VERSION >= (1, 8):
 else:
     from django.conf.urls import patterns as urlpatterns
     patterns = lambda urls: urlpatterns('', *urls)
+
+
+# Atomic transactions
+try:
+    from django.db.transaction import atomic
+except ImportError:  # pragma: no cover
+    from django.db.transaction import commit_on_success as atomic  # noqa
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.encoding import force_text
+
+# Local application / specific library imports
+
+
+class CountedPaginator(Paginator):
+    """
+    A paginator that uses a known number of objects (such as a counter that is stored in the
+    database) instead of counting the objects of the paginated queryset. As such a counter can be
+    slightly outdated, the last page is not truncated according to the number of objects.
+    """
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super(CountedPaginator, self).__init__(object_list, per_page, **kwargs)
+        self.counted = count is not None
+        if self.counted:
+            count = max(int(count), 0)
+            self._count = count
+            # Recent versions of Django compute the count using a cached property
+            self.__dict__['count'] = count
+
+    def page(self, number):
+        if not self.counted:
+            return super(CountedPaginator, self).page(number)
+        number = self.validate_number(number)
+        return Page(self._get_objects(number), number, self)
+
+    def _get_objects(self, number):
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if number == self.num_pages:
+            top += self.orphans
+        return self.object_list[bottom:top]
+
+
+class SequencePaginator(CountedPaginator):
+    """
+    A paginator that fetches the objects of each page using a range of a sequence field whose
+    values are contiguous and start at 1 (such as the sequence numbers of the posts of a topic)
+    instead of an OFFSET clause. This way, the last pages are as cheap as the first ones.
+    """
+    def __init__(self, object_list, per_page, count=None, sequence_field='sequence', **kwargs):
+        super(SequencePaginator, self).__init__(object_list, per_page, count=count, **kwargs)
+        self.sequence_field = sequence_field
+
+    def _get_objects(self, number):
+        lookups = {'{}__gt'.format(self.sequence_field): (number - 1) * self.per_page}
+        if number < self.num_pages:
+            lookups['{}__lte'.format(self.sequence_field)] = number * self.per_page
+        return self.object_list.filter(**lookups)
+
+
+class CursorPage(Page):
+    """
+    A page that provides the cursors that can be used to fetch the previous and the next pages.
+    """
+    def __init__(self, object_list, number, paginator):
+        super(CursorPage, self).__init__(object_list, number, paginator)
+        self.previous_cursor = paginator.get_cursor(object_list[0]) if object_list else None
+        self.next_cursor = paginator.get_cursor(object_list[-1]) if object_list else None
+
+
+class CursorPaginator(CountedPaginator):
+    """
+    A paginator that fetches the objects of a page that follows (or precedes) a given object by
+    filtering on the values of the ordering keys of this object (keyset pagination) instead of
+    using an OFFSET clause. The cursors of the first and of the last objects of each page are
+    provided by the page itself so that they can be added to the links toward the previous and
+    the next pages ; the other pages (and the pages requested without a cursor) are fetched using
+    an OFFSET clause. The keys must identify each object (eg. ['-last_post_on', '-id']).
+    """
+    cursor_separator = ','
+
+    def __init__(self, object_list, per_page, keys, count=None, after=None, before=None,
+                 **kwargs):
+        super(CursorPaginator, self).__init__(
+            object_list.order_by(*keys), per_page, count=count, **kwargs)
+        self.keys = keys
+        self.after = self.parse_cursor(after)
+        self.before = self.parse_cursor(before)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.after is not None:
+            object_list = list(
+                self.object_list.filter(self._get_keyset_filter(self.after))[:self.per_page])
+        elif self.before is not None:
+            object_list = list(
+                self.object_list.filter(self._get_keyset_filter(self.before, reverse=True))
+                .reverse()[:self.per_page])
+            object_list.reverse()
+        else:
+            object_list = list(self._get_objects(number))
+        return CursorPage(object_list, number, self)
+
+    def get_cursor(self, obj):
+        """
+        Returns the cursor corresponding to the given object or None if one of its keys is not
+        set.
+        """
+        values = [getattr(obj, key.lstrip('-')) for key in self.keys]
+        if any(value is None for value in values):
+            return None
+        return self.cursor_separator.join(
+            value.isoformat() if hasattr(value, 'isoformat') else force_text(value)
+            for value in values)
+
+    def parse_cursor(self, cursor):
+        """
+        Returns the values of the keys embedded in the given cursor or None if the cursor is not
+        valid.
+        """
+        if not cursor:
+            return None
+        parts = cursor.split(self.cursor_separator)
+        if len(parts) != len(self.keys):
+            return None
+        opts = self.object_list.model._meta
+        try:
+            return [
+                opts.get_field(key.lstrip('-')).to_python(part)
+                for key, part in zip(self.keys, parts)]
+        except ValidationError:
+            return None
+
+    def _get_keyset_filter(self, values, reverse=False):
+        # The objects following a cursor (a, b, c) are those for which a is after the value of the
+        # cursor, or a is equal to the value of the cursor and b is after the value of the
+        # cursor, and so on.
+        keyset_filter, equal_lookups = Q(), {}
+        for key, value in zip(self.keys, values):
+            field_name = key.lstrip('-')
+            descending = key.startswith('-') != reverse
+            lookups = dict(equal_lookups)
+            lookups['{}__{}'.format(field_name, 'lt' if descending else 'gt')] = value
+            keyset_filter |= Q(**lookups)
+            equal_lookups[field_name] = value
+        return keyset_filter
@@ -1,11 +1,25 @@
 # -*- coding: utf-8 -*-
 
 # Standard library imports
+import logging
+import threading
+
+try:
+    from queue import Queue
+except ImportError:  # pragma: no cover
+    from Queue import Queue
+
 # Third party imports
+from django.db import connection
 from django.shortcuts import _get_queryset
 
 # Local application / specific library imports
 
+logger = logging.getLogger(__name__)
+
+# The maximum number of values used in a single IN lookup
+IN_LOOKUP_MAX_SIZE = 500
+
 
 def get_object_or_none(klass, *args, **kwargs):
     """
@@ -24,3 +38,56 @@ def refresh(instance):
     Usage: instance = refresh(instance)
     """
     return instance.__class__.objects.get(pk=instance.pk)
+
+
+def iter_slices(values, size=IN_LOOKUP_MAX_SIZE):
+    """
+    Yields the given values by slices of at most size values. This allows to use large lists of
+    values in IN lookups.
+    """
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class BackgroundWorker(object):
+    """
+    Calls the functions that are queued using the enqueue() method in a daemon thread of the
+    current process. The thread is started when the first function is queued and the database
+    connection it uses is closed after each call.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, func, *args):
+        """
+        Queues the given function ; it will be called with the given arguments by the thread.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._queue = Queue()
+                self._thread = threading.Thread(target=self._work, name=self.name)
+                self._thread.daemon = True
+                self._thread.start()
+        self._queue.put((func, args))
+
+    def join(self):
+        """
+        Waits for the thread to call all the pending functions.
+        """
+        if self._queue is not None:
+            self._queue.join()
+
+    def _work(self):
+        while True:
+            func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception:  # pragma: no cover
+                logger.exception('Unable to perform a task of the {} thread'.format(self.name))
+            finally:
+                connection.close()
+                self._queue.task_done()
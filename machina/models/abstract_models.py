@@ -48,3 +48,59 @@ class DatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class DirtyFieldsModel(models.Model):
+    """
+    An abstract base class model that keeps the values of some fields as they were loaded from
+    the database in order to detect the changes made to these fields without querying the
+    database again. The names of the considered fields are defined by the ``tracked_fields``
+    attribute.
+    """
+    tracked_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(DirtyFieldsModel, cls).from_db(db, field_names, values)
+        tracked_attnames = [cls._meta.get_field(name).attname for name in cls.tracked_fields]
+        instance._loaded_values = dict(
+            (attname, value) for attname, value in zip(field_names, values)
+            if attname in tracked_attnames)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super(DirtyFieldsModel, self).save(*args, **kwargs)
+        # The saved values become the reference values for the next changes
+        update_fields = kwargs.get('update_fields')
+        loaded_values = self.__dict__.setdefault('_loaded_values', {})
+        for name in self.tracked_fields:
+            field = self._meta.get_field(name)
+            if update_fields is None or name in update_fields or field.attname in update_fields:
+                loaded_values[field.attname] = getattr(self, field.attname)
+
+    def get_loaded_value(self, field_name):
+        """
+        Returns the value of the given field as it was loaded from the database (or as it was
+        last saved). The value is fetched from the database if it was not kept, which happens if
+        the field was deferred or if the instance was not built from a database row.
+        """
+        attname = self._meta.get_field(field_name).attname
+        loaded_values = self.__dict__.get('_loaded_values', {})
+        if attname not in loaded_values:
+            loaded_values[attname] = self.__class__._default_manager \
+                .values_list(attname, flat=True).get(pk=self.pk)
+            self._loaded_values = loaded_values
+        return loaded_values[attname]
+
+    def has_changed(self, field_name):
+        """
+        Returns True if the value of the given field has been modified since the instance was
+        loaded from the database. New instances are never considered as modified.
+        """
+        if self.pk is None or self._state.adding:
+            return False
+        attname = self._meta.get_field(field_name).attname
+        return self.get_loaded_value(field_name) != getattr(self, attname)
@@ -22,7 +22,12 @@ from django.utils.translation import ugettext_lazy as _
 from machina.conf import settings as machina_settings
 
 
-_rendered_field_name = lambda name: '_{}_rendered'.format(name)
+def _rendered_field_name(name):
+    return '_{}_rendered'.format(name)
+
+
+def _rendered_source_name(name):
+    return '_{}_rendered_source'.format(name)
 
 
 def _get_markup_widget():
@@ -115,6 +120,10 @@ class MarkupTextDescriptor(object):
         if isinstance(value, MarkupText):
             instance.__dict__[self.field.name] = value.raw
             setattr(instance, self.rendered_field_name, value.rendered)
+            # The rendered data is the one of the raw value that was last rendered for the
+            # instance of the given MarkupText object
+            instance.__dict__[_rendered_source_name(self.field.name)] = \
+                value.instance.__dict__.get(_rendered_source_name(self.field.name))
         else:
             # Set only the raw field
             instance.__dict__[self.field.name] = value
@@ -150,8 +159,9 @@ class MarkupTextField(models.TextField):
             rendered_field = models.TextField(editable=False, blank=True, null=True)
             cls.add_to_class(_rendered_field_name(name), rendered_field)
 
-        # The data will be rendered before each save
+        # The data will be rendered before each save if it changed since it was last rendered
         signals.pre_save.connect(self.render_data, sender=cls)
+        signals.post_init.connect(self.track_rendered_data, sender=cls)
 
         # Add the default text field
         super(MarkupTextField, self).contribute_to_class(cls, name)
@@ -170,14 +180,28 @@ class MarkupTextField(models.TextField):
         except AttributeError:
             return value
 
-    def render_data(self, signal, sender, instance=None, **kwargs):
-        value = getattr(instance, self.attname)
-
-        rendered = None
-        if hasattr(value, 'raw'):
-            rendered = render_func(value.raw)
-
-        setattr(instance, _rendered_field_name(self.attname), rendered)
+    def track_rendered_data(self, signal, sender, instance=None, **kwargs):
+        # An instance built from a database row already holds the rendered version of its raw
+        # value: this raw value is the one that was last rendered.
+        if instance.__dict__.get(_rendered_field_name(self.attname)) is not None:
+            instance.__dict__[_rendered_source_name(self.attname)] = \
+                instance.__dict__.get(self.attname)
+
+    def render_data(self, signal, sender, instance=None, update_fields=None, **kwargs):
+        # The markup is not rendered if the field is not part of the saved fields or if its raw
+        # value did not change since it was last rendered.
+        if update_fields is not None and self.attname not in update_fields:
+            return
+        raw = instance.__dict__.get(self.attname)
+        rendered_field_name = _rendered_field_name(self.attname)
+        rendered_source_name = _rendered_source_name(self.attname)
+        if raw is not None and raw == instance.__dict__.get(rendered_source_name) \
+                and instance.__dict__.get(rendered_field_name) is not None:
+            return
+
+        rendered = render_func(raw) if raw is not None else None
+        setattr(instance, rendered_field_name, rendered)
+        instance.__dict__[rendered_source_name] = raw
 
     def formfield(self, **kwargs):
         if machina_settings.MACHINA_MARKUP_WIDGET:
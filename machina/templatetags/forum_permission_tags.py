@@ -38,3 +38,30 @@ def get_permission(context, method, *args, **kwargs):
 
     perm_method = getattr(perm_handler, method)
     return perm_method(*args, **kwargs)
+
+
+@register.assignment_tag(takes_context=True)
+def get_post_permission(context, method, post, user):
+    """
+    This will return a boolean indicating if the considered post permission (can_edit_post or
+    can_delete_post) is granted for the passed user. The permissions that were precomputed for
+    the same user by using the annotate_post_permissions method of the permission handler are
+    used if possible.
+
+    Usage::
+
+        {% get_post_permission 'can_edit_post' post request.user as var %}
+    """
+    allowed_method_names = ['can_edit_post', 'can_delete_post', ]
+    if method not in allowed_method_names:
+        raise template.TemplateSyntaxError(
+            'Only the following methods are allowed through '
+            'this templatetag: {}'.format(allowed_method_names))
+
+    user_permissions = getattr(post, 'user_permissions', None)
+    if user_permissions is not None and getattr(post, 'user_permissions_user', None) == user:
+        return user_permissions[method]
+
+    request = context.get('request', None)
+    perm_handler = request.forum_permission_handler if request else PermissionHandler()
+    return getattr(perm_handler, method)(post, user)
@@ -7,10 +7,6 @@ from __future__ import unicode_literals
 from django import template
 
 # Local application / specific library imports
-from machina.core.loading import get_class
-
-PermissionHandler = get_class('forum_permission.handler', 'PermissionHandler')
-perm_handler = PermissionHandler()
 
 register = template.Library()
 
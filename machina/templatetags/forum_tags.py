@@ -7,6 +7,7 @@ from __future__ import unicode_literals
 from django import template
 
 # Local application / specific library imports
+from machina.apps.forum.tree import forum_tree_cache
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
 
@@ -34,11 +35,29 @@ def get_forum_last_post(context, forum, user):
     return last_post
 
 
+@register.assignment_tag
+def get_forum_ancestors(forum):
+    """
+    This will return the ancestors of the passed forum, starting from the top-level forum. The
+    snapshot of the tree of forums is used if the forum tree cache is enabled.
+
+    Usage::
+
+        {% get_forum_ancestors forum as var %}
+    """
+    tree = forum_tree_cache.get_tree()
+    if tree is not None and forum in tree:
+        return tree.get_ancestor_nodes(forum)
+    return forum.get_ancestors()
+
+
 @register.inclusion_tag('machina/forum/forum_list.html', takes_context=True)
 def forum_list(context, forums):
     """
     This will render the given list of forums by respecting the order and the depth of each
-    forum in the forums tree.
+    forum in the forums tree. The request must have been processed by the
+    ForumPermissionHandlerMiddleware: the last posts of the forums are computed at once by the
+    permission handler attached to the request, which is also used by the tracking tags.
 
     Usage::
 
@@ -58,4 +77,8 @@ def forum_list(context, forums):
         data_dict['root_level_middle'] = root_level + 1
         data_dict['root_level_sub'] = root_level + 2
 
+        # The last posts of all the forums are computed at once ; they are cached by the
+        # permission handler that is used by the get_forum_last_post tag.
+        request.forum_permission_handler.get_forums_last_posts(forums_copy, request.user)
+
     return data_dict
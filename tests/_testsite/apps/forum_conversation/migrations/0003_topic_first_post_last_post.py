@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum_conversation', '0002_topic_dummy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='first_post',
+            field=models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to='forum_conversation.Post', null=True, verbose_name='First post'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='last_post',
+            field=models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to='forum_conversation.Post', null=True, verbose_name='Last post'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum_conversation', '0003_topic_first_post_last_post'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='sequence',
+            field=models.PositiveIntegerField(verbose_name='Sequence number', null=True, editable=False, blank=True),
+        ),
+        migrations.AlterIndexTogether(
+            name='post',
+            index_together=set([('topic', 'sequence')]),
+        ),
+    ]
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the forum permission subsystem.
+
+A synthetic board is generated using the machina test factories and the main operations of the
+permission handler are timed for a sample of users. The results (wall time and number of
+queries for each operation) are written as JSON so that they can be compared with the results of
+a previous run::
+
+    python -m tests.benchmarks.permissions --forums 200 --depth 4 --users 50 --groups 5 \
+        --output results.json
+    python -m tests.benchmarks.permissions --forums 200 --depth 4 --users 50 --groups 5 \
+        --compare results.json
+
+The command exits with a non-zero status if a regression is detected during a comparison.
+"""
+
+# Standard library imports
+from __future__ import print_function
+from __future__ import unicode_literals
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Third party imports
+# Local application / specific library imports
+
+PERMISSIONS = [
+    'can_see_forum', 'can_read_forum', 'can_start_new_topics', 'can_reply_to_topics',
+    'can_edit_own_posts', 'can_delete_own_posts', 'can_edit_posts', 'can_delete_posts',
+]
+
+OPERATIONS = [
+    'forum_list_filter', 'get_forum_last_post', 'can_checks', '_get_forums_for_user',
+]
+
+
+def build_board(forums=50, depth=3, users=20, groups=4, seed=0):
+    """
+    Generates a board made of the given number of forums (distributed over the given number of
+    levels), users and groups. Users are randomly assigned to groups and a mix of global and
+    per-forum permissions (granted or not) is assigned to users, groups and anonymous users.
+    Returns a dictionary containing the created forums, posts and users.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    from machina.core.loading import get_class
+    from machina.test.factories import create_category_forum
+    from machina.test.factories import create_forum
+    from machina.test.factories import create_topic
+    from machina.test.factories import GroupFactory
+    from machina.test.factories import PostFactory
+    from machina.test.factories import UserFactory
+
+    assign_perm = get_class('forum_permission.shortcuts', 'assign_perm')
+
+    rand = random.Random(seed)
+    depth = max(1, depth)
+
+    # Forums are created level by level ; each forum is attached to a random forum of the
+    # previous level.
+    created_forums, forums_by_level = [], [[] for _ in range(depth)]
+    for i in range(forums):
+        level = i % depth if i >= depth else i
+        if level == 0:
+            forum = create_category_forum()
+        else:
+            forum = create_forum(parent=rand.choice(forums_by_level[level - 1]))
+        forums_by_level[level].append(forum)
+        created_forums.append(forum)
+
+    created_users = [UserFactory.create() for _ in range(users)]
+    created_groups = [GroupFactory.create() for _ in range(groups)]
+    for user in created_users:
+        if created_groups and rand.random() < 0.5:
+            user.groups.add(rand.choice(created_groups))
+
+    # Each post-type forum contains a topic with a post.
+    posts = []
+    for forum in created_forums:
+        if forum.is_forum:
+            poster = rand.choice(created_users) if created_users else UserFactory.create()
+            topic = create_topic(forum=forum, poster=poster)
+            posts.append(PostFactory.create(topic=topic, poster=poster))
+
+    def assign_random_perms(user_or_group):
+        if rand.random() < 0.3:
+            assign_perm('can_see_forum', user_or_group, None)
+            assign_perm('can_read_forum', user_or_group, None)
+        for forum in rand.sample(created_forums, min(len(created_forums), 5)):
+            for perm in rand.sample(PERMISSIONS, 2):
+                assign_perm(perm, user_or_group, forum, has_perm=rand.random() < 0.8)
+
+    assign_random_perms(AnonymousUser())
+    for user_or_group in created_users + created_groups:
+        assign_random_perms(user_or_group)
+
+    return {'forums': created_forums, 'posts': posts, 'users': created_users}
+
+
+def run_operation(operation, board, user):
+    """
+    Runs the given operation for the given user with a new permission handler and returns the
+    number of performed calls.
+    """
+    from machina.core.db.models import get_model
+    from machina.core.loading import get_class
+
+    Forum = get_model('forum', 'Forum')
+    PermissionHandler = get_class('forum_permission.handler', 'PermissionHandler')
+
+    handler = PermissionHandler()
+
+    if operation == 'forum_list_filter':
+        list(handler.forum_list_filter(Forum.objects.all(), user))
+        return 1
+    elif operation == 'get_forum_last_post':
+        top_level_forums = [f for f in board['forums'] if f.level == 0]
+        for forum in top_level_forums:
+            handler.get_forum_last_post(forum, user)
+        return len(top_level_forums)
+    elif operation == 'can_checks':
+        calls = 0
+        for forum in board['forums']:
+            handler.can_read_forum(forum, user)
+            handler.can_add_topic(forum, user)
+            calls += 2
+        for post in board['posts']:
+            handler.can_edit_post(post, user)
+            handler.can_delete_post(post, user)
+            calls += 2
+        return calls
+    elif operation == '_get_forums_for_user':
+        list(handler._get_forums_for_user(user, ['can_see_forum', 'can_read_forum', ]))
+        return 1
+    raise ValueError('Unknown operation: {}'.format(operation))
+
+
+def run_benchmarks(board, operations=OPERATIONS, repeat=1):
+    """
+    Times each operation for the anonymous user and for each user of the board. Returns a
+    dictionary of results indexed by operation names.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    users = [AnonymousUser(), ] + list(board['users'])
+    results = {}
+
+    for operation in operations:
+        calls, queries, elapsed = 0, 0, 0.0
+        for _ in range(repeat):
+            for user in users:
+                with CaptureQueriesContext(connection) as captured_queries:
+                    start = time.time()
+                    calls += run_operation(operation, board, user)
+                    elapsed += time.time() - start
+                queries += len(captured_queries)
+        results[operation] = {
+            'runs': repeat * len(users),
+            'calls': calls,
+            'total_time': elapsed,
+            'time_per_run': elapsed / (repeat * len(users)),
+            'queries': queries,
+            'queries_per_run': float(queries) / (repeat * len(users)),
+        }
+
+    return results
+
+
+def compare_results(results, baseline, time_threshold=1.5):
+    """
+    Compares the given results with the results of a previous run. Returns a list of messages
+    describing the detected regressions: an operation regresses if it performs more queries
+    than before or if it is slower than before by more than the given ratio.
+    """
+    regressions = []
+    for operation, result in results.items():
+        previous = baseline.get(operation)
+        if previous is None:
+            continue
+        if result['queries_per_run'] > previous['queries_per_run']:
+            regressions.append('{}: {:.2f} queries per run (was {:.2f})'.format(
+                operation, result['queries_per_run'], previous['queries_per_run']))
+        if previous['time_per_run'] and \
+                result['time_per_run'] > previous['time_per_run'] * time_threshold:
+            regressions.append('{}: {:.6f}s per run (was {:.6f}s)'.format(
+                operation, result['time_per_run'], previous['time_per_run']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the forum permission subsystem.')
+    parser.add_argument('--forums', type=int, default=50, help='Number of forums')
+    parser.add_argument('--depth', type=int, default=3, help='Depth of the tree of forums')
+    parser.add_argument('--users', type=int, default=20, help='Number of users')
+    parser.add_argument('--groups', type=int, default=4, help='Number of groups')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of runs for each user')
+    parser.add_argument('--seed', type=int, default=0, help='Seed used to generate the board')
+    parser.add_argument('--output', help='File where the JSON results should be written')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    parser.add_argument(
+        '--time-threshold', type=float, default=1.5,
+        help='Slowdown ratio above which an operation is considered as regressing')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.test.utils import teardown_test_environment
+
+    django.setup()
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+
+    try:
+        parameters = {
+            'forums': args.forums, 'depth': args.depth, 'users': args.users,
+            'groups': args.groups, 'repeat': args.repeat, 'seed': args.seed,
+        }
+        board = build_board(args.forums, args.depth, args.users, args.groups, args.seed)
+        results = run_benchmarks(board, repeat=args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    output = json.dumps({'parameters': parameters, 'results': results}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('parameters') != parameters:
+            print('Warning: the compared results were obtained with other parameters',
+                  file=sys.stderr)
+        regressions = compare_results(results, baseline['results'], args.time_threshold)
+        for regression in regressions:
+            print('Regression: {}'.format(regression), file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+import pytest
+
+# Local application / specific library imports
+from tests.benchmarks.permissions import build_board
+from tests.benchmarks.permissions import compare_results
+from tests.benchmarks.permissions import OPERATIONS
+from tests.benchmarks.permissions import run_benchmarks
+
+
+@pytest.mark.django_db
+class TestPermissionBenchmarks(object):
+    def test_can_time_the_permission_operations_on_a_synthetic_board(self):
+        # Setup
+        board = build_board(forums=6, depth=3, users=2, groups=1)
+        # Run
+        results = run_benchmarks(board)
+        # Check
+        assert len(board['forums']) == 6
+        assert set(results.keys()) == set(OPERATIONS)
+        for result in results.values():
+            assert result['runs'] == 3
+            assert result['calls'] > 0
+            assert result['queries'] > 0
+
+    def test_can_detect_regressions(self):
+        # Setup
+        baseline = {'forum_list_filter': {'queries_per_run': 2, 'time_per_run': 0.1}}
+        results = {'forum_list_filter': {'queries_per_run': 3, 'time_per_run': 0.5}}
+        # Run
+        regressions = compare_results(results, baseline, time_threshold=2)
+        # Check
+        assert len(regressions) == 2
+        assert not compare_results(baseline, baseline)
@@ -17,6 +17,7 @@ from machina.apps.forum_conversation.forum_attachments.forms import AttachmentFo
 from machina.apps.forum_conversation.forum_polls.forms import TopicPollOptionFormset
 from machina.apps.forum_conversation.forum_polls.forms import TopicPollVoteForm
 from machina.apps.forum_conversation.signals import topic_viewed
+from machina.conf import settings as machina_settings
 from machina.core.compat import force_bytes
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
@@ -63,6 +64,9 @@ class TestTopicView(BaseClientTestCase):
         # Assign some permissions
         assign_perm('can_read_forum', self.user, self.top_level_forum)
 
+    def teardown_method(self, method):
+        machina_settings.KEYSET_PAGINATION = False
+
     def test_browsing_works(self):
         # Setup
         correct_url = self.topic.get_absolute_url()
@@ -177,6 +181,20 @@ class TestTopicView(BaseClientTestCase):
         response = self.client.get(correct_url, {'post': last_post_pk}, follow=True)
         assert response.context_data['page_obj'].number == 3
 
+    def test_can_paginate_the_posts_using_their_sequence_numbers(self):
+        # Setup
+        machina_settings.KEYSET_PAGINATION = True
+        for _ in range(0, 40):
+            # 15 posts per page
+            PostFactory.create(topic=self.topic, poster=self.user)
+        correct_url = self.topic.get_absolute_url()
+        # Run
+        response = self.client.get(correct_url, {'post': self.topic.last_post.pk})
+        # Check
+        assert response.context_data['page_obj'].number == 3
+        assert list(response.context_data['posts']) == \
+            list(self.topic.posts.order_by('created')[30:])
+
     def test_properly_handles_a_bad_post_id_in_parameters(self):
         # Setup
         for _ in range(0, 40):
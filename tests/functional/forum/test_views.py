@@ -8,10 +8,13 @@ import pytest
 
 # Local application / specific library imports
 from machina.apps.forum.signals import forum_viewed
+from machina.conf import settings as machina_settings
 from machina.core.db.models import get_model
 from machina.core.loading import get_class
 from machina.test.factories import create_forum
 from machina.test.factories import create_link_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
 from machina.test.testcases import BaseClientTestCase
 from machina.test.utils import mock_signal_receiver
 
@@ -37,6 +40,32 @@ class TestForumView(BaseClientTestCase):
         assign_perm('can_read_forum', self.user, self.top_level_forum)
         assign_perm('can_read_forum', self.user, self.top_level_link)
 
+    def teardown_method(self, method):
+        machina_settings.KEYSET_PAGINATION = False
+
+    def test_can_paginate_the_topics_using_cursors(self):
+        # Setup
+        machina_settings.KEYSET_PAGINATION = True
+        sub_forum = create_forum(parent=self.top_level_forum)
+        PostFactory.create(topic=create_topic(forum=sub_forum, poster=self.user), poster=self.user)
+        announce = create_topic(
+            forum=self.top_level_forum, poster=self.user, type=Topic.TYPE_CHOICES.topic_announce)
+        PostFactory.create(topic=announce, poster=self.user)
+        for _ in range(25):
+            topic = create_topic(forum=self.top_level_forum, poster=self.user)
+            PostFactory.create(topic=topic, poster=self.user)
+        correct_url = self.top_level_forum.get_absolute_url()
+        # Run
+        response = self.client.get(correct_url)
+        page_obj = response.context_data['page_obj']
+        next_response = self.client.get(
+            correct_url, {'page': 2, 'after': page_obj.next_cursor})
+        # Check
+        assert page_obj.paginator.count == 25
+        assert page_obj.paginator.num_pages == 2
+        assert len(next_response.context_data['topics']) == 5
+        assert not set(response.context_data['topics']) & set(next_response.context_data['topics'])
+
     def test_browsing_works(self):
         # Setup
         correct_url = self.top_level_forum.get_absolute_url()
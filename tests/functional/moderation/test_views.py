@@ -745,6 +745,22 @@ class TestPostApproveView(BaseClientTestCase):
         post = refresh(self.post)
         assert post.approved
 
+    def test_can_approve_the_first_post_of_a_queued_topic(self):
+        # Setup
+        topic = create_topic(forum=self.top_level_forum, poster=self.user, approved=False)
+        post = PostFactory.create(topic=topic, poster=self.user, approved=False)
+        correct_url = reverse(
+            'forum_moderation:approve_queued_post',
+            kwargs={'pk': post.pk})
+        # Run
+        self.client.post(correct_url, follow=True)
+        # Check
+        topic = refresh(topic)
+        assert topic.approved
+        assert topic.posts_count == 1
+        assert topic.last_post == post
+        assert refresh(self.top_level_forum).topics_count == 2
+
     def test_redirects_to_the_moderation_queue(self):
         # Setup
         correct_url = reverse(
@@ -837,3 +853,198 @@ class TestPostDisapproveView(BaseClientTestCase):
         response = self.client.get(correct_url, follow=True)
         # Check
         assert response.status_code == 403
+
+
+class TestPostsApproveView(BaseClientTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Set up some top-level forums
+        self.forum_1 = create_forum()
+        self.forum_2 = create_forum()
+
+        # Set up some topics and some queued posts
+        self.topic_1 = create_topic(forum=self.forum_1, poster=self.user)
+        PostFactory.create(topic=self.topic_1, poster=self.user)
+        self.post_1 = PostFactory.create(topic=self.topic_1, poster=self.user, approved=False)
+        self.topic_2 = create_topic(forum=self.forum_2, poster=self.user, approved=False)
+        self.post_2 = PostFactory.create(topic=self.topic_2, poster=self.user, approved=False)
+
+        # Assign some permissions
+        assign_perm('can_approve_posts', self.user, self.forum_1)
+        assign_perm('can_approve_posts', self.user, self.forum_2)
+
+    def test_can_approve_many_posts(self):
+        # Setup
+        correct_url = reverse('forum_moderation:approve_queued_posts')
+        # Run
+        response = self.client.post(
+            correct_url, {'pk': [self.post_1.pk, self.post_2.pk]}, follow=True)
+        # Check
+        assert refresh(self.post_1).approved
+        assert refresh(self.post_2).approved
+        assert refresh(self.topic_2).approved
+        last_url, status_code = response.redirect_chain[-1]
+        assert reverse('forum_moderation:queue') in last_url
+
+    def test_cannot_be_used_by_users_who_cannot_approve_the_posts_of_all_the_forums(self):
+        # Setup
+        remove_perm('can_approve_posts', self.user, self.forum_2)
+        correct_url = reverse('forum_moderation:approve_queued_posts')
+        # Run
+        response = self.client.post(correct_url, {'pk': [self.post_1.pk, self.post_2.pk]})
+        # Check
+        assert response.status_code == 403
+        assert not refresh(self.post_1).approved
+
+    def test_cannot_be_browsed(self):
+        # Setup
+        correct_url = reverse('forum_moderation:approve_queued_posts')
+        # Run
+        response = self.client.get(correct_url)
+        # Check
+        assert response.status_code == 405
+
+
+class TestPostsDisapproveView(BaseClientTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Set up a top-level forum
+        self.top_level_forum = create_forum()
+
+        # Set up a topic and some queued posts
+        self.topic = create_topic(forum=self.top_level_forum, poster=self.user)
+        PostFactory.create(topic=self.topic, poster=self.user)
+        self.post_1 = PostFactory.create(topic=self.topic, poster=self.user, approved=False)
+        self.post_2 = PostFactory.create(topic=self.topic, poster=self.user, approved=False)
+
+        # Assign some permissions
+        assign_perm('can_approve_posts', self.user, self.top_level_forum)
+
+    def test_can_disapprove_many_posts(self):
+        # Setup
+        correct_url = reverse('forum_moderation:disapprove_queued_posts')
+        # Run
+        response = self.client.post(
+            correct_url, {'pk': [self.post_1.pk, self.post_2.pk]}, follow=True)
+        # Check
+        assert not Post.objects.filter(approved=False).exists()
+        last_url, status_code = response.redirect_chain[-1]
+        assert reverse('forum_moderation:queue') in last_url
+
+    def test_cannot_be_used_by_users_who_cannot_approve_posts(self):
+        # Setup
+        remove_perm('can_approve_posts', self.user, self.top_level_forum)
+        correct_url = reverse('forum_moderation:disapprove_queued_posts')
+        # Run
+        response = self.client.post(correct_url, {'pk': [self.post_1.pk, ]})
+        # Check
+        assert response.status_code == 403
+        assert Post.objects.filter(pk=self.post_1.pk).exists()
+
+
+class TestTopicsDeleteView(BaseClientTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Set up a top-level forum
+        self.top_level_forum = create_forum()
+
+        # Set up some topics
+        self.topics = []
+        for _ in range(3):
+            topic = create_topic(forum=self.top_level_forum, poster=self.user)
+            PostFactory.create(topic=topic, poster=self.user)
+            self.topics.append(topic)
+
+        # Assign some permissions
+        assign_perm('can_read_forum', self.user, self.top_level_forum)
+        assign_perm('can_delete_posts', self.user, self.top_level_forum)
+
+    def test_can_delete_many_topics(self):
+        # Setup
+        correct_url = reverse('forum_moderation:topics_delete')
+        # Run
+        response = self.client.post(
+            correct_url, {'pk': [self.topics[0].pk, self.topics[1].pk]}, follow=True)
+        # Check
+        assert list(Topic.objects.all()) == [self.topics[2], ]
+        forum_url = reverse(
+            'forum:forum', kwargs={'slug': self.top_level_forum.slug, 'pk': self.top_level_forum.pk})
+        last_url, status_code = response.redirect_chain[-1]
+        assert forum_url in last_url
+
+    def test_cannot_be_used_by_users_who_cannot_delete_topics(self):
+        # Setup
+        remove_perm('can_delete_posts', self.user, self.top_level_forum)
+        correct_url = reverse('forum_moderation:topics_delete')
+        # Run
+        response = self.client.post(correct_url, {'pk': [self.topics[0].pk, ]})
+        # Check
+        assert response.status_code == 403
+        assert Topic.objects.count() == 3
+
+    def test_cannot_be_used_without_topics(self):
+        # Setup
+        correct_url = reverse('forum_moderation:topics_delete')
+        # Run
+        response = self.client.post(correct_url, {'pk': ['unknown', ]})
+        # Check
+        assert response.status_code == 403
+
+
+class TestTopicsMoveView(BaseClientTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Set up some top-level forums
+        self.forum_1 = create_forum()
+        self.forum_2 = create_forum()
+
+        # Set up some topics
+        self.topics = []
+        for _ in range(2):
+            topic = create_topic(forum=self.forum_1, poster=self.user)
+            PostFactory.create(topic=topic, poster=self.user)
+            self.topics.append(topic)
+
+        # Assign some permissions
+        assign_perm('can_read_forum', self.user, self.forum_1)
+        assign_perm('can_read_forum', self.user, self.forum_2)
+        assign_perm('can_move_topics', self.user, self.forum_1)
+        assign_perm('can_move_topics', self.user, self.forum_2)
+
+    def test_can_move_many_topics(self):
+        # Setup
+        correct_url = reverse('forum_moderation:topics_move')
+        # Run
+        response = self.client.post(
+            correct_url,
+            {'pk': [topic.pk for topic in self.topics], 'forum': self.forum_2.pk,
+             'lock_topics': '1'},
+            follow=True)
+        # Check
+        assert set(self.forum_2.topics.all()) == set(self.topics)
+        assert refresh(self.topics[0]).is_locked
+        assert refresh(self.forum_2).topics_count == 2
+        assert refresh(self.forum_1).topics_count == 0
+        forum_url = reverse(
+            'forum:forum', kwargs={'slug': self.forum_2.slug, 'pk': self.forum_2.pk})
+        last_url, status_code = response.redirect_chain[-1]
+        assert forum_url in last_url
+
+    def test_cannot_be_used_by_users_who_cannot_move_topics_to_the_destination_forum(self):
+        # Setup
+        remove_perm('can_move_topics', self.user, self.forum_2)
+        correct_url = reverse('forum_moderation:topics_move')
+        # Run
+        response = self.client.post(
+            correct_url, {'pk': [self.topics[0].pk, ], 'forum': self.forum_2.pk})
+        # Check
+        assert response.status_code == 403
+        assert not self.forum_2.topics.exists()
+
+    def test_cannot_be_used_without_a_valid_destination_forum(self):
+        # Setup
+        correct_url = reverse('forum_moderation:topics_move')
+        # Run
+        response = self.client.post(correct_url, {'pk': [self.topics[0].pk, ], 'forum': 'x'})
+        # Check
+        assert response.status_code == 403
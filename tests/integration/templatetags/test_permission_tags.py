@@ -4,10 +4,12 @@
 from __future__ import unicode_literals
 
 # Third party imports
+from django.db import connection
 from django.template import Context
 from django.template import TemplateSyntaxError
 from django.template.base import Template
 from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 # Local application / specific library imports
@@ -316,3 +318,97 @@ class TestGetPermissionTag(object):
             t = Template(self.loadstatement + raw_template)
             with pytest.raises(TemplateSyntaxError):
                 t.render(context)
+
+
+@pytest.mark.django_db
+class TestGetPostPermissionTag(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.loadstatement = '{% load forum_permission_tags %}'
+        self.request_factory = RequestFactory()
+
+        self.u1 = UserFactory.create()
+        self.u2 = UserFactory.create()
+        self.moderator = UserFactory.create()
+
+        # Set up a top-level forum, a topic and some posts
+        self.forum = create_forum()
+        self.topic = create_topic(forum=self.forum, poster=self.u1)
+        self.post_1 = PostFactory.create(topic=self.topic, poster=self.u1)
+        self.post_2 = PostFactory.create(topic=self.topic, poster=self.u2)
+
+        assign_perm('can_edit_own_posts', self.u1, self.forum)
+        assign_perm('can_edit_posts', self.moderator, self.forum)
+        assign_perm('can_delete_posts', self.moderator, self.forum)
+
+    def get_rendered(self, posts, user, annotate=True):
+        request = self.request_factory.get('/')
+        request.user = user
+        ForumPermissionHandlerMiddleware().process_request(request)
+        if annotate:
+            posts = request.forum_permission_handler.annotate_post_permissions(posts, user)
+        t = Template(
+            self.loadstatement + '{% for post in posts %}'
+            '{% get_post_permission \'can_edit_post\' post request.user as user_can_edit_post %}'
+            '{% get_post_permission \'can_delete_post\' post request.user as user_can_delete_post %}'
+            '{% if user_can_edit_post %}E{% else %}-{% endif %}'
+            '{% if user_can_delete_post %}D{% else %}-{% endif %}'
+            '{% endfor %}')
+        c = Context({'posts': posts, 'request': request})
+        return t.render(c)
+
+    def test_can_tell_if_the_user_can_edit_or_delete_precomputed_posts(self):
+        # Run & check
+        assert self.get_rendered([self.post_1, self.post_2], self.u1) == 'E---'
+        assert self.get_rendered([self.post_1, self.post_2], self.u2) == '----'
+        assert self.get_rendered([self.post_1, self.post_2], self.moderator) == 'EDED'
+
+    def test_does_not_perform_permission_queries_for_precomputed_posts(self):
+        # Setup
+        request = self.request_factory.get('/')
+        request.user = self.moderator
+        ForumPermissionHandlerMiddleware().process_request(request)
+        posts = request.forum_permission_handler.annotate_post_permissions(
+            [self.post_1, self.post_2], self.moderator)
+        t = Template(
+            self.loadstatement + '{% for post in posts %}'
+            '{% get_post_permission \'can_edit_post\' post request.user as user_can_edit_post %}'
+            '{% if user_can_edit_post %}E{% endif %}{% endfor %}')
+        # Run
+        with CaptureQueriesContext(connection) as queries:
+            rendered = t.render(Context({'posts': posts, 'request': request}))
+        # Check
+        assert rendered == 'EE'
+        assert len(queries) == 0
+
+    def test_can_fall_back_to_the_permission_handler_if_the_posts_were_not_precomputed(self):
+        # Run & check
+        assert self.get_rendered([self.post_1, self.post_2], self.u1, annotate=False) == 'E---'
+        assert self.get_rendered([self.post_1, self.post_2], self.moderator, annotate=False) == 'EDED'
+
+    def test_does_not_use_the_permissions_that_were_precomputed_for_another_user(self):
+        # Setup
+        request = self.request_factory.get('/')
+        request.user = self.u1
+        ForumPermissionHandlerMiddleware().process_request(request)
+        posts = request.forum_permission_handler.annotate_post_permissions(
+            [self.post_1, self.post_2], self.moderator)
+        t = Template(
+            self.loadstatement + '{% for post in posts %}'
+            '{% get_post_permission \'can_edit_post\' post request.user as user_can_edit_post %}'
+            '{% if user_can_edit_post %}E{% else %}-{% endif %}{% endfor %}')
+        # Run
+        rendered = t.render(Context({'posts': posts, 'request': request}))
+        # Check
+        assert rendered == 'E-'
+
+    def test_raises_if_the_considered_permission_is_unknown(self):
+        # Setup
+        request = self.request_factory.get('/')
+        request.user = self.u1
+        t = Template(
+            self.loadstatement
+            + '{% get_post_permission \'can_approve_posts\' post request.user as var %}')
+        # Run & check
+        with pytest.raises(TemplateSyntaxError):
+            t.render(Context({'post': self.post_1, 'request': request}))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django import VERSION as DJANGO_VERSION
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+from machina.core.loading import get_class
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Forum = get_model('forum', 'Forum')
+ForumProfile = get_model('forum_member', 'ForumProfile')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+PostingHandler = get_class('forum_conversation.handler', 'PostingHandler')
+
+# The maximum number of queries that can be performed to create a post or a topic (including the
+# queries used to manage the transaction and the one locking the row of the topic) ; the last
+# posts of the topic and of the forums are updated using separate queries on Django versions
+# older than 1.8.
+POST_CREATION_QUERIES_BUDGET = 7 if DJANGO_VERSION >= (1, 8) else 9
+TOPIC_CREATION_QUERIES_BUDGET = 8 if DJANGO_VERSION >= (1, 8) else 10
+
+
+@pytest.mark.django_db
+class TestPostingHandler(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.posting_handler = PostingHandler()
+
+        # Set up a small forum and a large forum nested inside a deep tree of forums
+        self.small_forum = create_forum()
+        self.small_topic = create_topic(forum=self.small_forum, poster=self.u1)
+        PostFactory.create(topic=self.small_topic, poster=self.u1)
+
+        parent = create_category_forum()
+        for _ in range(5):
+            parent = create_forum(parent=parent)
+        self.large_forum = parent
+        self.large_topic = create_topic(forum=self.large_forum, poster=self.u1)
+        for _ in range(30):
+            PostFactory.create(topic=self.large_topic, poster=self.u1)
+        for _ in range(10):
+            topic = create_topic(forum=self.large_forum, poster=self.u1)
+            PostFactory.create(topic=topic, poster=self.u1)
+
+    def create_post(self, topic):
+        forum = Forum.objects.get(pk=topic.forum_id)
+        topic = Topic.objects.get(pk=topic.pk)
+        post = Post(topic=topic, poster=self.u1, subject='Reply', content='Reply content')
+        with CaptureQueriesContext(connection) as captured_queries:
+            self.posting_handler.create_post(post, forum=forum)
+        return post, len(captured_queries)
+
+    def create_topic(self, forum):
+        forum = Forum.objects.get(pk=forum.pk)
+        topic = Topic(
+            forum=forum, poster=self.u1, subject='Topic', type=Topic.TYPE_CHOICES.topic_post,
+            status=Topic.STATUS_CHOICES.topic_unlocked, approved=True)
+        post = Post(poster=self.u1, subject='Topic', content='Topic content')
+        with CaptureQueriesContext(connection) as captured_queries:
+            self.posting_handler.create_topic(topic, post)
+        return topic, len(captured_queries)
+
+    def test_creates_a_post_with_a_constant_number_of_queries(self):
+        # Run
+        _, small_topic_queries_count = self.create_post(self.small_topic)
+        post, large_topic_queries_count = self.create_post(self.large_topic)
+        # Check
+        assert small_topic_queries_count == large_topic_queries_count
+        assert large_topic_queries_count <= POST_CREATION_QUERIES_BUDGET
+        topic = Topic.objects.get(pk=self.large_topic.pk)
+        assert topic.posts_count == 31
+        assert topic.last_post == post
+        assert post.sequence == 31
+        for forum in Forum.objects.get(pk=self.large_forum.pk).get_ancestors(include_self=True):
+            assert forum.posts_count == 41
+            assert forum.last_post == post
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 43
+
+    def test_creates_a_topic_with_a_constant_number_of_queries(self):
+        # Run
+        _, small_forum_queries_count = self.create_topic(self.small_forum)
+        topic, large_forum_queries_count = self.create_topic(self.large_forum)
+        # Check
+        assert small_forum_queries_count == large_forum_queries_count
+        assert large_forum_queries_count <= TOPIC_CREATION_QUERIES_BUDGET
+        topic = Topic.objects.get(pk=topic.pk)
+        assert topic.posts_count == 1
+        assert topic.first_post == topic.last_post
+        for forum in Forum.objects.get(pk=self.large_forum.pk).get_ancestors(include_self=True):
+            assert forum.topics_count == 12
+            assert forum.last_post == topic.last_post
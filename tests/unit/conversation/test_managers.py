@@ -4,6 +4,8 @@
 from __future__ import unicode_literals
 
 # Third party imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 # Local application / specific library imports
@@ -57,3 +59,53 @@ class TestApprovedManager(object):
         posts = Post.approved_objects.all()
         # Check
         assert set(posts) == set([self.post_1, self.post_2, ])
+
+
+@pytest.mark.django_db
+class TestTopicManager(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.u2 = UserFactory.create()
+
+        # Set up a top-level category and a forum
+        self.top_level_cat = create_category_forum()
+        self.forum = create_forum(parent=self.top_level_cat)
+
+        # Set up some topics and posts
+        self.topics = []
+        for i in range(5):
+            topic = create_topic(forum=self.forum, poster=self.u1)
+            PostFactory.create(topic=topic, poster=self.u1)
+            PostFactory.create(topic=topic, poster=self.u2)
+            self.topics.append(topic)
+        self.anonymous_topic = create_topic(forum=self.forum, poster=None)
+        PostFactory.create(topic=self.anonymous_topic, poster=None, username='anonymous')
+
+    def get_list_data(self, topics):
+        return [
+            (topic.forum.slug, topic.poster, topic.first_post.username, topic.last_post.pk,
+             topic.last_post.poster)
+            for topic in topics]
+
+    def test_can_fetch_the_data_displayed_in_the_lists_of_topics_using_a_fixed_number_of_queries(self):
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            list_data = self.get_list_data(
+                Topic.objects.filter(forum=self.forum).order_by('pk').with_list_data())
+        # Check
+        assert len(captured_queries) == 4
+        assert list_data == self.get_list_data(Topic.objects.filter(forum=self.forum).order_by('pk'))
+        assert list_data[0][1:] == (self.u1, None, self.topics[0].last_post.pk, self.u2)
+        assert list_data[-1][1:] == (None, 'anonymous', self.anonymous_topic.last_post.pk, None)
+
+    def test_can_be_used_from_the_related_manager_of_a_forum(self):
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            topics = list(self.forum.topics.with_list_data())
+            for topic in topics:
+                topic.first_post
+                topic.last_post.poster
+        # Check
+        assert len(captured_queries) == 4
+        assert set(topics) == set(self.topics + [self.anonymous_topic, ])
@@ -5,6 +5,8 @@ from __future__ import unicode_literals
 
 # Third party imports
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from faker import Factory as FakerFactory
 import pytest
 
@@ -90,6 +92,37 @@ class TestTopic(object):
         topic = refresh(self.topic)
         assert topic.last_post == middle_post
 
+    def test_can_detect_that_it_was_moved_without_querying_its_previous_forum(self):
+        # Setup
+        new_forum = create_forum()
+        topic = Topic.objects.get(pk=self.topic.pk)
+        # Run
+        topic.forum = new_forum
+        with CaptureQueriesContext(connection) as captured_queries:
+            topic.save()
+        # Check
+        assert not [
+            q for q in captured_queries
+            if 'FROM "forum_conversation_topic" WHERE "forum_conversation_topic"."id" =' in q['sql']]
+        assert topic.get_loaded_value('forum') == new_forum.pk
+        assert refresh(new_forum).topics_count == 1
+        assert refresh(self.top_level_forum).topics_count == 0
+
+    def test_stores_its_first_and_last_posts_along_with_those_of_its_forum(self):
+        # Setup
+        middle_post = PostFactory.create(topic=self.topic, poster=self.u1)
+        last_post = PostFactory.create(topic=self.topic, poster=self.u1)
+        # Run
+        last_post.delete()
+        # Check
+        topic = refresh(self.topic)
+        forum = refresh(self.top_level_forum)
+        assert topic.first_post_id == self.post.pk
+        assert topic.last_post_id == middle_post.pk
+        assert forum.last_post_id == middle_post.pk
+        assert self.post.is_topic_head
+        assert refresh(middle_post).is_topic_tail
+
     def test_cannot_update_its_last_post_date_with_the_creation_date_of_a_non_approved_post(self):
         # Setup
         create_topic(forum=self.top_level_forum, poster=self.u1)
@@ -193,6 +226,48 @@ class TestPost(object):
         assert post_2.position == 2
         assert post_3.position == 3
 
+    def test_knows_its_position_inside_the_topic_without_counting_the_previous_posts(self):
+        # Setup
+        PostFactory.create(topic=self.topic, poster=self.u1)
+        post_3 = Post.objects.get(pk=PostFactory.create(topic=self.topic, poster=self.u1).pk)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            position = post_3.position
+        # Check
+        assert position == 3
+        assert len(captured_queries) == 0
+
+    def test_keeps_the_sequence_numbers_of_the_posts_up_to_date(self):
+        # Setup
+        post_2 = PostFactory.create(topic=self.topic, poster=self.u1)
+        post_3 = PostFactory.create(topic=self.topic, poster=self.u1, approved=False)
+        post_4 = PostFactory.create(topic=self.topic, poster=self.u1)
+
+        def sequences():
+            return [refresh(p).sequence for p in (self.post, post_2, post_3, post_4)]
+
+        # Run & check
+        assert sequences() == [1, 2, None, 3]
+        post_3.approved = True
+        post_3.save()
+        assert sequences() == [1, 2, 3, 4]
+        post_2.approved = False
+        post_2.save()
+        assert sequences() == [1, None, 2, 3]
+        post_3.delete()
+        assert [refresh(p).sequence for p in (self.post, post_4)] == [1, 2]
+
+    def test_gets_distinct_sequence_numbers_when_created_using_outdated_topics(self):
+        # Setup
+        topic_1 = Topic.objects.get(pk=self.topic.pk)
+        topic_2 = Topic.objects.get(pk=self.topic.pk)
+        # Run
+        post_2 = PostFactory.create(topic=topic_1, poster=self.u1)
+        post_3 = PostFactory.create(topic=topic_2, poster=self.u1)
+        # Check
+        assert [refresh(p).sequence for p in (self.post, post_2, post_3)] == [1, 2, 3]
+        assert refresh(self.topic).posts_count == 3
+
     def test_is_both_topic_head_and_tail_if_it_is_alone_in_the_topic(self):
         # Check
         assert self.post.is_topic_head
@@ -205,6 +280,25 @@ class TestPost(object):
         with pytest.raises(Topic.DoesNotExist):
             Topic.objects.get(pk=self.topic_pk)
 
+    def test_deletion_should_result_in_the_topic_deletion_if_it_is_alone_in_a_queued_topic(self):
+        # Setup
+        topic = create_topic(forum=self.top_level_forum, poster=self.u1, approved=False)
+        post = PostFactory.create(topic=topic, poster=self.u1, approved=False)
+        topic_pk = topic.pk
+        # Run
+        Post.objects.get(pk=post.pk).delete()
+        # Check
+        with pytest.raises(Topic.DoesNotExist):
+            Topic.objects.get(pk=topic_pk)
+
+    def test_deletion_of_the_topic_head_keeps_the_topic_if_it_contains_other_posts(self):
+        # Setup
+        PostFactory.create(topic=self.topic, poster=self.u1, approved=False)
+        # Run
+        Post.objects.get(pk=self.post.pk).delete()
+        # Check
+        assert Topic.objects.filter(pk=self.topic_pk).exists()
+
     def test_save_triggers_the_update_of_the_member_posts_count_if_the_related_post_is_approved(self):
         # Setup
         post = PostFactory.build(topic=self.topic, poster=self.u1)
@@ -238,3 +332,44 @@ class TestPost(object):
         # Check
         profile = refresh(profile)
         assert profile.posts_count == initial_posts_count + 1
+
+    def test_save_increments_the_counters_of_the_topic_and_of_all_the_ancestor_forums(self):
+        # Setup
+        top_level_cat = create_category_forum()
+        forum = create_forum(parent=top_level_cat)
+        sub_forum = create_forum(parent=forum)
+        topic = create_topic(forum=sub_forum, poster=self.u1)
+        PostFactory.create(topic=topic, poster=self.u1)
+        # Run
+        post = PostFactory.create(topic=topic, poster=self.u1)
+        PostFactory.create(topic=topic, poster=self.u1, approved=False)
+        # Check
+        topic = refresh(topic)
+        assert topic.posts_count == 2
+        assert topic.last_post_on == post.created
+        for f in (sub_forum, forum, top_level_cat):
+            f = refresh(f)
+            assert f.posts_count == 2
+            assert f.topics_count == 1
+            assert f.last_post_on == post.created
+            # The incremented counters correspond to the ones that would be recomputed
+            f.update_trackers()
+            f = refresh(f)
+            assert f.posts_count == 2
+            assert f.topics_count == 1
+
+    def test_save_performs_a_constant_number_of_queries_whatever_the_depth_of_the_forum(self):
+        # Setup
+        forum = create_forum()
+        sub_forum = create_forum(parent=create_forum(parent=create_forum(parent=forum)))
+        topic_1 = create_topic(forum=forum, poster=self.u1)
+        topic_2 = create_topic(forum=sub_forum, poster=self.u1)
+        PostFactory.create(topic=topic_1, poster=self.u1)
+        PostFactory.create(topic=topic_2, poster=self.u1)
+        # Run
+        with CaptureQueriesContext(connection) as queries_1:
+            PostFactory.create(topic=topic_1, poster=self.u1)
+        with CaptureQueriesContext(connection) as queries_2:
+            PostFactory.create(topic=topic_2, poster=self.u1)
+        # Check
+        assert len(queries_1) == len(queries_2)
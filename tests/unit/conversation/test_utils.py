@@ -10,6 +10,14 @@ import pytest
 
 # Local application / specific library imports
 from machina.apps.forum_conversation.utils import get_client_ip
+from machina.apps.forum_conversation.utils import update_posts_sequences
+from machina.core.db.models import get_model
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Post = get_model('forum_conversation', 'Post')
 
 faker = FakerFactory.create()
 
@@ -42,3 +50,29 @@ class TestIpAddressExtractor(object):
         ip_address = get_client_ip(request)
         # Check
         assert ip_address == parameters['REMOTE_ADDR']
+
+
+@pytest.mark.django_db
+class TestPostsSequencesUpdater(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.topic = create_topic(forum=create_forum(), poster=self.u1)
+        self.posts = [
+            PostFactory.create(topic=self.topic, poster=self.u1) for _ in range(3)]
+
+    def test_can_compute_again_the_sequence_numbers_of_the_posts_of_topics(self):
+        # Setup
+        Post.objects.filter(topic=self.topic).update(sequence=None)
+        # Run
+        updated = update_posts_sequences(Post.objects.filter(topic=self.topic))
+        # Check
+        assert updated == 3
+        assert list(Post.objects.filter(topic=self.topic).order_by('created', 'pk')
+                    .values_list('sequence', flat=True)) == [1, 2, 3]
+
+    def test_does_not_update_the_posts_whose_sequence_numbers_are_correct(self):
+        # Run
+        updated = update_posts_sequences(Post.objects.filter(topic=self.topic))
+        # Check
+        assert updated == 0
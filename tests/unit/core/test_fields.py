@@ -14,6 +14,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.utils.six import BytesIO
+import mock
 import pytest
 
 # Local application / specific library imports
@@ -77,6 +78,39 @@ class TestMarkupTextField(object):
         with pytest.raises(AttributeError):
             print(TestableModel.content.rendered)
 
+    def test_does_not_render_its_data_again_if_it_did_not_change(self):
+        # Setup
+        test = TestableModel.objects.create(content='**hello**')
+        # Run
+        with mock.patch.object(fields, 'render_func', wraps=fields.render_func) as render:
+            test.save()
+            TestableModel.objects.get(pk=test.pk).save()
+        # Check
+        assert not render.called
+        assert test.content.rendered == '<p><strong>hello</strong></p>'
+
+    def test_renders_its_data_again_if_it_changed(self):
+        # Setup
+        test = TestableModel.objects.create(content='**hello**')
+        test = TestableModel.objects.get(pk=test.pk)
+        # Run
+        test.content = '**hello world!**'
+        test.save()
+        # Check
+        test = TestableModel.objects.get(pk=test.pk)
+        assert test.content.rendered == '<p><strong>hello world!</strong></p>'
+
+    def test_does_not_render_its_data_if_it_is_not_part_of_the_updated_fields(self):
+        # Setup
+        test = TestableModel.objects.create(content='**hello**')
+        test.content = '**hello world!**'
+        # Run
+        with mock.patch.object(fields, 'render_func', wraps=fields.render_func) as render:
+            test.save(update_fields=['resized_image', ])
+        # Check
+        assert not render.called
+        assert test.content.rendered == '<p><strong>hello</strong></p>'
+
     def test_should_not_allow_non_accessible_markup_languages(self):
         # Run & check
         machina_settings.MACHINA_MARKUP_LANGUAGE = (('it.will.fail'), {})
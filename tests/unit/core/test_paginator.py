@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+from machina.core.paginator import CountedPaginator
+from machina.core.paginator import CursorPaginator
+from machina.core.paginator import SequencePaginator
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+@pytest.mark.django_db
+class TestPaginators(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.forum = create_forum()
+        self.topic = create_topic(forum=self.forum, poster=self.u1)
+        self.posts = [PostFactory.create(topic=self.topic, poster=self.u1) for _ in range(7)]
+        self.topics = [self.topic, ] + [
+            create_topic(forum=self.forum, poster=self.u1) for _ in range(4)]
+        for topic in self.topics[1:]:
+            PostFactory.create(topic=topic, poster=self.u1)
+        self.ordered_topics = list(Topic.objects.order_by('-type', '-last_post_on', '-id'))
+
+    def test_can_use_a_given_number_of_objects_instead_of_counting_them(self):
+        # Setup
+        paginator = CountedPaginator(self.topic.posts.all(), 3, count=self.topic.posts_count)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            num_pages = paginator.num_pages
+            posts = list(paginator.page(3).object_list)
+        # Check
+        assert num_pages == 3
+        assert posts == self.posts[6:]
+        assert len(captured_queries) == 1
+
+    def test_does_not_truncate_the_last_page_according_to_an_outdated_count(self):
+        # Setup
+        paginator = CountedPaginator(self.topic.posts.all(), 3, count=5)
+        # Run & check
+        assert list(paginator.page(2).object_list) == self.posts[3:6]
+
+    def test_can_fetch_the_pages_using_a_sequence_field(self):
+        # Setup
+        paginator = SequencePaginator(self.topic.posts.all(), 3, count=self.topic.posts_count)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            pages = [list(paginator.page(number).object_list) for number in (1, 2, 3)]
+        # Check
+        assert pages == [self.posts[:3], self.posts[3:6], self.posts[6:]]
+        assert not [q for q in captured_queries if 'OFFSET' in q['sql'] or 'COUNT' in q['sql']]
+
+    def test_can_fetch_the_next_and_the_previous_pages_using_cursors(self):
+        # Setup
+        keys = ['-type', '-last_post_on', '-id']
+        first_page = CursorPaginator(Topic.objects.all(), 2, keys, count=5).page(1)
+        # Run
+        second_page = CursorPaginator(
+            Topic.objects.all(), 2, keys, count=5, after=first_page.next_cursor).page(2)
+        third_page = CursorPaginator(
+            Topic.objects.all(), 2, keys, count=5, after=second_page.next_cursor).page(3)
+        with CaptureQueriesContext(connection) as captured_queries:
+            previous_page = CursorPaginator(
+                Topic.objects.all(), 2, keys, count=5, before=third_page.previous_cursor).page(2)
+        # Check
+        assert list(first_page.object_list) == self.ordered_topics[:2]
+        assert list(second_page.object_list) == self.ordered_topics[2:4]
+        assert list(third_page.object_list) == self.ordered_topics[4:]
+        assert list(previous_page.object_list) == self.ordered_topics[2:4]
+        assert 'OFFSET' not in captured_queries[0]['sql']
+
+    def test_uses_an_offset_if_the_cursor_is_not_valid(self):
+        # Setup
+        keys = ['-type', '-last_post_on', '-id']
+        paginator = CursorPaginator(Topic.objects.all(), 2, keys, count=5, after='1,bad')
+        # Run & check
+        assert list(paginator.page(2).object_list) == self.ordered_topics[2:4]
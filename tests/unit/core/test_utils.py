@@ -9,7 +9,9 @@ import pytest
 
 # Local application / specific library imports
 from machina.apps.forum.models import Forum
+from machina.core.utils import BackgroundWorker
 from machina.core.utils import get_object_or_none
+from machina.core.utils import iter_slices
 from machina.core.utils import refresh
 from machina.test.factories import create_forum
 
@@ -42,3 +44,20 @@ class TestCoreUtils(object):
         # Check
         assert self.forum.pk == forum.pk
         assert unknown_forum is None
+
+    def test_can_iterate_over_slices_of_values(self):
+        # Run
+        slices = list(iter_slices(iter(range(5)), 2))
+        # Check
+        assert slices == [[0, 1], [2, 3], [4, ]]
+
+    def test_can_call_functions_in_a_background_thread(self):
+        # Setup
+        worker = BackgroundWorker('machina-test')
+        values = []
+        # Run
+        worker.enqueue(values.append, 1)
+        worker.enqueue(values.append, 2)
+        worker.join()
+        # Check
+        assert values == [1, 2]
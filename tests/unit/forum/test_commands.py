@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.management import call_command
+from django.utils.six import StringIO
+import pytest
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Forum = get_model('forum', 'Forum')
+ForumProfile = get_model('forum_member', 'ForumProfile')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+@pytest.mark.django_db
+class TestRebuildForumTrackersCommand(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.u2 = UserFactory.create()
+
+        self.top_level_cat = create_category_forum()
+        self.forum_1 = create_forum(parent=self.top_level_cat)
+        self.forum_2 = create_forum(parent=self.forum_1)
+        self.forum_3 = create_forum(parent=self.top_level_cat)
+
+        self.topic_1 = create_topic(forum=self.forum_1, poster=self.u1)
+        PostFactory.create(topic=self.topic_1, poster=self.u1)
+        PostFactory.create(topic=self.topic_1, poster=self.u2)
+        self.topic_2 = create_topic(forum=self.forum_2, poster=self.u2)
+        PostFactory.create(topic=self.topic_2, poster=self.u2)
+        PostFactory.create(topic=self.topic_2, poster=self.u1, approved=False)
+        self.last_post = PostFactory.create(topic=self.topic_2, poster=self.u2)
+        self.topic_3 = create_topic(forum=self.forum_2, poster=self.u1, approved=False)
+        PostFactory.create(topic=self.topic_3, poster=self.u1, approved=False)
+
+    def get_trackers(self):
+        return {
+            'topics': dict(
+                (t.pk, (t.posts_count, t.last_post_on, t.first_post_id, t.last_post_id))
+                for t in Topic.objects.all()),
+            'forums': dict(
+                (f.pk, (f.posts_count, f.topics_count, f.last_post_on, f.last_post_id))
+                for f in Forum.objects.all()),
+            'profiles': dict(
+                (p.user_id, p.posts_count) for p in ForumProfile.objects.all()),
+        }
+
+    def test_can_rebuild_the_trackers_of_all_the_topics_forums_and_profiles(self):
+        # Setup
+        initial_trackers = self.get_trackers()
+        Topic.objects.update(posts_count=42, last_post_on=None, first_post=None, last_post=None)
+        Forum.objects.exclude(pk=self.forum_3.pk).update(
+            posts_count=42, topics_count=42, last_post=None)
+        Forum.objects.filter(pk=self.forum_3.pk).update(posts_count=42)
+        ForumProfile.objects.update(posts_count=42)
+        # Run
+        call_command('rebuild_forum_trackers', chunk_size=2, stdout=StringIO())
+        # Check
+        trackers = self.get_trackers()
+        assert trackers == initial_trackers
+        assert trackers['topics'][self.topic_2.pk][:2] == \
+            (2, Post.objects.get(pk=self.last_post.pk).created)
+        assert trackers['topics'][self.topic_2.pk][3] == self.last_post.pk
+        assert trackers['forums'][self.top_level_cat.pk][3] == self.last_post.pk
+        assert trackers['forums'][self.top_level_cat.pk][:2] == (4, 2)
+        assert trackers['forums'][self.forum_2.pk][:2] == (2, 1)
+        assert trackers['profiles'] == {self.u1.pk: 1, self.u2.pk: 3}
+
+    def test_reports_its_progress(self):
+        # Setup
+        out = StringIO()
+        # Run
+        call_command('rebuild_forum_trackers', chunk_size=2, stdout=out)
+        # Check
+        output = out.getvalue()
+        assert 'Topics: 2/3' in output
+        assert 'Topics: 3/3' in output
+        assert 'Forum profiles: 2/2' in output
+        assert '0 forums were updated' in output
+
+
+@pytest.mark.django_db
+class TestRebuildPostsSequencesCommand(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.forum = create_forum()
+        self.topic_1 = create_topic(forum=self.forum, poster=self.u1)
+        self.topic_2 = create_topic(forum=self.forum, poster=self.u1)
+        self.posts = [
+            PostFactory.create(topic=self.topic_1, poster=self.u1),
+            PostFactory.create(topic=self.topic_2, poster=self.u1),
+            PostFactory.create(topic=self.topic_1, poster=self.u1, approved=False),
+            PostFactory.create(topic=self.topic_1, poster=self.u1),
+            PostFactory.create(topic=self.topic_2, poster=self.u1),
+        ]
+
+    def get_sequences(self):
+        return [Post.objects.get(pk=post.pk).sequence for post in self.posts]
+
+    def test_can_rebuild_the_sequence_numbers_of_the_posts_of_all_the_topics(self):
+        # Setup
+        initial_sequences = self.get_sequences()
+        Post.objects.update(sequence=None)
+        Post.objects.filter(pk=self.posts[2].pk).update(sequence=4)
+        out = StringIO()
+        # Run
+        call_command('rebuild_posts_sequences', chunk_size=1, stdout=out)
+        # Check
+        assert self.get_sequences() == initial_sequences == [1, 1, None, 2, 2]
+        assert 'Topics: 2/2' in out.getvalue()
+        assert '5 posts were updated' in out.getvalue()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import mock
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum.counters import forum_redirects_counter
+from machina.apps.forum.counters import topic_views_counter
+from machina.conf import settings as machina_settings
+from machina.core.db.models import get_model
+from machina.test.factories import create_forum
+from machina.test.factories import create_link_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Forum = get_model('forum', 'Forum')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+@pytest.mark.django_db
+class TestBufferedCounter(object):
+    @pytest.yield_fixture(autouse=True)
+    def setup(self):
+        machina_settings.VIEW_COUNTERS_BUFFERED = True
+        machina_settings.VIEW_COUNTERS_FLUSH_INTERVAL = 3600
+        machina_settings.VIEW_COUNTERS_FLUSH_SIZE = 1000
+        topic_views_counter.clear()
+        forum_redirects_counter.clear()
+
+        self.u1 = UserFactory.create()
+        self.forum = create_forum()
+        self.link = create_link_forum(link_redirects=True)
+        self.topics = [create_topic(forum=self.forum, poster=self.u1) for _ in range(3)]
+        for topic in self.topics:
+            PostFactory.create(topic=topic, poster=self.u1)
+
+        yield
+
+        # The pending increments are dropped so that they do not leak into the next tests
+        topic_views_counter.clear()
+        forum_redirects_counter.clear()
+        machina_settings.VIEW_COUNTERS_BUFFERED = False
+        machina_settings.VIEW_COUNTERS_FLUSH_INTERVAL = 60
+        machina_settings.VIEW_COUNTERS_FLUSH_SIZE = 1000
+
+    def get_views_counts(self):
+        return [Topic.objects.get(pk=topic.pk).views_count for topic in self.topics]
+
+    def test_accumulates_the_increments_in_memory(self):
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            topic_views_counter.incr(self.topics[0].pk)
+            topic_views_counter.incr(self.topics[0].pk)
+        # Check
+        assert len(captured_queries) == 0
+        assert topic_views_counter.get_pending(self.topics[0].pk) == 2
+        assert self.get_views_counts() == [0, 0, 0]
+
+    def test_flushes_the_increments_using_one_query_per_distinct_increment(self):
+        # Setup
+        for topic, views in zip(self.topics, (2, 1, 2)):
+            for _ in range(views):
+                topic_views_counter.incr(topic.pk)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            topic_views_counter.flush()
+        # Check
+        assert len(captured_queries) == 2
+        assert self.get_views_counts() == [2, 1, 2]
+        assert topic_views_counter.get_pending(self.topics[0].pk) == 0
+
+    def test_flushes_the_increments_when_the_size_threshold_is_reached(self):
+        # Setup
+        machina_settings.VIEW_COUNTERS_FLUSH_SIZE = 3
+        # Run
+        for _ in range(3):
+            topic_views_counter.incr(self.topics[0].pk)
+        # Check
+        assert self.get_views_counts() == [3, 0, 0]
+
+    def test_flushes_the_increments_when_the_time_threshold_is_reached(self):
+        # Setup
+        topic_views_counter.incr(self.topics[0].pk)
+        machina_settings.VIEW_COUNTERS_FLUSH_INTERVAL = 0
+        # Run
+        topic_views_counter.incr(self.topics[1].pk)
+        # Check
+        assert self.get_views_counts() == [1, 1, 0]
+
+    def test_keeps_the_increments_if_they_cannot_be_flushed(self):
+        # Setup
+        topic_views_counter.incr(self.topics[0].pk)
+        metrics = topic_views_counter.metrics
+        update = mock.patch.object(topic_views_counter, '_update', side_effect=Exception)
+        # Run
+        with update:
+            topic_views_counter.flush()
+        # Check
+        assert topic_views_counter.get_pending(self.topics[0].pk) == 1
+        assert topic_views_counter.metrics['failed_flushes'] == metrics['failed_flushes'] + 1
+
+    def test_can_drop_the_pending_increments(self):
+        # Setup
+        topic_views_counter.incr(self.topics[0].pk)
+        # Run
+        topic_views_counter.clear()
+        topic_views_counter.flush()
+        # Check
+        assert topic_views_counter.get_pending(self.topics[0].pk) == 0
+        assert self.get_views_counts() == [0, 0, 0]
+
+    def test_provides_metrics(self):
+        # Setup
+        metrics = topic_views_counter.metrics
+        # Run
+        topic_views_counter.incr(self.topics[0].pk)
+        topic_views_counter.incr(self.topics[1].pk)
+        pending_metrics = topic_views_counter.metrics
+        topic_views_counter.flush()
+        flushed_metrics = topic_views_counter.metrics
+        # Check
+        assert pending_metrics['pending_rows'] == 2
+        assert pending_metrics['pending_increments'] == 2
+        assert flushed_metrics['increments'] == metrics['increments'] + 2
+        assert flushed_metrics['flushes'] == metrics['flushes'] + 1
+        assert flushed_metrics['flushed_rows'] == metrics['flushed_rows'] + 2
+        assert flushed_metrics['pending_increments'] == 0
+
+    def test_updates_the_counters_immediately_if_they_are_not_buffered(self):
+        # Setup
+        machina_settings.VIEW_COUNTERS_BUFFERED = False
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            forum_redirects_counter.incr(self.link.pk)
+        # Check
+        assert len(captured_queries) == 1
+        assert Forum.objects.get(pk=self.link.pk).link_redirects_count == 1
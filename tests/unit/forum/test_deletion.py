@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db import transaction
+from django.test.utils import CaptureQueriesContext
+import mock
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum.deletion import deletion_engine
+from machina.apps.forum.trackers import trackers_updater
+from machina.conf import settings as machina_settings
+from machina.core.compat import force_bytes
+from machina.core.db.models import get_model
+from machina.core.utils import refresh
+from machina.test.factories import AttachmentFactory
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import TopicPollFactory
+from machina.test.factories import TopicPollOptionFactory
+from machina.test.factories import TopicReadTrackFactory
+from machina.test.factories import UserFactory
+
+Attachment = get_model('forum_attachments', 'Attachment')
+Forum = get_model('forum', 'Forum')
+ForumProfile = get_model('forum_member', 'ForumProfile')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+TopicPoll = get_model('forum_polls', 'TopicPoll')
+TopicReadTrack = get_model('forum_tracking', 'TopicReadTrack')
+
+
+@pytest.mark.django_db
+class TestDeletionEngine(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        machina_settings.DELETION_BATCH_SIZE = 2
+
+        self.u1 = UserFactory.create()
+        self.u2 = UserFactory.create()
+
+        # Set up a top-level category and some forums
+        self.top_level_cat = create_category_forum()
+        self.forum_1 = create_forum(parent=self.top_level_cat)
+        self.forum_2 = create_forum(parent=self.forum_1)
+        self.forum_3 = create_forum(parent=self.top_level_cat)
+
+        # Set up a large topic and some other topics
+        self.topic = create_topic(forum=self.forum_2, poster=self.u1)
+        for _ in range(3):
+            PostFactory.create(topic=self.topic, poster=self.u1)
+        for _ in range(2):
+            PostFactory.create(topic=self.topic, poster=self.u2)
+        PostFactory.create(topic=self.topic, poster=self.u2, approved=False)
+        self.other_topic = create_topic(forum=self.forum_1, poster=self.u2)
+        PostFactory.create(topic=self.other_topic, poster=self.u2)
+        self.topic_3 = create_topic(forum=self.forum_3, poster=self.u1)
+        PostFactory.create(topic=self.topic_3, poster=self.u1)
+
+    def teardown_method(self, method):
+        machina_settings.DELETION_BATCH_SIZE = 500
+
+    def test_can_delete_a_large_topic_by_batches(self):
+        # Setup
+        poll = TopicPollFactory.create(topic=self.topic)
+        TopicPollOptionFactory.create(poll=poll)
+        TopicReadTrackFactory.create(topic=self.topic, user=self.u1)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            deleted_count = deletion_engine.delete_topics([self.topic.pk, ])
+        # Check
+        assert deleted_count == 1
+        assert not Topic.objects.filter(pk=self.topic.pk).exists()
+        assert not Post.objects.filter(topic_id=self.topic.pk).exists()
+        assert not TopicPoll.objects.exists()
+        assert not TopicReadTrack.objects.exists()
+        # The posts are deleted by batches of two posts
+        assert len([
+            q for q in captured_queries
+            if 'DELETE FROM "{}"'.format(Post._meta.db_table) in q['sql']]) == 3
+
+    def test_updates_the_posts_counts_of_the_posters_using_grouped_queries(self):
+        # Setup
+        machina_settings.DELETION_BATCH_SIZE = 10
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            deletion_engine.delete_topics([self.topic.pk, self.other_topic.pk])
+        # Check
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 1
+        assert ForumProfile.objects.get(user=self.u2).posts_count == 0
+        profiles_updates = [
+            q for q in captured_queries
+            if 'UPDATE "{}"'.format(ForumProfile._meta.db_table) in q['sql']]
+        # u1 and u2 both lost 3 approved posts: the same decrement is applied to both profiles
+        # using two queries
+        assert len(profiles_updates) == 2
+
+    def test_updates_the_trackers_of_the_forums_once(self):
+        # Run
+        with mock.patch.object(
+                trackers_updater, 'update', wraps=trackers_updater.update) as update:
+            deletion_engine.delete_topics([self.topic.pk, self.other_topic.pk])
+        # Check
+        assert update.call_count == 1
+        for forum in (self.forum_2, self.forum_1, self.top_level_cat):
+            forum = refresh(forum)
+            assert forum.topics_count == (1 if forum == self.top_level_cat else 0)
+            assert forum.posts_count == (1 if forum == self.top_level_cat else 0)
+
+    def test_removes_the_files_of_the_deleted_attachments(self):
+        # Setup
+        f = SimpleUploadedFile('file1.txt', force_bytes('file_content_1'))
+        attachment = AttachmentFactory.create(post=self.topic.last_post, file=f)
+        storage, name = attachment.file.storage, attachment.file.name
+        assert storage.exists(name)
+        # Run
+        deletion_engine.delete_topics([self.topic.pk, ])
+        deletion_engine.join()
+        # Check
+        assert not Attachment.objects.exists()
+        assert not storage.exists(name)
+
+    def test_can_delete_posts_by_batches(self):
+        # Setup
+        post_ids = list(self.topic.posts.filter(poster=self.u2).values_list('pk', flat=True))
+        # Run
+        deleted_count = deletion_engine.delete_posts(post_ids)
+        # Check
+        assert deleted_count == 3
+        assert not self.topic.posts.filter(poster=self.u2).exists()
+        assert ForumProfile.objects.get(user=self.u2).posts_count == 1
+
+    def test_can_delete_the_topics_of_a_forum_and_of_its_descendants(self):
+        # Run
+        deleted_count = deletion_engine.delete_forum_topics(self.forum_1)
+        # Check
+        assert deleted_count == 2
+        assert list(Topic.objects.all()) == [self.topic_3, ]
+        top_level_cat = refresh(self.top_level_cat)
+        assert (top_level_cat.topics_count, top_level_cat.posts_count) == (1, 1)
+
+    def test_is_used_to_delete_forums(self):
+        # Run
+        refresh(self.forum_1).delete()
+        # Check
+        assert set(Forum.objects.all()) == set([self.top_level_cat, self.forum_3])
+        assert list(Topic.objects.all()) == [self.topic_3, ]
+        assert ForumProfile.objects.get(user=self.u2).posts_count == 0
+        top_level_cat = refresh(self.top_level_cat)
+        assert (top_level_cat.topics_count, top_level_cat.posts_count) == (1, 1)
+
+    def test_updates_the_ancestors_of_a_deleted_forum_once_the_transaction_is_committed(self):
+        # Setup
+        callbacks = []
+        on_commit = mock.patch.object(
+            transaction, 'on_commit', create=True, side_effect=callbacks.append)
+        # Run
+        with on_commit:
+            refresh(self.forum_1).delete()
+        for callback in callbacks:
+            callback()
+        # Check
+        assert callbacks
+        top_level_cat = refresh(self.top_level_cat)
+        assert (top_level_cat.topics_count, top_level_cat.posts_count) == (1, 1)
@@ -5,6 +5,8 @@ from __future__ import unicode_literals
 
 # Third party imports
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 # Local application / specific library imports
@@ -106,3 +108,37 @@ class TestForum(object):
         self.top_level_forum = Forum.active.get(pk=self.top_level_forum.pk)  # Reload the forum from DB
         assert self.top_level_forum.posts_count == 0
         assert self.top_level_forum.topics_count == 0
+
+    def test_does_not_query_its_previous_parent_when_it_is_saved_without_being_moved(self):
+        # Setup
+        forum = Forum.objects.get(pk=self.top_level_forum.pk)
+        forum.name = 'Renamed forum'
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            forum.save()
+        # Check
+        assert not [q for q in captured_queries if q['sql'].startswith('SELECT')]
+        assert not forum.has_changed('parent')
+
+    def test_computes_its_trackers_with_a_constant_number_of_queries(self):
+        # Setup
+        sub_level_forum = create_forum(parent=self.top_level_forum)
+        topic = create_topic(forum=self.top_level_forum, poster=self.u1)
+        PostFactory.create(topic=topic, poster=self.u1)
+        topic2 = create_topic(forum=sub_level_forum, poster=self.u1)
+        PostFactory.create(topic=topic2, poster=self.u1)
+        post = PostFactory.create(topic=topic2, poster=self.u1)
+        topic3 = create_topic(forum=sub_level_forum, poster=self.u1, approved=False)
+        PostFactory.create(topic=topic3, poster=self.u1, approved=False)
+        forum = Forum.objects.get(pk=self.top_level_forum.pk)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            forum._update_trackers()
+        # Check
+        # The aggregation, the selection of the last post and the update of the forum
+        assert len(captured_queries) == 3
+        forum = Forum.objects.get(pk=self.top_level_forum.pk)
+        assert forum.posts_count == 3
+        assert forum.topics_count == 2
+        assert forum.last_post_on == Post.objects.get(pk=post.pk).created
+        assert forum.last_post == post
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+import threading
+
+# Third party imports
+import mock
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum.trackers import defer_trackers_updates
+from machina.apps.forum.trackers import trackers_updater
+from machina.conf import settings as machina_settings
+from machina.core.db.models import get_model
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Forum = get_model('forum', 'Forum')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+
+@pytest.mark.django_db
+class TestTrackersUpdater(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+
+        self.top_level_cat = create_category_forum()
+        self.forum = create_forum(parent=self.top_level_cat)
+        self.sub_forum = create_forum(parent=self.forum)
+
+        self.topic = create_topic(forum=self.sub_forum, poster=self.u1)
+        PostFactory.create(topic=self.topic, poster=self.u1)
+        self.posts = [
+            PostFactory.create(topic=self.topic, poster=self.u1, approved=False)
+            for _ in range(5)]
+
+    def teardown_method(self, method):
+        machina_settings.TRACKERS_UPDATES_IN_BACKGROUND = False
+
+    def test_updates_the_trackers_of_each_dirty_object_only_once(self):
+        # Setup
+        topic_update = mock.patch.object(Topic, '_update_trackers', autospec=True)
+        forum_update = mock.patch.object(Forum, '_update_trackers', autospec=True)
+        # Run
+        with topic_update as topic_mock, forum_update as forum_mock:
+            with defer_trackers_updates():
+                for post in self.posts:
+                    post.approved = True
+                    post.save()
+        # Check
+        assert topic_mock.call_count == 1
+        assert forum_mock.call_count == 3
+        assert set(call[0][0].pk for call in forum_mock.call_args_list) == set([
+            self.top_level_cat.pk, self.forum.pk, self.sub_forum.pk])
+
+    def test_updates_the_trackers_when_the_outermost_block_is_left(self):
+        # Run & check
+        with defer_trackers_updates():
+            with defer_trackers_updates():
+                for post in self.posts:
+                    post.approved = True
+                    post.save()
+            assert Topic.objects.get(pk=self.topic.pk).posts_count == 1
+        assert Topic.objects.get(pk=self.topic.pk).posts_count == 6
+        for forum in (self.top_level_cat, self.forum, self.sub_forum):
+            forum = Forum.objects.get(pk=forum.pk)
+            assert forum.posts_count == 6
+            assert forum.topics_count == 1
+
+    def test_updates_the_trackers_of_the_previous_forum_of_a_moved_topic(self):
+        # Setup
+        new_forum = create_forum(parent=self.top_level_cat)
+        # Run
+        with defer_trackers_updates():
+            self.topic.forum = new_forum
+            self.topic.save()
+        # Check
+        new_forum = Forum.objects.get(pk=new_forum.pk)
+        self.sub_forum = Forum.objects.get(pk=self.sub_forum.pk)
+        self.top_level_cat = Forum.objects.get(pk=self.top_level_cat.pk)
+        assert new_forum.posts_count == 1
+        assert new_forum.topics_count == 1
+        assert self.sub_forum.posts_count == 0
+        assert self.sub_forum.topics_count == 0
+        assert self.top_level_cat.posts_count == 1
+
+    def test_can_update_the_trackers_in_a_background_thread(self):
+        # Setup
+        machina_settings.TRACKERS_UPDATES_IN_BACKGROUND = True
+        threads = []
+        update = mock.patch.object(
+            trackers_updater, 'update',
+            side_effect=lambda *args: threads.append(threading.current_thread().name))
+        in_transaction = mock.patch.object(trackers_updater, '_in_transaction', return_value=False)
+        # Run
+        with update as update_mock, in_transaction:
+            with defer_trackers_updates():
+                for post in self.posts:
+                    post.approved = True
+                    post.save()
+            trackers_updater.join()
+        # Check
+        assert update_mock.call_count == 1
+        assert update_mock.call_args[0] == (set([self.topic.pk, ]), set([self.sub_forum.pk, ]))
+        assert threads == ['machina-trackers', ]
+
+    def test_updates_the_trackers_synchronously_inside_a_transaction(self):
+        # Setup
+        machina_settings.TRACKERS_UPDATES_IN_BACKGROUND = True
+        # Run
+        with defer_trackers_updates():
+            for post in self.posts:
+                post.approved = True
+                post.save()
+        # Check
+        assert Topic.objects.get(pk=self.topic.pk).posts_count == 6
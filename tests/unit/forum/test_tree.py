@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+import pickle
+
+# Third party imports
+from django.core.cache import cache as default_cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum.tree import forum_tree_cache
+from machina.apps.forum.tree import ForumTree
+from machina.conf import settings as machina_settings
+from machina.core.db.models import get_model
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import create_link_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Forum = get_model('forum', 'Forum')
+
+
+@pytest.mark.django_db
+class TestForumTree(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        machina_settings.FORUM_TREE_CACHE_NAME = 'default'
+        default_cache.clear()
+
+        # Set up the following forum tree:
+        #
+        #     top_level_cat
+        #         forum_1
+        #         forum_2
+        #             forum_2_child_1
+        #             forum_2_child_2
+        #                 forum_2_child_2_1
+        #     top_level_forum_1
+        #         sub_cat
+        #             sub_sub_forum
+        #     top_level_forum_2
+        #         forum_3
+        #             forum_3_child_1
+        #                 forum_3_child_1_1
+        #
+        self.top_level_cat = create_category_forum()
+        self.forum_1 = create_forum(parent=self.top_level_cat)
+        self.forum_2 = create_forum(parent=self.top_level_cat)
+        self.forum_2_child_1 = create_link_forum(parent=self.forum_2)
+        self.forum_2_child_2 = create_forum(parent=self.forum_2, display_sub_forum_list=False)
+        self.forum_2_child_2_1 = create_forum(parent=self.forum_2_child_2)
+
+        self.top_level_forum_1 = create_forum()
+        self.sub_cat = create_category_forum(parent=self.top_level_forum_1)
+        self.sub_sub_forum = create_forum(parent=self.sub_cat)
+
+        self.top_level_forum_2 = create_forum()
+        self.forum_3 = create_forum(parent=self.top_level_forum_2)
+        self.forum_3_child_1 = create_forum(parent=self.forum_3)
+        self.forum_3_child_1_1 = create_forum(parent=self.forum_3_child_1)
+
+    def teardown_method(self, method):
+        machina_settings.FORUM_TREE_CACHE_NAME = None
+
+    def test_can_return_the_ancestors_of_a_forum(self):
+        # Setup
+        tree = ForumTree.load()
+        # Run & check
+        for forum in Forum.objects.all():
+            assert tree.get_ancestors(forum) == [f.pk for f in forum.get_ancestors()]
+            assert tree.get_ancestors(forum.pk, include_self=True) == \
+                [f.pk for f in forum.get_ancestors(include_self=True)]
+
+    def test_can_return_the_descendants_of_a_forum(self):
+        # Setup
+        tree = ForumTree.load()
+        # Run & check
+        for forum in Forum.objects.all():
+            assert tree.get_descendants(forum) == [f.pk for f in forum.get_descendants()]
+            assert tree.get_descendants(forum, include_self=True) == \
+                [f.pk for f in forum.get_descendants(include_self=True)]
+
+    def test_can_return_the_children_of_a_forum(self):
+        # Setup
+        tree = ForumTree.load()
+        # Run & check
+        assert tree.get_children() == [
+            self.top_level_cat.pk, self.top_level_forum_1.pk, self.top_level_forum_2.pk]
+        for forum in Forum.objects.all():
+            assert tree.get_children(forum) == [f.pk for f in forum.get_children()]
+
+    def test_computes_the_same_displayable_forums_as_the_database(self):
+        # Setup
+        tree = ForumTree.load()
+        machina_settings.FORUM_TREE_CACHE_NAME = None
+        # Run & check
+        for forum in [None, ] + list(Forum.objects.all()):
+            displayable_forums = Forum.objects.displayable_subforums(start_from=forum)
+            assert tree.get_displayable_subforums(forum) == [f.pk for f in displayable_forums]
+
+    def test_can_be_pickled(self):
+        # Setup
+        tree = ForumTree.load()
+        # Run
+        unpickled_tree = pickle.loads(pickle.dumps(tree))
+        # Check
+        assert unpickled_tree.nodes == tree.nodes
+        assert unpickled_tree.get_descendants(self.top_level_cat) == \
+            tree.get_descendants(self.top_level_cat)
+
+    def test_is_used_to_compute_the_displayable_forums_without_joins(self):
+        # Setup
+        forum_tree_cache.get_tree()
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            displayable_forums = list(
+                Forum.objects.displayable_subforums(start_from=self.top_level_cat))
+        # Check
+        assert displayable_forums == [
+            self.forum_1, self.forum_2, self.forum_2_child_1]
+        assert len(captured_queries) == 1
+        assert 'JOIN' not in captured_queries[0]['sql']
+
+    def test_is_loaded_only_once_per_version(self):
+        # Setup
+        tree = forum_tree_cache.get_tree()
+        # Run & check
+        with CaptureQueriesContext(connection) as captured_queries:
+            assert forum_tree_cache.get_tree() is tree
+        assert len(captured_queries) == 0
+
+    def test_is_invalidated_when_a_forum_is_created_moved_renamed_or_deleted(self):
+        # Setup
+        tree = forum_tree_cache.get_tree()
+        # Run & check
+        new_forum = create_forum(parent=self.forum_1)
+        new_tree = forum_tree_cache.get_tree()
+        assert new_tree is not tree
+        assert new_tree.get_children(self.forum_1) == [new_forum.pk, ]
+
+        new_forum.parent = self.forum_3
+        new_forum.save()
+        new_tree = forum_tree_cache.get_tree()
+        assert new_tree.get_children(self.forum_3) == [self.forum_3_child_1.pk, new_forum.pk]
+
+        new_forum.name = 'Renamed forum'
+        new_forum.save()
+        new_tree = forum_tree_cache.get_tree()
+        assert new_tree.get_node(new_forum).name == 'Renamed forum'
+
+        new_forum.delete()
+        new_tree = forum_tree_cache.get_tree()
+        assert new_forum.pk not in new_tree
+
+    def test_is_not_invalidated_when_the_trackers_of_a_forum_are_updated(self):
+        # Setup
+        user = UserFactory.create()
+        topic = create_topic(forum=self.forum_1, poster=user)
+        post = PostFactory.create(topic=topic, poster=user)
+        tree = forum_tree_cache.get_tree()
+        # Run
+        post.content = 'Updated content'
+        post.save()
+        # Check
+        assert forum_tree_cache.get_tree() is tree
+
+    def test_is_shared_using_the_cache(self):
+        # Setup
+        tree = forum_tree_cache.get_tree()
+        forum_tree_cache._version, forum_tree_cache._tree = None, None
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            shared_tree = forum_tree_cache.get_tree()
+        # Check
+        assert len(captured_queries) == 0
+        assert shared_tree.nodes == tree.nodes
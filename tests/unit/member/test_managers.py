@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+import pytest
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+from machina.test.factories import UserFactory
+
+ForumProfile = get_model('forum_member', 'ForumProfile')
+
+
+@pytest.mark.django_db
+class TestForumProfileManager(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.u2 = UserFactory.create()
+        ForumProfile.objects.create(user=self.u1, posts_count=3)
+
+    def test_can_apply_changes_to_the_posts_counts_of_the_profiles(self):
+        # Run
+        ForumProfile.objects.update_posts_counts({self.u1.pk: 2})
+        # Check
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 5
+        assert not ForumProfile.objects.filter(user=self.u2).exists()
+
+    def test_cannot_make_the_posts_counts_negative(self):
+        # Run
+        ForumProfile.objects.update_posts_counts({self.u1.pk: -5})
+        # Check
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 0
+
+    def test_can_create_the_missing_profiles(self):
+        # Run
+        ForumProfile.objects.update_posts_counts({self.u1.pk: 1, self.u2.pk: 2}, create=True)
+        # Check
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 4
+        assert ForumProfile.objects.get(user=self.u2).posts_count == 2
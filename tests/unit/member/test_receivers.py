@@ -90,6 +90,21 @@ class TestDecreasePostsCountReceiver(object):
         profile = refresh(profile)
         assert profile.posts_count == initial_posts_count - 1
 
+    def test_do_nothing_if_the_post_was_not_approved(self):
+        # Setup
+        u1 = UserFactory.create()
+        top_level_forum = create_forum()
+        topic = create_topic(forum=top_level_forum, poster=u1)
+        PostFactory.create(topic=topic, poster=u1)
+        post = PostFactory.create(topic=topic, poster=u1, approved=False)
+        profile = ForumProfile.objects.get(user=u1)
+        initial_posts_count = profile.posts_count
+        # Run
+        post.delete()
+        # Check
+        profile = refresh(profile)
+        assert profile.posts_count == initial_posts_count
+
     def test_do_nothing_if_the_poster_is_anonymous(self):
         # Setup
         top_level_forum = create_forum()
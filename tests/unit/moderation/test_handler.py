@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+# Local application / specific library imports
+from machina.core.db.models import get_model
+from machina.core.loading import get_class
+from machina.core.utils import refresh
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import create_topic
+from machina.test.factories import PostFactory
+from machina.test.factories import UserFactory
+
+Forum = get_model('forum', 'Forum')
+ForumProfile = get_model('forum_member', 'ForumProfile')
+Post = get_model('forum_conversation', 'Post')
+Topic = get_model('forum_conversation', 'Topic')
+
+ModerationHandler = get_class('forum_moderation.handler', 'ModerationHandler')
+
+# The number of queries used to compute the trackers of a single topic
+TOPIC_TRACKERS_QUERIES_COUNT = 4
+
+
+@pytest.mark.django_db
+class TestModerationHandler(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.u1 = UserFactory.create()
+        self.u2 = UserFactory.create()
+        self.moderation_handler = ModerationHandler()
+
+        # Set up a top-level category and some forums
+        self.top_level_cat = create_category_forum()
+        self.forum_1 = create_forum(parent=self.top_level_cat)
+        self.forum_2 = create_forum(parent=self.forum_1)
+        self.forum_3 = create_forum(parent=self.top_level_cat)
+
+        # Set up a topic with some approved posts and some queued posts
+        self.topic = create_topic(forum=self.forum_2, poster=self.u1)
+        self.first_post = PostFactory.create(topic=self.topic, poster=self.u1)
+        self.queued_post_1 = PostFactory.create(topic=self.topic, poster=self.u2, approved=False)
+        self.post = PostFactory.create(topic=self.topic, poster=self.u1)
+        self.queued_post_2 = PostFactory.create(topic=self.topic, poster=self.u2, approved=False)
+
+        # Set up some topics awaiting approval
+        self.queued_topics = []
+        for _ in range(3):
+            topic = create_topic(forum=self.forum_2, poster=self.u2, approved=False)
+            PostFactory.create(topic=topic, poster=self.u2, approved=False)
+            self.queued_topics.append(topic)
+
+    def get_queued_posts_ids(self):
+        return list(Post.objects.filter(approved=False).values_list('pk', flat=True))
+
+    def test_can_approve_many_posts(self):
+        # Run
+        approved_count = self.moderation_handler.approve_posts(self.get_queued_posts_ids())
+        # Check
+        assert approved_count == 5
+        assert not Post.objects.filter(approved=False).exists()
+        assert Topic.objects.filter(approved=True).count() == 4
+        assert [p.sequence for p in self.topic.posts.order_by('created', 'pk')] == [1, 2, 3, 4]
+        topic = refresh(self.topic)
+        assert topic.posts_count == 4
+        assert topic.last_post_id == self.queued_post_2.pk
+        assert ForumProfile.objects.get(user=self.u2).posts_count == 5
+        for forum in (self.forum_2, self.forum_1, self.top_level_cat):
+            forum = refresh(forum)
+            assert forum.posts_count == 7
+            assert forum.topics_count == 4
+        assert refresh(self.forum_3).posts_count == 0
+
+    def test_does_not_approve_posts_that_are_already_approved(self):
+        # Run
+        approved_count = self.moderation_handler.approve_posts(
+            [self.first_post.pk, self.queued_post_1.pk])
+        # Check
+        assert approved_count == 1
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 2
+        assert refresh(self.topic).posts_count == 3
+        assert refresh(self.post).sequence == 3
+
+    def test_approves_posts_with_a_number_of_queries_that_only_depends_on_the_number_of_topics(self):
+        # Setup
+        post_ids = [topic.first_post_id for topic in self.queued_topics]
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            self.moderation_handler.approve_posts(post_ids[:1])
+        single_post_queries_count = len(captured_queries)
+        with CaptureQueriesContext(connection) as captured_queries:
+            self.moderation_handler.approve_posts(post_ids[1:])
+        # Check
+        # Only the trackers of the additional topic are computed using separate queries
+        assert len(captured_queries) <= single_post_queries_count + TOPIC_TRACKERS_QUERIES_COUNT
+
+    def test_can_disapprove_many_posts(self):
+        # Run
+        disapproved_count = self.moderation_handler.disapprove_posts(self.get_queued_posts_ids())
+        # Check
+        assert disapproved_count == 5
+        assert not Post.objects.filter(approved=False).exists()
+        assert list(Topic.objects.all()) == [self.topic, ]
+        topic = refresh(self.topic)
+        assert topic.posts_count == 2
+        assert topic.first_post_id == self.first_post.pk
+        assert [p.sequence for p in topic.posts.order_by('created')] == [1, 2]
+        assert ForumProfile.objects.get(user=self.u2).posts_count == 0
+        for forum in (self.forum_2, self.forum_1, self.top_level_cat):
+            forum = refresh(forum)
+            assert forum.posts_count == 2
+            assert forum.topics_count == 1
+
+    def test_does_not_disapprove_posts_that_are_already_approved(self):
+        # Run
+        disapproved_count = self.moderation_handler.disapprove_posts(
+            [self.post.pk, self.queued_post_1.pk])
+        # Check
+        assert disapproved_count == 1
+        assert Post.objects.filter(pk=self.post.pk).exists()
+        assert not Post.objects.filter(pk=self.queued_post_1.pk).exists()
+
+    def test_keeps_the_topics_whose_first_post_is_disapproved_if_they_contain_other_posts(self):
+        # Setup
+        topic = self.queued_topics[0]
+        post = PostFactory.create(topic=topic, poster=self.u1)
+        # Run
+        self.moderation_handler.disapprove_posts([topic.first_post_id, ])
+        # Check
+        topic = refresh(topic)
+        assert topic.first_post_id == post.pk
+        assert list(topic.posts.all()) == [post, ]
+
+    def test_can_delete_many_topics(self):
+        # Setup
+        topic = create_topic(forum=self.forum_3, poster=self.u1)
+        PostFactory.create(topic=topic, poster=self.u1)
+        # Run
+        deleted_count = self.moderation_handler.delete_topics(
+            [self.topic.pk, topic.pk, self.queued_topics[0].pk])
+        # Check
+        assert deleted_count == 3
+        assert Topic.objects.count() == 2
+        assert not Post.objects.filter(poster=self.u1).exists()
+        assert ForumProfile.objects.get(user=self.u1).posts_count == 0
+        for forum in (self.forum_2, self.forum_1, self.forum_3, self.top_level_cat):
+            forum = refresh(forum)
+            assert forum.posts_count == 0
+            assert forum.topics_count == 0
+            assert forum.last_post is None
+
+    def test_can_move_many_topics(self):
+        # Setup
+        topic = create_topic(forum=self.forum_1, poster=self.u1)
+        PostFactory.create(topic=topic, poster=self.u1)
+        # Run
+        moved_count = self.moderation_handler.move_topics(
+            [self.topic.pk, topic.pk], self.forum_3, lock=True)
+        # Check
+        assert moved_count == 2
+        assert set(self.forum_3.topics.all()) == set([self.topic, topic])
+        assert set(t.status for t in self.forum_3.topics.all()) == \
+            set([Topic.STATUS_CHOICES.topic_locked, ])
+        forum_2, forum_3 = refresh(self.forum_2), refresh(self.forum_3)
+        assert (forum_2.posts_count, forum_2.topics_count, forum_2.last_post) == (0, 0, None)
+        assert (forum_3.posts_count, forum_3.topics_count) == (3, 2)
+        assert forum_3.last_post == topic.last_post
+        assert refresh(self.top_level_cat).posts_count == 3
+
+    def test_marks_the_moved_topics_as_moved_if_they_are_not_locked(self):
+        # Run
+        moved_count = self.moderation_handler.move_topics(
+            [self.topic.pk, self.queued_topics[0].pk], self.forum_2)
+        moved_count += self.moderation_handler.move_topics([self.topic.pk, ], self.forum_3)
+        # Check
+        assert moved_count == 1
+        assert refresh(self.topic).status == Topic.STATUS_CHOICES.topic_moved
+        assert refresh(self.queued_topics[0]).status == Topic.STATUS_CHOICES.topic_unlocked
+
+    def test_can_return_the_forums_of_many_posts_or_topics(self):
+        # Setup
+        topic = create_topic(forum=self.forum_3, poster=self.u1)
+        post = PostFactory.create(topic=topic, poster=self.u1)
+        # Run & check
+        assert set(self.moderation_handler.get_posts_forums([self.post.pk, post.pk])) == \
+            set([self.forum_2, self.forum_3])
+        assert self.moderation_handler.get_topics_forums([topic.pk, ]) == [self.forum_3, ]
+        assert self.moderation_handler.get_topics_forums([]) == []
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.exceptions import ImproperlyConfigured
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum_permission.bitmask import bitmask
+from machina.apps.forum_permission.bitmask import PermissionBitmask
+from machina.apps.forum_permission.defaults import PermissionConfig
+from machina.apps.forum_permission.models import ForumPermission
+
+
+@pytest.mark.django_db
+class TestPermissionBitmask(object):
+    def teardown_method(self, method):
+        bitmask.clear()
+
+    def test_maps_each_permission_codename_to_a_distinct_bit(self):
+        # Run
+        bits = [bitmask.get_bit(codename)
+                for codename in ForumPermission.objects.values_list('codename', flat=True)]
+        # Check
+        assert all(bits)
+        assert len(set(bits)) == len(bits)
+        assert bitmask.get_bit(PermissionConfig.permissions[0]['codename']) == 1
+
+    def test_can_encode_and_decode_a_list_of_permission_codenames(self):
+        # Setup
+        codenames = ['can_see_forum', 'can_read_forum', 'can_edit_posts', ]
+        # Run
+        mask = bitmask.encode(codenames)
+        # Check
+        assert bitmask.decode(mask) == set(codenames)
+        assert mask & bitmask.get_bit('can_read_forum')
+        assert not mask & bitmask.get_bit('can_start_new_topics')
+
+    def test_ignores_unknown_permission_codenames(self):
+        # Run & check
+        assert bitmask.get_bit('unknown_permission') == 0
+        assert bitmask.encode(['can_see_forum', 'unknown_permission', ]) == \
+            bitmask.encode(['can_see_forum', ])
+
+    def test_can_handle_permissions_that_are_not_part_of_the_default_configuration(self):
+        # Setup
+        ForumPermission.objects.create(codename='can_do_something', is_global=True)
+        # Run
+        mask = bitmask.encode(['can_see_forum', 'can_do_something', ])
+        # Check
+        assert bitmask.get_bit('can_do_something') == 1 << len(PermissionConfig.permissions)
+        assert bitmask.decode(mask) == set(['can_see_forum', 'can_do_something', ])
+
+    def test_can_handle_permissions_that_were_created_after_the_extra_bits_were_loaded(self):
+        # Setup
+        other_bitmask = PermissionBitmask()
+        assert other_bitmask.get_bit('can_do_something') == 0
+        ForumPermission.objects.create(codename='can_do_something', is_global=True)
+        # Run
+        mask = bitmask.encode(['can_see_forum', 'can_do_something', ])
+        # Check
+        assert other_bitmask.get_bit('can_do_something') == 1 << len(PermissionConfig.permissions)
+        assert other_bitmask.decode(mask) == set(['can_see_forum', 'can_do_something', ])
+
+    def test_uses_dense_bit_positions_for_the_extra_permissions(self):
+        # Setup
+        perm_1 = ForumPermission.objects.create(codename='can_do_something', is_global=True)
+        perm_2 = ForumPermission.objects.create(codename='can_do_something_else', is_global=True)
+        perm_3 = ForumPermission.objects.create(codename='can_do_anything', is_global=True)
+        perm_2.delete()
+        offset = len(PermissionConfig.permissions)
+        # Run & check
+        assert bitmask.get_bit('can_do_something') == 1 << offset
+        assert bitmask.get_bit('can_do_anything') == 1 << (offset + 1)
+        assert perm_3.pk > perm_1.pk + 1
+
+    def test_cannot_handle_more_permissions_than_the_bits_of_a_mask(self):
+        # Setup
+        count = PermissionBitmask.MAX_BITS - len(PermissionConfig.permissions)
+        for i in range(count):
+            ForumPermission.objects.create(codename='can_do_{}'.format(i), is_global=True)
+        assert bitmask.get_bit('can_do_{}'.format(count - 1)) == 1 << (PermissionBitmask.MAX_BITS - 1)
+        ForumPermission.objects.create(codename='can_do_{}'.format(count), is_global=True)
+        # Run & check
+        with pytest.raises(ImproperlyConfigured):
+            bitmask.get_bit('can_do_{}'.format(count))
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache as default_cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import mock
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum_permission.cache import anonymous_snapshot
+from machina.apps.forum_permission.cache import cache as perm_cache
+from machina.apps.forum_permission.checker import ForumPermissionChecker
+from machina.apps.forum_permission.handler import PermissionHandler
+from machina.apps.forum_permission.shortcuts import assign_perm
+from machina.apps.forum_permission.shortcuts import remove_perm
+from machina.conf import settings as machina_settings
+from machina.test.factories import create_category_forum
+from machina.test.factories import create_forum
+from machina.test.factories import GroupFactory
+from machina.test.factories import UserFactory
+
+
+@pytest.mark.django_db
+class TestPermissionCache(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        machina_settings.PERMISSION_CACHE_NAME = 'default'
+        default_cache.clear()
+
+        self.user = UserFactory.create()
+        self.top_level_cat = create_category_forum()
+        self.forum_1 = create_forum(parent=self.top_level_cat)
+        self.forum_2 = create_forum(parent=self.top_level_cat)
+        assign_perm('can_read_forum', self.user, self.forum_1)
+
+    def teardown_method(self, method):
+        machina_settings.PERMISSION_CACHE_NAME = None
+
+    def test_is_disabled_if_no_cache_name_is_configured(self):
+        # Setup
+        machina_settings.PERMISSION_CACHE_NAME = None
+        # Run
+        perm_cache.set('key', 'value')
+        # Check
+        assert not perm_cache.enabled
+        assert perm_cache.get('key') is None
+
+    def test_invalidates_the_stored_values_when_the_version_is_bumped(self):
+        # Setup
+        perm_cache.set('key', 'value')
+        # Run
+        perm_cache.bump_version()
+        # Check
+        assert perm_cache.get('key') is None
+
+    def test_allows_warm_checkers_to_not_hit_the_database(self):
+        # Setup
+        ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_1)
+        checker = ForumPermissionChecker(self.user)
+        # Run
+        with CaptureQueriesContext(connection) as queries:
+            has_perm_1 = checker.has_perm('can_read_forum', self.forum_1)
+            has_perm_2 = checker.has_perm('can_read_forum', self.forum_2)
+        # Check
+        assert len(queries) == 0
+        assert has_perm_1
+        assert not has_perm_2
+
+    def test_allows_warm_handlers_to_not_hit_the_permission_tables(self):
+        # Setup
+        PermissionHandler()._get_forums_for_user(self.user, ['can_read_forum', ])
+        handler = PermissionHandler()
+        # Run
+        with CaptureQueriesContext(connection) as queries:
+            forums = list(handler._get_forums_for_user(self.user, ['can_read_forum', ]))
+        # Check
+        assert forums == [self.forum_1, ]
+        assert not [q for q in queries if 'forum_permission' in q['sql']]
+
+    def test_is_invalidated_when_a_user_permission_is_granted_or_removed(self):
+        # Setup
+        ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+        # Run & check
+        assign_perm('can_read_forum', self.user, self.forum_2)
+        assert ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+        remove_perm('can_read_forum', self.user, self.forum_2)
+        assert not ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+
+    def test_is_invalidated_when_a_group_permission_is_granted(self):
+        # Setup
+        group = GroupFactory.create()
+        self.user.groups.add(group)
+        ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+        # Run
+        assign_perm('can_read_forum', group, self.forum_2)
+        # Check
+        assert ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+
+    def test_is_invalidated_when_the_groups_of_a_user_change(self):
+        # Setup
+        group = GroupFactory.create()
+        assign_perm('can_read_forum', group, self.forum_2)
+        ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+        # Run
+        self.user.groups.add(group)
+        # Check
+        assert ForumPermissionChecker(self.user).has_perm('can_read_forum', self.forum_2)
+
+    def test_is_invalidated_when_a_forum_is_created(self):
+        # Setup
+        u1 = AnonymousUser()
+        assign_perm('can_read_forum', u1, None)
+        PermissionHandler()._get_forums_for_user(u1, ['can_read_forum', ])
+        # Run
+        forum_3 = create_forum(parent=self.top_level_cat)
+        # Check
+        assert forum_3 in PermissionHandler()._get_forums_for_user(u1, ['can_read_forum', ])
+
+    def test_is_invalidated_when_a_forum_is_moved(self):
+        # Setup
+        version = perm_cache.get_version()
+        # Run
+        self.forum_2.parent = self.forum_1
+        self.forum_2.save()
+        # Check
+        assert perm_cache.get_version() != version
+
+
+@pytest.mark.django_db
+class TestAnonymousPermissionSnapshot(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        machina_settings.PERMISSION_CACHE_NAME = 'default'
+        default_cache.clear()
+        anonymous_snapshot.clear()
+
+        self.top_level_cat = create_category_forum()
+        self.forum_1 = create_forum(parent=self.top_level_cat)
+        self.forum_2 = create_forum(parent=self.top_level_cat)
+        assign_perm('can_see_forum', AnonymousUser(), None)
+        assign_perm('can_read_forum', AnonymousUser(), self.forum_1)
+
+    def teardown_method(self, method):
+        machina_settings.PERMISSION_CACHE_NAME = None
+        anonymous_snapshot.clear()
+
+    def test_allows_anonymous_checkers_and_handlers_to_reuse_the_values_of_the_current_process(self):
+        # Setup
+        ForumPermissionChecker(AnonymousUser()).has_perm('can_read_forum', self.forum_1)
+        PermissionHandler()._get_forums_for_user(AnonymousUser(), ['can_see_forum', ])
+        checker = ForumPermissionChecker(AnonymousUser())
+        handler = PermissionHandler()
+        # Run
+        with mock.patch.object(perm_cache, 'get') as mock_get:
+            with CaptureQueriesContext(connection) as queries:
+                has_perm_1 = checker.has_perm('can_read_forum', self.forum_1)
+                has_perm_2 = checker.has_perm('can_read_forum', self.forum_2)
+                forums = list(handler._get_forums_for_user(AnonymousUser(), ['can_see_forum', ]))
+        # Check
+        assert not mock_get.called
+        assert not [q for q in queries if 'forum_permission' in q['sql']]
+        assert has_perm_1
+        assert not has_perm_2
+        assert set(forums) == set([self.top_level_cat, self.forum_1, self.forum_2])
+
+    def test_discards_the_values_of_the_previous_permission_versions(self):
+        # Setup
+        checker = ForumPermissionChecker(AnonymousUser())
+        assert not checker.has_perm('can_read_forum', self.forum_2)
+        # Run
+        assign_perm('can_read_forum', AnonymousUser(), self.forum_2)
+        checker = ForumPermissionChecker(AnonymousUser())
+        # Check
+        assert checker.has_perm('can_read_forum', self.forum_2)
+
+    def test_is_not_used_for_authenticated_users(self):
+        # Setup
+        user = UserFactory.create()
+        ForumPermissionChecker(user).has_perm('can_read_forum', self.forum_1)
+        # Run & check
+        assert anonymous_snapshot.get('perms_masks:{}'.format(user.id), perm_cache.get_version()) is None
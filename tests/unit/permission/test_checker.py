@@ -4,13 +4,17 @@
 from __future__ import unicode_literals
 
 # Third party imports
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 # Local application / specific library imports
+from machina.apps.forum_permission.bitmask import bitmask
 from machina.apps.forum_permission.checker import ForumPermissionChecker
 from machina.apps.forum_permission.shortcuts import assign_perm
 from machina.apps.forum_permission.models import ForumPermission
 from machina.conf import settings as machina_settings
+from machina.test.factories import create_category_forum
 from machina.test.factories import create_forum
 from machina.test.factories import GroupFactory
 from machina.test.factories import UserFactory
@@ -90,3 +94,53 @@ class TestForumPermissionChecker(object):
         checker = ForumPermissionChecker(user)
         # Run & check
         assert not checker.has_perm('can_read_forum', self.forum)
+
+    def test_can_compute_the_permissions_of_multiple_forums_at_once(self):
+        # Setup
+        user = UserFactory.create()
+        group = GroupFactory.create()
+        user.groups.add(group)
+        top_level_cat = create_category_forum()
+        forum_1 = create_forum(parent=top_level_cat)
+        forum_2 = create_forum(parent=top_level_cat)
+        assign_perm('can_read_forum', user, None)  # global permission
+        assign_perm('can_read_forum', user, forum_1, has_perm=False)
+        assign_perm('can_start_new_topics', group, forum_2)
+        checker = ForumPermissionChecker(user)
+        # Run
+        perms = checker.get_perms_for_forums([top_level_cat, forum_1, forum_2])
+        # Check
+        assert perms[top_level_cat.id] == set(['can_read_forum', ])
+        assert perms[forum_1.id] == set()
+        assert perms[forum_2.id] == set(['can_read_forum', 'can_start_new_topics', ])
+
+    def test_do_not_hit_the_database_when_checking_permissions_on_preloaded_forums(self):
+        # Setup
+        user = UserFactory.create()
+        forum_2 = create_forum()
+        assign_perm('can_read_forum', user, self.forum)
+        checker = ForumPermissionChecker(user)
+        # Run
+        with CaptureQueriesContext(connection) as preloading_queries:
+            checker.get_perms_for_forums([self.forum, forum_2])
+        with CaptureQueriesContext(connection) as checking_queries:
+            has_perm_1 = checker.has_perm('can_read_forum', self.forum)
+            has_perm_2 = checker.has_perm('can_read_forum', forum_2)
+        # Check
+        assert len(preloading_queries) == 2
+        assert len(checking_queries) == 0
+        assert has_perm_1
+        assert not has_perm_2
+
+    def test_can_return_the_permissions_of_multiple_forums_as_masks(self):
+        # Setup
+        user = UserFactory.create()
+        forum_2 = create_forum()
+        assign_perm('can_read_forum', user, self.forum)
+        assign_perm('can_see_forum', user, forum_2, has_perm=False)
+        checker = ForumPermissionChecker(user)
+        # Run
+        masks = checker.get_perms_masks([self.forum, forum_2])
+        # Check
+        assert masks[self.forum.id] == bitmask.encode(['can_see_forum', 'can_read_forum', ])
+        assert masks[forum_2.id] == 0
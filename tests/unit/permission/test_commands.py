@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.core.management import call_command
+from django.utils.six import StringIO
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum_permission.bitmask import bitmask
+from machina.apps.forum_permission.shortcuts import assign_perm
+from machina.core.db.models import get_model
+from machina.test.factories import create_forum
+from machina.test.factories import GroupFactory
+from machina.test.factories import UserFactory
+
+EffectiveForumPermission = get_model('forum_permission', 'EffectiveForumPermission')
+
+
+@pytest.mark.django_db
+class TestRebuildEffectiveForumPermissionsCommand(object):
+    def test_can_rebuild_the_effective_permissions_of_all_the_users(self):
+        # Setup
+        u1 = UserFactory.create()
+        u2 = UserFactory.create()
+        u3 = UserFactory.create()
+        g1 = GroupFactory.create()
+        u2.groups.add(g1)
+        forum_1 = create_forum()
+        forum_2 = create_forum()
+        assign_perm('can_read_forum', u1, forum_1)
+        assign_perm('can_see_forum', g1, None)
+        assign_perm('can_see_forum', g1, forum_2, has_perm=False)
+        # Run
+        call_command('rebuild_effective_forum_permissions', stdout=StringIO())
+        # Check
+        perms = dict(
+            ((p.user_id, p.forum_id), p.perms) for p in EffectiveForumPermission.objects.all())
+        assert len(perms) == 6
+        assert perms[(u1.pk, forum_1.pk)] == bitmask.encode(['can_read_forum', ])
+        assert perms[(u1.pk, forum_2.pk)] == 0
+        assert perms[(u2.pk, forum_1.pk)] == bitmask.encode(['can_see_forum', ])
+        assert perms[(u2.pk, forum_2.pk)] == 0
+        assert perms[(None, forum_1.pk)] == 0
+        assert (u3.pk, forum_1.pk) not in perms
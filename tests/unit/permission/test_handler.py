@@ -6,6 +6,8 @@ import datetime
 
 # Third party imports
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 # Local application / specific library imports
@@ -23,6 +25,7 @@ from machina.test.factories import TopicPollOptionFactory
 from machina.test.factories import TopicPollVoteFactory
 from machina.test.factories import UserFactory
 
+EffectiveForumPermission = get_model('forum_permission', 'EffectiveForumPermission')
 Forum = get_model('forum', 'Forum')
 Post = get_model('forum_conversation', 'Post')
 Topic = get_model('forum_conversation', 'Topic')
@@ -115,6 +118,65 @@ class TestPermissionHandler(object):
         # Check
         assert list(filtered_forums) == []
 
+    def test_can_filter_forums_using_the_effective_permissions(self):
+        # Setup
+        machina_settings.EFFECTIVE_PERMISSIONS_ENABLED = True
+        EffectiveForumPermission.objects.rebuild()
+        forums = Forum.objects.filter(parent=self.top_level_cat)
+        # Run
+        try:
+            filtered_forums = self.perm_handler.forum_list_filter(forums, self.u1)
+            can_read_forum_3 = self.perm_handler.can_read_forum(self.forum_3, self.u1)
+        finally:
+            machina_settings.EFFECTIVE_PERMISSIONS_ENABLED = False
+        # Check
+        assert EffectiveForumPermission.objects.filter(user=self.u1).exists()
+        assert set(filtered_forums) == set([self.forum_1, self.forum_3])
+        assert can_read_forum_3
+
+    def test_can_filter_forums_in_a_single_query(self):
+        # Setup
+        sub_forum_1 = create_forum(parent=self.forum_1)
+        sub_forum_2 = create_forum(parent=sub_forum_1)
+        sub_forum_3 = create_forum(parent=self.forum_2)
+        for forum in (sub_forum_1, sub_forum_2, sub_forum_3):
+            assign_perm('can_see_forum', self.u1, forum)
+        filtered_forums = self.perm_handler.forum_list_filter(Forum.objects.all(), self.u1)
+        # Run
+        with CaptureQueriesContext(connection) as queries:
+            filtered_forums = list(filtered_forums)
+        # Check
+        assert len(queries) == 1
+        assert set(filtered_forums) == set([
+            self.top_level_cat, self.forum_1, self.forum_3, sub_forum_1, sub_forum_2])
+
+    def test_hide_all_the_descendants_of_a_forum_that_is_not_visible(self):
+        # Setup
+        sub_forum_1 = create_forum(parent=self.forum_1)
+        sub_forum_2 = create_forum(parent=sub_forum_1)
+        assign_perm('can_see_forum', self.u1, sub_forum_1)
+        assign_perm('can_see_forum', self.u1, sub_forum_2)
+        remove_perm('can_see_forum', self.u1, self.forum_1)
+        forums = Forum.objects.filter(pk__in=[self.forum_1.pk, sub_forum_1.pk, sub_forum_2.pk])
+        # Run
+        hidden_forum_ids = self.perm_handler._get_hidden_forum_ids(forums, self.u1)
+        # Check
+        assert set([self.forum_1.pk, sub_forum_1.pk, sub_forum_2.pk]).issubset(set(hidden_forum_ids))
+        assert self.top_level_cat.pk not in hidden_forum_ids
+
+    def test_computes_the_hidden_forums_with_a_constant_number_of_queries(self):
+        # Setup
+        forums = Forum.objects.all()
+        with CaptureQueriesContext(connection) as queries_1:
+            PermissionHandler()._get_hidden_forum_ids(forums, self.u1)
+        for i in range(5):
+            create_forum(parent=create_forum(parent=self.forum_2))
+        # Run
+        with CaptureQueriesContext(connection) as queries_2:
+            PermissionHandler()._get_hidden_forum_ids(forums, self.u1)
+        # Check
+        assert len(queries_1) == len(queries_2)
+
     def test_knows_the_last_post_visible_inside_a_forum(self):
         # Run & check : no forum hidden
         last_post = self.perm_handler.get_forum_last_post(self.top_level_cat, self.u1)
@@ -141,6 +203,23 @@ class TestPermissionHandler(object):
         # Check
         assert last_post == self.post_1
 
+    def test_can_compute_the_last_posts_of_many_forums_with_a_constant_number_of_queries(self):
+        # Setup
+        forums = [self.top_level_cat, self.forum_1, self.forum_2, self.forum_3]
+        remove_perm('can_read_forum', self.g1, self.forum_3)
+        self.perm_handler.get_forums_last_posts(forums[:1], self.u1)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            last_posts = self.perm_handler.get_forums_last_posts(forums, self.u1)
+            last_post = self.perm_handler.get_forum_last_post(self.forum_1, self.u1)
+        # Check
+        assert len(captured_queries) == 1
+        assert last_posts[self.top_level_cat.pk] == self.post_1
+        assert last_posts[self.forum_1.pk] == self.post_1
+        assert last_posts[self.forum_2.pk] is None
+        assert last_posts[self.forum_3.pk] is None
+        assert last_post == self.post_1
+
     def test_shows_all_forums_to_a_superuser(self):
         # Setup
         u2 = UserFactory.create(is_superuser=True)
@@ -198,6 +277,25 @@ class TestPermissionHandler(object):
         assert self.perm_handler.can_delete_post(self.post_1, moderator)
         assert not self.perm_handler.can_delete_post(self.post_2, moderator)
 
+    def test_can_compute_the_edit_and_delete_permissions_of_multiple_posts_at_once(self):
+        # Setup
+        u2 = UserFactory.create()
+        post_3 = PostFactory.create(topic=self.forum_1_topic, poster=u2)
+        assign_perm('can_edit_own_posts', self.u1, self.forum_1)
+        assign_perm('can_delete_posts', self.u1, self.forum_3)
+        posts = [self.post_1, self.post_2, post_3]
+        # Run
+        annotated_posts = self.perm_handler.annotate_post_permissions(posts, self.u1)
+        # Check
+        assert [p.user_permissions for p in annotated_posts] == [
+            {'can_edit_post': True, 'can_delete_post': False},
+            {'can_edit_post': False, 'can_delete_post': True},
+            {'can_edit_post': False, 'can_delete_post': False},
+        ]
+        for post in posts:
+            assert post.user_permissions['can_edit_post'] == self.perm_handler.can_edit_post(post, self.u1)
+            assert post.user_permissions['can_delete_post'] == self.perm_handler.can_delete_post(post, self.u1)
+
     def test_knows_if_a_user_can_add_stickies(self):
         # Setup
         u2 = UserFactory.create()
@@ -513,6 +611,25 @@ class TestPermissionHandler(object):
         # Run & check
         assert self.perm_handler.can_approve_posts(self.forum_1, u2)
 
+    def test_knows_if_a_user_has_a_permission_for_many_forums_at_once(self):
+        # Setup
+        assign_perm('can_approve_posts', self.u1, self.forum_1)
+        assign_perm('can_approve_posts', self.u1, self.forum_2)
+        forums = [self.forum_1, self.forum_2]
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries:
+            granted = self.perm_handler.has_perm_for_forums(forums, self.u1, 'can_approve_posts')
+            granted_again = self.perm_handler.has_perm_for_forums(
+                forums, self.u1, 'can_approve_posts')
+        # Check
+        assert granted and granted_again
+        assert len(captured_queries) <= 2
+        assert not self.perm_handler.has_perm_for_forums(
+            forums + [self.forum_3, ], self.u1, 'can_approve_posts')
+        assert not self.perm_handler.has_perm_for_forums([], self.u1, 'can_approve_posts')
+        assert self.perm_handler.has_perm_for_forums(
+            forums + [self.forum_3, ], UserFactory.create(is_superuser=True), 'can_approve_posts')
+
     def test_filter_methods_fallback_to_default_forum_permissions_if_applicable(self):
         # Setup
         codenames = [
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# Standard library imports
+from __future__ import unicode_literals
+
+# Third party imports
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+# Local application / specific library imports
+from machina.apps.forum_permission.bitmask import bitmask
+from machina.apps.forum_permission.shortcuts import assign_perm
+from machina.apps.forum_permission.shortcuts import remove_perm
+from machina.conf import settings as machina_settings
+from machina.core.db.models import get_model
+from machina.test.factories import create_forum
+from machina.test.factories import GroupFactory
+from machina.test.factories import UserFactory
+
+EffectiveForumPermission = get_model('forum_permission', 'EffectiveForumPermission')
+ForumPermission = get_model('forum_permission', 'ForumPermission')
+
+
+@pytest.mark.django_db
+class TestEffectivePermissionsReceivers(object):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        machina_settings.EFFECTIVE_PERMISSIONS_ENABLED = True
+        self.u1 = UserFactory.create()
+        self.g1 = GroupFactory.create()
+        self.forum_1 = create_forum()
+        self.forum_2 = create_forum()
+
+    def teardown_method(self, method):
+        machina_settings.EFFECTIVE_PERMISSIONS_ENABLED = False
+        bitmask.clear()
+
+    def get_perms(self, forum, user=None):
+        user_kwargs = {'user': user} if user else {'anonymous_user': True}
+        return EffectiveForumPermission.objects.get(forum=forum, **user_kwargs).perms
+
+    def test_can_update_the_effective_permissions_of_a_user_when_a_user_permission_changes(self):
+        # Run
+        assign_perm('can_read_forum', self.u1, self.forum_1)
+        # Check
+        assert self.get_perms(self.forum_1, self.u1) == bitmask.encode(['can_read_forum', ])
+        # The effective permissions of the other forums are not affected by a per-forum permission
+        assert not EffectiveForumPermission.objects.filter(user=self.u1, forum=self.forum_2).exists()
+        # Run
+        remove_perm('can_read_forum', self.u1, self.forum_1)
+        # Check
+        assert self.get_perms(self.forum_1, self.u1) == 0
+
+    def test_can_update_the_effective_permissions_of_the_anonymous_users(self):
+        # Run
+        assign_perm('can_see_forum', AnonymousUser(), None)
+        # Check
+        assert self.get_perms(self.forum_1) == bitmask.encode(['can_see_forum', ])
+        assert self.get_perms(self.forum_2) == bitmask.encode(['can_see_forum', ])
+
+    def test_can_update_the_effective_permissions_of_the_users_of_a_group(self):
+        # Setup
+        self.u1.groups.add(self.g1)
+        # Run
+        assign_perm('can_read_forum', self.g1, self.forum_2)
+        # Check
+        assert self.get_perms(self.forum_1, self.u1) == 0
+        assert self.get_perms(self.forum_2, self.u1) == bitmask.encode(['can_read_forum', ])
+
+    def test_updates_the_effective_permissions_of_the_users_of_a_group_in_batch(self):
+        # Setup
+        self.u1.groups.add(self.g1)
+        with CaptureQueriesContext(connection) as captured_queries_1:
+            assign_perm('can_read_forum', self.g1, self.forum_1)
+        for _ in range(5):
+            UserFactory.create().groups.add(self.g1)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries_2:
+            assign_perm('can_read_forum', self.g1, self.forum_2)
+        # Check
+        assert len(captured_queries_1) == len(captured_queries_2)
+        assert EffectiveForumPermission.objects.filter(forum=self.forum_2, user__isnull=False).count() == 6
+        assert self.get_perms(self.forum_2, self.u1) == bitmask.encode(['can_read_forum', ])
+
+    def test_can_update_the_effective_permissions_of_a_user_when_its_groups_change(self):
+        # Setup
+        assign_perm('can_read_forum', self.g1, self.forum_1)
+        # Run
+        self.u1.groups.add(self.g1)
+        # Check
+        assert self.get_perms(self.forum_1, self.u1) == bitmask.encode(['can_read_forum', ])
+        # Run
+        self.g1.user_set.clear()
+        # Check
+        assert self.get_perms(self.forum_1, self.u1) == 0
+
+    def test_can_compute_the_effective_permissions_of_a_new_forum(self):
+        # Setup
+        assign_perm('can_read_forum', self.u1, None)
+        # Run
+        forum_3 = create_forum()
+        # Check
+        assert self.get_perms(forum_3, self.u1) == bitmask.encode(['can_read_forum', ])
+        assert self.get_perms(forum_3) == 0
+
+    def test_computes_the_effective_permissions_of_a_new_forum_in_batch(self):
+        # Setup
+        assign_perm('can_read_forum', self.u1, None)
+        with CaptureQueriesContext(connection) as captured_queries_1:
+            create_forum()
+        for _ in range(5):
+            assign_perm('can_read_forum', UserFactory.create(), None)
+        # Run
+        with CaptureQueriesContext(connection) as captured_queries_2:
+            forum_4 = create_forum()
+        # Check
+        assert len(captured_queries_1) == len(captured_queries_2)
+        assert EffectiveForumPermission.objects.filter(forum=forum_4, user__isnull=False).count() == 6
+
+    def test_computes_again_the_effective_permissions_when_a_forum_permission_is_removed(self):
+        # Setup
+        perm_1 = ForumPermission.objects.create(codename='can_do_something', is_global=True)
+        ForumPermission.objects.create(codename='can_do_something_else', is_global=True)
+        assign_perm('can_do_something_else', self.u1, self.forum_1)
+        # Run
+        perm_1.delete()
+        # Check
+        assert self.get_perms(self.forum_1, self.u1) == bitmask.encode(['can_do_something_else', ])
+
+    def test_do_nothing_if_the_effective_permissions_are_not_enabled(self):
+        # Setup
+        machina_settings.EFFECTIVE_PERMISSIONS_ENABLED = False
+        # Run
+        assign_perm('can_read_forum', self.u1, self.forum_1)
+        # Check
+        assert not EffectiveForumPermission.objects.filter(user=self.u1).exists()